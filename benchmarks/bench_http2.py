@@ -0,0 +1,31 @@
+"""
+Connection count and wall time of a 200-item anime enrichment (`AsyncParser.get_details`) over HTTP/1.1 versus
+HTTP/2 against the local stand-ins. Each case records the connections the server accepted per round in `extra_info`.
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+from otakudesudata.parser import AsyncParser
+from benchmarks.server import FixtureServer
+
+pytest.importorskip('h2')
+from benchmarks.h2server import H2FixtureServer
+
+items = 200
+rounds = 3
+
+
+def enrich(url: str, **kwargs):
+  target = SimpleNamespace(anime=[{'url': f'{url}anime/title-{index}-sub-indo/'} for index in range(items)])
+  asyncio.run(AsyncParser.get_details(target, get_anime_details=True, raise_exception=True, **kwargs))
+  assert all(anime.get('episodes') for anime in target.anime)
+
+
+@pytest.mark.parametrize('protocol', ['http1', 'http2'])
+def bench_enrichment(benchmark, protocol):
+  benchmark.group = f'enrichment of {items} anime pages'
+  server, kwargs = (FixtureServer(latency=0.05), {}) if protocol == 'http1' else (H2FixtureServer(latency=0.05), {'http2': True, 'http1': False})
+  with server:
+    benchmark.pedantic(enrich, args=(server.url,), kwargs=kwargs, rounds=rounds)
+    benchmark.extra_info['connections'] = server.connections / rounds
+    benchmark.extra_info['requests'] = server.requests / rounds
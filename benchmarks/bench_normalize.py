@@ -0,0 +1,31 @@
+"""
+Cost of `otakudesudata.normalize.annotate` on the spec extractions of the recorded fixture pages, with the cached
+month-name parser and with its cache cleared before every round (every date parsed from scratch).
+"""
+import copy
+import pytest
+from otakudesudata import normalize
+from otakudesudata.specs import searchPage, animePage, episodePage, listingPage
+
+specs = {'search': searchPage, 'anime': animePage, 'episode': episodePage, 'ongoing': listingPage}
+
+
+@pytest.fixture(scope='module')
+def payloads(soups):
+  return {name: spec.extract(soups[name]) for name, spec in specs.items()}
+
+
+@pytest.mark.parametrize('payload', list(specs))
+def bench_annotate(benchmark, payloads, payload):
+  benchmark.group = f'normalize-{payload}'
+  values = benchmark(lambda: normalize.annotate(copy.deepcopy(payloads[payload])))
+  assert values != payloads[payload]
+
+
+@pytest.mark.parametrize('payload', list(specs))
+def bench_annotate_uncached(benchmark, payloads, payload):
+  benchmark.group = f'normalize-{payload}'
+  def annotate():
+    normalize._parse_date.cache_clear()
+    return normalize.annotate(copy.deepcopy(payloads[payload]))
+  benchmark(annotate)
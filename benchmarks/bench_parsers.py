@@ -0,0 +1,58 @@
+"""
+Throughput of every parser's extraction over the recorded fixture pages.
+
+The `*_tree` cases measure only the `bs()` tree build, the `*_extract` cases run every `get_*` method of a parser
+over an already built tree, so a regression can be attributed to either side.
+"""
+import pytest
+from bs4 import BeautifulSoup as bs
+from otakudesudata.parser import SearchResultParser, AnimeParser, EpisodeParser, BatchParser, OngoingParser
+from otakudesudata import get_schedules, get_anime_list
+from benchmarks.conftest import point_to
+
+extractors = {
+  'search': (SearchResultParser.get_anime, SearchResultParser.get_episodes, SearchResultParser.get_batch),
+  'anime': (AnimeParser.get_title, AnimeParser.get_thumbnails, AnimeParser.get_details, AnimeParser.get_feed, AnimeParser.get_description,
+            AnimeParser.get_seasons, AnimeParser.get_episodes, AnimeParser.get_batch),
+  'episode': (EpisodeParser.get_title, EpisodeParser.get_thumbnails, EpisodeParser.get_details, EpisodeParser.get_episodes,
+              EpisodeParser.get_links),
+  'batch': (BatchParser.get_title, BatchParser.get_description, BatchParser.get_thumbnails, BatchParser.get_links),
+  'ongoing': (OngoingParser.get_current_page_number, OngoingParser.get_previous_page, OngoingParser.get_next_page,
+              OngoingParser.get_releases, OngoingParser.get_all_pages),
+}
+
+
+def extract(soup, functions):
+  return [function(soup) for function in functions]
+
+
+@pytest.mark.parametrize('page', list(extractors) + ['schedule', 'anime_list'])
+def bench_tree(benchmark, pages, page):
+  benchmark.group = 'tree'
+  benchmark(bs, pages[page], 'html.parser')
+
+
+@pytest.mark.parametrize('page', list(extractors))
+def bench_extract(benchmark, soups, page):
+  benchmark.group = 'extract'
+  results = benchmark(extract, soups[page], extractors[page])
+  assert any(results)
+
+
+@pytest.mark.parametrize('page', list(extractors))
+def bench_parse(benchmark, pages, page):
+  benchmark.group = 'tree+extract'
+  benchmark(lambda: extract(bs(pages[page], 'html.parser'), extractors[page]))
+
+
+def bench_schedules(benchmark, server, monkeypatch):
+  point_to(monkeypatch, server)
+  benchmark.group = 'fetch+parse'
+  schedules = benchmark(get_schedules)
+  assert len(schedules) == 8
+
+
+def bench_anime_list(benchmark, server, monkeypatch):
+  point_to(monkeypatch, server)
+  benchmark.group = 'fetch+parse'
+  assert benchmark(get_anime_list)
@@ -0,0 +1,29 @@
+"""
+End-to-end latency of `search` against the local stand-in, with and without detail enrichment.
+
+The stand-in answers after 20ms so the numbers reflect request fan-out rather than loopback speed.
+"""
+from otakudesudata import search, SearchTypes
+from benchmarks.conftest import point_to
+
+
+def bench_search(benchmark, slow_server, monkeypatch):
+  point_to(monkeypatch, slow_server)
+  benchmark.group = 'search'
+  results = benchmark.pedantic(search, args=('jujutsu kaisen',), kwargs={'search_type': SearchTypes.all}, rounds=5)
+  assert len(results['anime']) == 10
+
+
+def bench_search_anime_details(benchmark, slow_server, monkeypatch):
+  point_to(monkeypatch, slow_server)
+  benchmark.group = 'search'
+  results = benchmark.pedantic(search, args=('jujutsu kaisen',), kwargs={'get_anime_details': True, 'raise_exception': True}, rounds=5)
+  assert all(anime.get('episodes') for anime in results['anime'])
+
+
+def bench_search_all_details(benchmark, slow_server, monkeypatch):
+  point_to(monkeypatch, slow_server)
+  benchmark.group = 'search'
+  kwargs = {'search_type': SearchTypes.all, 'get_anime_details': True, 'get_episode_details': True, 'get_batch_details': True, 'raise_exception': True}
+  results = benchmark.pedantic(search, args=('jujutsu kaisen',), kwargs=kwargs, rounds=5)
+  assert all(episode.get('links') for episode in results['episodes'])
@@ -0,0 +1,55 @@
+"""
+Encoding and decoding of parse results with `otakudesudata.serialization` against the standard `json` module.
+
+The payloads are the spec extractions of the recorded fixture pages, and a catalog export of 120 of them (the
+shape `SQLiteWorkQueue.results()` and snapshots hold). The encoded size of every format is stored in the
+benchmark's `extra_info`, and the msgpack formats are asserted to be smaller than JSON.
+"""
+import json
+import pytest
+from otakudesudata import serialization
+from otakudesudata.specs import searchPage, animePage, episodePage, batchPage, listingPage
+
+pytest.importorskip('msgpack')
+
+specs = {'search': searchPage, 'anime': animePage, 'episode': episodePage, 'batch': batchPage, 'ongoing': listingPage}
+formats = ('msgpack', 'keys', 'json')
+
+
+@pytest.fixture(scope='module')
+def payloads(soups):
+  pages = {name: spec.extract(soups[name]) for name, spec in specs.items()}
+  pages['catalog'] = [pages['anime']] * 50 + [pages['episode']] * 50 + [pages['ongoing']] * 20
+  return pages
+
+
+def json_dumps(value):
+  return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+@pytest.mark.parametrize('payload', list(specs) + ['catalog'])
+def bench_json_dumps(benchmark, payloads, payload):
+  benchmark.group = f'dumps-{payload}'
+  benchmark.extra_info['bytes'] = len(benchmark(json_dumps, payloads[payload]))
+
+
+@pytest.mark.parametrize('format', formats)
+@pytest.mark.parametrize('payload', list(specs) + ['catalog'])
+def bench_dumps(benchmark, payloads, payload, format):
+  benchmark.group = f'dumps-{payload}'
+  data = benchmark(serialization.dumps, payloads[payload], format)
+  benchmark.extra_info['bytes'] = len(data)
+  if format != 'json': assert len(data) < len(json_dumps(payloads[payload]))
+
+
+@pytest.mark.parametrize('payload', list(specs) + ['catalog'])
+def bench_json_loads(benchmark, payloads, payload):
+  benchmark.group = f'loads-{payload}'
+  assert benchmark(json.loads, json_dumps(payloads[payload])) == payloads[payload]
+
+
+@pytest.mark.parametrize('format', formats)
+@pytest.mark.parametrize('payload', list(specs) + ['catalog'])
+def bench_loads(benchmark, payloads, payload, format):
+  benchmark.group = f'loads-{payload}'
+  assert benchmark(serialization.loads, serialization.dumps(payloads[payload], format)) == payloads[payload]
@@ -0,0 +1,23 @@
+"""
+A short run of the soak harness (`benchmarks/soak.py`), checking it samples the memory of the process, reports the
+allocation sites and finds no BeautifulSoup element kept by a result. Run `python -m benchmarks.soak` for a real soak.
+"""
+from benchmarks.soak import soak, retained_elements
+from bs4 import BeautifulSoup as bs
+
+
+def bench_soak(benchmark):
+  benchmark.group = 'soak'
+  report = benchmark.pedantic(soak, kwargs={'duration': 3, 'interval': 1, 'warmup': 1, 'max_growth': 50}, rounds=1)
+  assert report['cycles'] >= 1
+  assert len(report['samples']) >= 2
+  assert report['top']
+  assert report['retainedElements'] == 0
+  assert report['passed']
+  benchmark.extra_info.update(cycles=report['cycles'], growth=report['growth'])
+
+
+def bench_retained_elements(benchmark):
+  soup = bs('<p>one</p><p>two</p>', 'html.parser')
+  results = [{'title': soup.p.string, 'links': [{'url': str(soup.p.string)}]}, {'tag': soup.p}]
+  assert benchmark(retained_elements, results) == 2
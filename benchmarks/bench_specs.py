@@ -0,0 +1,70 @@
+"""
+Tree traversals of the compiled extraction specs (`otakudesudata.specs`) against the extractors they replaced
+(`benchmarks/legacy.py`).
+
+Every `find`/`find_all` of bs4 walks `Tag.descendants`, so counting how often that generator is started (`walks`)
+and how many nodes it yields (`nodes`) measures the work of an extraction independently of the machine. Both
+counts are stored in the benchmark's `extra_info` and the spec extraction is asserted to walk less and to return
+exactly what the legacy extractors return.
+"""
+import contextlib
+import pytest
+from bs4.element import Tag
+from otakudesudata.specs import searchPage, animePage, episodePage, batchPage, listingPage
+from benchmarks import legacy
+
+specs = {
+  'search': (searchPage, legacy.SearchResultParser),
+  'anime': (animePage, legacy.AnimeParser),
+  'episode': (episodePage, legacy.EpisodeParser),
+  'batch': (batchPage, legacy.BatchParser),
+  'ongoing': (listingPage, legacy.OngoingParser),
+}
+
+
+def legacy_extract(soup, spec, parser):
+  return {name: getattr(parser, f'get_{name}')(soup) for name in spec.fields if hasattr(parser, f'get_{name}')}
+
+
+def spec_extract(soup, spec, parser):
+  return spec.extract(soup, tuple(name for name in spec.fields if hasattr(parser, f'get_{name}')))
+
+
+@contextlib.contextmanager
+def counting(monkeypatch):
+  counts = {'walks': 0, 'nodes': 0}
+  descendants = Tag.descendants.fget
+  def counted(tag):
+    counts['walks'] += 1
+    for node in descendants(tag):
+      counts['nodes'] += 1
+      yield node
+  with monkeypatch.context() as patch:
+    patch.setattr(Tag, 'descendants', property(counted))
+    yield counts
+
+
+@pytest.mark.parametrize('page', list(specs))
+def bench_traversals(benchmark, soups, monkeypatch, page):
+  spec, parser = specs[page]
+  with counting(monkeypatch) as before:
+    expected = legacy_extract(soups[page], spec, parser)
+  with counting(monkeypatch) as after:
+    values = spec_extract(soups[page], spec, parser)
+  benchmark.group = 'traversals'
+  benchmark.extra_info.update({'legacy_walks': before['walks'], 'legacy_nodes': before['nodes'], 'spec_walks': after['walks'], 'spec_nodes': after['nodes']})
+  benchmark(spec_extract, soups[page], spec, parser)
+  assert values == expected
+  assert after['walks'] < before['walks'] and after['nodes'] < before['nodes']
+
+
+@pytest.mark.parametrize('page', list(specs))
+def bench_legacy_extract(benchmark, soups, page):
+  benchmark.group = f'extract-{page}'
+  benchmark(legacy_extract, soups[page], *specs[page])
+
+
+@pytest.mark.parametrize('page', list(specs))
+def bench_spec_extract(benchmark, soups, page):
+  benchmark.group = f'extract-{page}'
+  benchmark(spec_extract, soups[page], *specs[page])
@@ -0,0 +1,35 @@
+import pytest
+from bs4 import BeautifulSoup as bs
+from benchmarks.server import FixtureServer, load_fixture
+from otakudesudata import api
+
+
+@pytest.fixture(scope='session')
+def pages():
+  return {name: load_fixture(name) for name in ('search', 'anime', 'episode', 'batch', 'ongoing', 'schedule', 'anime_list')}
+
+
+@pytest.fixture(scope='session')
+def soups(pages):
+  return {name: bs(html, 'html.parser') for name, html in pages.items()}
+
+
+@pytest.fixture
+def server():
+  with FixtureServer() as server:
+    yield server
+
+
+@pytest.fixture
+def slow_server():
+  """A stand-in answering every request after 20ms, roughly a nearby edge."""
+  with FixtureServer(latency=0.02) as server:
+    yield server
+
+
+def point_to(monkeypatch, server):
+  """Points the module level URLs of `otakudesudata.api` (read by `search`, `get_ongoing`, ...) to a running `FixtureServer`."""
+  monkeypatch.setattr(api, 'baseUrl', server.url)
+  monkeypatch.setattr(api, 'ongoingUrl', server.url + 'ongoing-anime/')
+  monkeypatch.setattr(api, 'animeListUrl', server.url + 'anime-list/')
+  monkeypatch.setattr(api, 'schedulesUrl', server.url + 'jadwal-rilis/')
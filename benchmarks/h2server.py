@@ -0,0 +1,76 @@
+"""
+An HTTP/2 (cleartext, prior knowledge) variant of the fixture stand-in, built on the `h2` protocol library.
+
+Clients must speak HTTP/2 without negotiation, e.g. `fetch.async_client(http2=True, http1=False)`.
+"""
+from benchmarks.server import FixtureServer
+import asyncio
+import threading
+import h2.config
+import h2.connection
+import h2.events
+
+
+class H2FixtureServer(FixtureServer):
+  """
+  Serves the recorded fixtures over HTTP/2 on a background event loop. Takes the same arguments as `FixtureServer`.
+  """
+  def _bind(self, host: str, port: int) -> int:
+    self._loop = asyncio.new_event_loop()
+    self._server = self._loop.run_until_complete(asyncio.start_server(self._serve, host, port, backlog=1024))
+    return self._server.sockets[0].getsockname()[1]
+
+  def start(self):
+    self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self):
+    async def close():
+      self._server.close()
+      await self._server.wait_closed()
+    asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+    self._loop.call_soon_threadsafe(self._loop.stop)
+    self._thread.join()
+    self._loop.close()
+
+  async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    with self._lock: self.connections += 1
+    connection = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+    connection.initiate_connection()
+    writer.write(connection.data_to_send())
+    window = asyncio.Event()
+    tasks = set()
+    try:
+      while data := await reader.read(65535):
+        for event in connection.receive_data(data):
+          if isinstance(event, h2.events.RequestReceived):
+            task = asyncio.create_task(self._respond(connection, writer, window, event.stream_id, dict(event.headers)[':path']))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+          elif isinstance(event, h2.events.WindowUpdated):
+            window.set()
+          elif isinstance(event, h2.events.ConnectionTerminated):
+            return
+        writer.write(connection.data_to_send())
+    except (ConnectionError, h2.exceptions.ProtocolError):
+      pass
+    finally:
+      for task in tasks: task.cancel()
+      writer.close()
+
+  async def _respond(self, connection: h2.connection.H2Connection, writer: asyncio.StreamWriter, window: asyncio.Event, stream_id: int, path: str):
+    status, body = self.render(path)
+    if self.latency: await asyncio.sleep(self.latency)
+    payload = body.encode('utf-8')
+    connection.send_headers(stream_id, [(':status', str(status)), ('content-type', 'text/html; charset=UTF-8'), ('content-length', str(len(payload)))])
+    while payload:
+      while not (size := min(connection.local_flow_control_window(stream_id), connection.max_outbound_frame_size)):
+        window.clear()
+        writer.write(connection.data_to_send())
+        await window.wait()
+      connection.send_data(stream_id, payload[:size])
+      payload = payload[size:]
+      writer.write(connection.data_to_send())
+    connection.end_stream(stream_id)
+    writer.write(connection.data_to_send())
@@ -0,0 +1,265 @@
+"""
+The extractors as they were before `otakudesudata.specs`: every `get_*` method walks the tree on its own.
+
+Kept as the baseline of `bench_specs.py`, which checks that the compiled specs return the same values with fewer
+tree traversals. Not used by the package.
+"""
+from bs4 import BeautifulSoup as bs
+from otakudesudata.constants import *
+import re
+
+
+class SearchResultParser:
+  @staticmethod
+  def get_anime(soup):
+    pattern = animeSearchPattern
+    elements = list(filter(lambda element: re.findall(pattern, element.a.text.lower()) if element.a else None, 
+                 filter(lambda element: not element.get('class'), soup.find_all('li'))))
+    return [
+      {
+        'title': element.a.text if element.a else None,
+        'url': element.a.get('href') if element.a else None,
+              'thumbnails': {
+                'width': element.img.get('width'),
+                'height': element.img.get('height'),
+                'url': element.img.get('src'),
+                'srcset': element.img.get('srcset').split()[::2] if element.img.get('srcset') and len(element.img.get('srcset').split()) > 1 else None,
+                } if element.img else {},
+                'genres': [
+                  {
+                    'text': genre.text,
+                    'url': genre.get('href')
+                    } for genre in element.div.find_all('a')] if element.div else [],
+                'status': element.find_all('div')[1].text.split(':')[1].strip() if len(element.find_all('div')) > 1 and ':' in element.find_all('div')[1].text else None,
+                'rating': element.find_all('div')[2].text.split(':')[1].strip() if len(element.find_all('div')) > 1 and ':' in element.find_all('div')[1].text else None,
+                } for element in elements]
+
+  @staticmethod
+  def get_episodes(soup):
+    pattern = episodeSearchPattern
+    elements = list(filter(lambda element: re.findall(pattern, element.a.text.lower()) if element.a else None, 
+                 filter(lambda element: not element.get('class'), soup.find_all('li'))))
+    return [
+      {
+        'title': element.a.text,
+        'url': element.a.get('href'),
+        'episode': re.findall(pattern, element.a.text.lower())[0] if re.findall(pattern, element.a.text.lower()) else None}
+        for element in elements
+        if element.a]
+
+  @staticmethod
+  def get_batch(soup):
+    elements = list(filter(lambda element: batchSearchPattern in element.a.text if element.a else None, filter(lambda element: not element.get('class'), soup.find_all('li'))))
+    return [
+      {'title': element.a.text,
+       'url': element.a.get('href')
+       }  for element in elements
+       if element.a]
+
+
+class AnimeParser:
+  @staticmethod
+  def get_title(soup: bs) -> str:
+    return soup.div.h1.text if soup.div and soup.div.h1 else None
+
+  @staticmethod
+  def get_details(soup: bs) ->dict:
+    detailsSection = soup.find('div', class_='infozin').find_all('span') if soup.find('div', class_='infozin') else []
+    details = {
+      animeDetailsMapping.get(detail.text.split(detailsDelimiter, 2)[0].strip().lower(), detail.text.split(detailsDelimiter, 2)[0].strip().lower()): detail.text.split(detailsDelimiter, 2)[1].strip()
+      for detail in detailsSection[:-1]
+    if detail.text and detailsDelimiter in detail.text} if detailsSection else {}
+    details['genres'] = [
+      {
+        'text': genre.text,
+        'url': genre.get('href')
+      }
+    for genre in detailsSection[-1].find_all('a')] if detailsSection else []
+    return details
+
+  @staticmethod
+  def get_feed(soup: bs) -> list:
+    feeds = soup.find_all('div', class_='isi-anime')
+    return [
+    {
+      'title': feed.text,
+      'url': feed.a.get('href') if feed.a else None,
+      'thumbnail': (feed.a.img.get('src') if feed.a.img else None) if feed.a else None
+    }
+    for feed in feeds]
+
+  @staticmethod
+  def get_description(soup: bs) -> str:
+    return soup.find('div', class_='sinopc').text if soup.find('div', class_='sinopc') else ''
+
+  @staticmethod
+  def get_seasons(soup: bs) -> list:
+    return [
+      {
+        'title': season.text,
+        'url': season.get('href')
+      }
+       for season in soup.find('div', class_='sinopc').find_all('p')[1].find_all('a')
+      ] if (element := soup.find('div', class_='sinopc')) and len(element.find_all('p')) > 1 else []
+
+  #@staticmethod
+  #def get_linked_season(soup: bs)->str:
+    #linkedSeason = soup.find('div',class_='sinopc').a if soup.find('div',class_='sinopc') else None
+    #return {
+      #'title': linkedSeason.text,
+      #'url': linkedSeason.get('href')
+    #} if linkedSeason else {}
+
+  @staticmethod
+  def get_episodes(soup: bs):
+    episodes = soup.find_all('div', class_='episodelist')[1].find_all('li') if len(soup.find_all('div', class_='episodelist')) > 1 else []
+    return [
+      {
+        'title': episode.span.text,
+        'url': episode.span.a.get('href') if episode.span.a else None,
+        'releaseDate': episode.find_all('span')[-1].text if len(episode.find_all('span')) > 1 else None
+      }
+    for episode in episodes
+    if episode.span][::-1]
+
+  @staticmethod
+  def get_batch(soup: bs) -> list:
+    spans = soup.find('div', class_='episodelist').find_all('span') if soup.find('div', class_='episodelist') else []
+    return {
+      'title': spans[0].text,
+      'url': spans[1].a.get('href'),
+      'releaseDate': spans[2].text
+    } if len(spans) > 2 else {}
+
+
+class BatchParser:
+  @staticmethod
+  def get_title(soup: bs) ->str:
+    return soup.h4.text if soup.h4 else ''
+
+  @staticmethod
+  def get_description(soup: bs) ->str:
+    return soup.find('div',class_='deskripsi').p.text.strip() if (element := soup.find('div',class_='deskripsi')) and element.p else ''
+
+  @staticmethod
+  def get_thumbnails(soup: bs)-> dict:
+    element = soup.find('div',class_='animeinfo').img if soup.find('div',class_='animeinfo') else None
+    return {
+      'url': element.get('src'),
+      'width': element.get('width'),
+      'height': element.get('height'),
+      'srcset': element.get('srcset').split()[::2] if element.get('srcset') else []
+    } if element else {}
+
+  @staticmethod
+  def get_links(soup: bs) -> dict:
+    return {
+      resolution.strong.text.replace(' ','').lower():
+      [
+        {
+          'host': link.text.strip().lower() if link.text else '',
+          'url': link.get('href')
+        }
+      for link in resolution.find_all('a')]
+    for resolution in soup.find('div', class_='download2').find_all('li')} if soup.find('div', class_='download2') else {}
+
+
+class EpisodeParser:
+  @staticmethod
+  def get_title(soup: bs) ->str:
+    return soup.h4.text if soup.h4 else ''
+
+  @staticmethod
+  def get_thumbnails(soup: bs)->dict:
+    element = soup.find('div',class_='cukder').img if soup.find('div',class_='cukder') else None
+    return {
+      'url': element.get('src'),
+      'width': element.get('width'),
+      'height': element.get('height'),
+      'srcset': element.get('srcset').split()[::2] if element.get('srcset') else []
+    } if element else {}
+
+  @staticmethod
+  def get_details(soup: bs)->dict:
+    detailsSection = soup.find('div',class_='infozingle')
+    if not detailsSection: return {}
+    uploader = soup.find('div',class_='kategoz').find_all('span')[0].text.split('by', 2)[-1].strip() if soup.find('div',class_='kategoz') and len(soup.find('div',class_='kategoz').find_all('span')) > 1 else None
+    uploadTime = soup.find('div',class_='kategoz').find_all('span')[1].text.split('on', 2)[-1].strip() if soup.find('div',class_='kategoz') and len(soup.find('div',class_='kategoz').find_all('span')) > 1 else None
+    genres = [
+        {
+          'text': genre.text,
+          'url': genre.get('href')
+        }
+        for genre in detailsSection.find_all('a')
+      ]
+    details = {
+      episodeDetailsMapping.get(detail.text.split(detailsDelimiter, 2)[0].strip().lower(), detail.text.split(detailsDelimiter, 2)[0].strip().lower()): detail.text.split(detailsDelimiter, 2)[-1].strip()
+    for detail in detailsSection.find_all('span') if detail.text and detailsDelimiter in detail.text}
+    (details.update({'uploader': uploader}), details.update({'uploadTime': uploadTime}), details.update({'genres': genres}))
+    return details
+
+  @staticmethod
+  def get_episodes(soup: bs)-> list:
+    return [
+      {
+        'title': episode.a.text.strip() ,
+        'url': episode.a.get('href')
+      }
+    for episode in soup.find('div',class_='cukder').find_all('li') if episode.a][::-1] if soup.find('div',class_='cukder') else []
+
+  @staticmethod
+  def get_links(soup: bs) -> dict:
+    return {
+      resolution.strong.text.replace(' ','').lower():
+      [
+        {
+          'host': link.text.strip().lower() if link.text else '',
+          'url': link.get('href')
+        }
+      for link in resolution.find_all('a')]
+    for resolution in soup.find('div', class_='download').find_all('li')} if soup.find('div', class_='download') else {}
+
+
+class OngoingParser:
+  @staticmethod
+  def get_releases(soup: bs):
+    releases = soup.find_all('div', class_='detpost')
+    return [
+      {
+      'title': release.h2.text if release.h2 else None,
+      'latestUpload': {
+        'uploadDate': release.find(class_='newnime').text if release.find(class_='newnime') else None,
+        'uploadDay': release.find('div', class_='epztipe').text if release.find('div', class_='epztipe') else None,
+      'episode': release.find(class_='epz').text if release.find(class_='epz') else None
+      },
+      'url': release.a.get('href') if release.a else None,
+      'thumbnail': {
+        'url': release.img.get('src'),
+        'width': release.img.get('width'),
+        'height': release.img.get('height'),
+        'srcset': release.img.get('srcset').split()[::2] if release.img.get('srcset') else []
+      } if release.img else {}
+      }
+    for release in releases
+    ]
+
+  @staticmethod
+  def get_all_pages(soup: bs)-> list:
+    return [
+      {
+        'pageNumber': int(page.text) if page.text.isnumeric() else page.text,
+        'url': page.get('href')
+      }
+     for page in soup.find_all('a',class_='page-numbers')]
+
+  @staticmethod
+  def get_previous_page(soup: bs) ->str:
+    return soup.find('a', class_='prev page-numbers').get('href') if soup.find('a', class_='prev page-numbers') else None
+
+  @staticmethod
+  def get_next_page(soup: bs) ->str:
+    return soup.find('a', class_='next page-numbers').get('href') if soup.find('a', class_='next page-numbers') else None
+
+  @staticmethod
+  def get_current_page_number(soup: bs) ->int:
+    return (int(soup.find('span', class_='page-numbers current').text) if soup.find('span', class_='page-numbers current').text.isnumeric() else soup.find('span', class_='page-numbers current').text) if soup.find('span', class_='page-numbers current') else None
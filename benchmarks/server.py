@@ -0,0 +1,148 @@
+"""
+A local stand-in for the OtakuDesu website that serves the recorded fixture pages.
+
+Every absolute link in the fixtures points to `https://otakudesu.cloud`, the server rewrites those links to its
+own address so parsers that follow them (detail enrichment, pagination) keep talking to the stand-in.
+"""
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import os
+import re
+import random
+import threading
+import time
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+ORIGIN = 'https://otakudesu.cloud'
+
+routes = [
+  (re.compile(r'^/anime/'), 'anime'),
+  (re.compile(r'^/episode/'), 'episode'),
+  (re.compile(r'^/batch/'), 'batch'),
+  (re.compile(r'^/ongoing-anime/(?:page/\d+/?)?$'), 'ongoing'),
+  (re.compile(r'^/jadwal-rilis/?$'), 'schedule'),
+  (re.compile(r'^/anime-list/?$'), 'anime_list'),
+  (re.compile(r'^/$'), 'search'),
+]
+
+_paginationPattern = re.compile(r'<div class="pagenavix">.*?</div>', re.S)
+_pagePattern = re.compile(r'/page/(\d+)/?$')
+
+
+def load_fixture(name: str) -> str:
+  """
+  Returns the raw text of a recorded fixture page (`search`, `anime`, `episode`, `batch`, `ongoing`, `schedule` or `anime_list`).
+  """
+  with open(os.path.join(FIXTURES_DIR, f'{name}.html'), encoding='utf-8') as f:
+    return f.read()
+
+
+def render_pagination(listing_url: str, page: int, last_page: int) -> str:
+  links = [
+    f'<span aria-current="page" class="page-numbers current">{number}</span>' if number == page
+    else f'<a class="page-numbers" href="{listing_url}page/{number}/">{number}</a>'
+    for number in range(1, last_page + 1)]
+  if page > 1: links.insert(0, f'<a class="prev page-numbers" href="{listing_url}page/{page - 1}/">&laquo; Sebelumnya</a>')
+  if page < last_page: links.append(f'<a class="next page-numbers" href="{listing_url}page/{page + 1}/">Berikutnya &raquo;</a>')
+  return '<div class="pagenavix">\n' + '\n'.join(links) + '\n</div>'
+
+
+class _HTTPServer(ThreadingHTTPServer):
+  daemon_threads = True
+  request_queue_size = 1024
+
+
+class FixtureServer:
+  """
+  Serves the recorded fixtures over HTTP/1.1 (keep-alive) on a background thread.
+
+  Args:
+    latency (float, optional): Seconds to wait before answering each request. Defaults to 0.
+    jitter (float, optional): Upper bound of a random extra delay added to `latency`. Defaults to 0.
+    last_page (int, optional): Number of pages the paginated listings pretend to have. Defaults to 3.
+    host (str, optional): Interface to bind. Defaults to `127.0.0.1`.
+    port (int, optional): Port to bind, 0 picks a free one. Defaults to 0.
+
+  Attributes:
+    url (str): Base URL of the running server, with a trailing slash.
+    requests (int): Number of requests answered so far.
+    connections (int): Number of TCP connections accepted so far.
+    hits (dict): Number of requests answered per fixture name.
+
+  Example:
+    >>> with FixtureServer(latency=0.05) as server:
+    ...   httpx.get(server.url + 'anime/jujutsu-kaisen-sub-indo/')
+  """
+  def __init__(self, latency: float=0, jitter: float=0, last_page: int=3, host: str='127.0.0.1', port: int=0):
+    self.latency = latency
+    self.jitter = jitter
+    self.last_page = last_page
+    self.requests = 0
+    self.connections = 0
+    self.hits = {}
+    self._lock = threading.Lock()
+    self._fixtures = {name: load_fixture(name) for _, name in routes}
+    self._thread = None
+    self.url = f'http://{host}:{self._bind(host, port)}/'
+
+  def _bind(self, host: str, port: int) -> int:
+    self._httpd = _HTTPServer((host, port), self._handler())
+    return self._httpd.server_address[1]
+
+  def _handler(self):
+    server = self
+
+    class Handler(BaseHTTPRequestHandler):
+      protocol_version = 'HTTP/1.1'
+
+      def setup(self):
+        super().setup()
+        with server._lock: server.connections += 1
+
+      def do_GET(self):
+        status, body = server.render(self.path)
+        delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+        if delay: time.sleep(delay)
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+      def log_message(self, *args):
+        pass
+
+    return Handler
+
+  def render(self, path: str) -> tuple:
+    """
+    Returns the `(status, html)` the server answers for `path`.
+    """
+    parts = urlsplit(path)
+    name = next((name for pattern, name in routes if pattern.search(parts.path)), None)
+    if name == 'search' and 's' not in parse_qs(parts.query): name = None
+    with self._lock:
+      self.requests += 1
+      if name: self.hits[name] = self.hits.get(name, 0) + 1
+    if not name: return 404, '<html><body><h1>404 Not Found</h1></body></html>'
+    html = self._fixtures[name]
+    if name == 'ongoing':
+      page = int(match.group(1)) if (match := _pagePattern.search(parts.path)) else 1
+      html = _paginationPattern.sub(lambda _: render_pagination(f'{ORIGIN}/ongoing-anime/', page, self.last_page), html, count=1)
+    return 200, html.replace(ORIGIN + '/', self.url)
+
+  def start(self):
+    self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self):
+    self._httpd.shutdown()
+    self._httpd.server_close()
+
+  def __enter__(self):
+    return self.start()
+
+  def __exit__(self, *exc):
+    self.stop()
@@ -0,0 +1,175 @@
+"""
+A soak test: runs the search, listing, detail and enrichment workloads against the local stand-in for a while and
+watches the memory of the process, so a leak shows up here rather than in a worker that has been running for days.
+
+After a few warm-up cycles (filling the bounded caches and the pooled clients), the harness records a baseline and
+then samples, every `interval` seconds, the resident set size and the memory traced by `tracemalloc`. It fails when
+either stays more than `max_growth` MB above the baseline over the last quarter of the samples. It also fails when any result holds a BeautifulSoup element: a
+`NavigableString` left in a result keeps its whole tree alive. The allocation sites that grew the most since the
+baseline are reported, to point at the leak.
+
+Usage:
+  python -m benchmarks.soak --duration 600 --max-growth 20
+  python -m benchmarks.soak --duration 3600 --latency 0.02 --frames 0 --output soak.json
+"""
+from benchmarks.server import FixtureServer
+from otakudesudata import api, search, get_ongoing, get_schedules, SearchTypes
+from otakudesudata.parser import AnimeParser, EpisodeParser, BatchParser
+from bs4.element import PageElement
+from unittest.mock import patch
+from time import perf_counter
+import argparse
+import json
+import gc
+import os
+import sys
+import tracemalloc
+
+MB = 1024 * 1024
+
+
+def rss() -> int:
+  """
+  Returns the resident set size of the process in bytes (the peak size where `/proc` is not available).
+  """
+  try:
+    with open('/proc/self/statm') as f:
+      return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+  except (OSError, ValueError, IndexError):
+    import resource
+    # kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def retained_elements(value) -> int:
+  """
+  Counts the BeautifulSoup elements held by a result (nested dictionaries, lists and tuples included).
+  """
+  if isinstance(value, PageElement): return 1
+  if isinstance(value, dict): return sum(retained_elements(item) for item in value.values())
+  if isinstance(value, (list, tuple)): return sum(retained_elements(item) for item in value)
+  return 0
+
+
+def default_workloads(url: str) -> dict:
+  """
+  Returns the workloads of one cycle, by name, run against the stand-in at `url`.
+  """
+  return {
+    'search': lambda: search('jujutsu kaisen', search_type=SearchTypes.all, get_anime_details=True, get_episode_details=True,
+                             get_batch_details=True, normalize=True, raise_exception=True),
+    'ongoing': lambda: get_ongoing(get_all=True),
+    'schedules': lambda: get_schedules(days='monday', get_latest_episode=True, raise_exception=True),
+    'details': lambda: [
+      AnimeParser(url + 'anime/jujutsu-kaisen-sub-indo/', normalize=True).results,
+      EpisodeParser(url + 'episode/jujutsu-kaisen-episode-1-sub-indo/').results,
+      BatchParser(url + 'batch/jujutsu-kaisen-batch-sub-indo/').results
+    ],
+  }
+
+
+def _sample(start: float, cycles: int, baseline: dict) -> dict:
+  gc.collect()
+  traced, _ = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+  # the traces of tracemalloc itself grow with the number of live blocks, they are not counted as growth
+  resident = rss() - tracemalloc.get_tracemalloc_memory()
+  return {
+    'elapsed': perf_counter() - start,
+    'cycles': cycles,
+    'rss': resident,
+    'traced': traced,
+    'rssGrowth': (resident - baseline['rss']) / MB if baseline else 0.0,
+    'tracedGrowth': (traced - baseline['traced']) / MB if baseline else 0.0
+  }
+
+
+def soak(duration: float=60, interval: float=5, warmup: int=3, max_growth: float=20, top: int=10, latency: float=0,
+         frames: int=1, workloads=default_workloads, report=None) -> dict:
+  """
+  Runs the workloads in cycles for `duration` seconds against a local stand-in and tracks the memory of the process.
+
+  Args:
+    duration (float, optional): Seconds to keep cycling after the warm-up. Defaults to 60.
+    interval (float, optional): Seconds between memory samples. Defaults to 5.
+    warmup (int, optional): Cycles run before the baseline is taken. Defaults to 3.
+    max_growth (float, optional): MB the resident set or the traced memory may grow past the baseline. Defaults to 20.
+    top (int, optional): Allocation sites reported. Defaults to 10.
+    latency (float, optional): Seconds the stand-in waits before every answer. Defaults to 0.
+    frames (int, optional): Frames `tracemalloc` keeps per allocation. Tracing slows the workloads down about three
+      times with one frame and much more with more; 0 does not trace and only watches the resident set. Defaults to 1.
+    workloads (callable, optional): Returns the workloads by name for the stand-in URL. Defaults to `default_workloads`.
+    report (callable, optional): Called with every sample as it is taken. Defaults to None.
+
+  Returns:
+    dict: The `cycles` run, every `samples` (elapsed seconds, cycles, `rss` and `traced` bytes and their growth in MB),
+    the `growth` in MB (the lowest of the last quarter of the samples), the `top` allocation sites by growth (`where`, `sizeDiff`, `countDiff`),
+    `retainedElements` (BeautifulSoup elements found in the results) and whether the soak `passed`.
+  """
+  with FixtureServer(latency=latency) as server, patch.multiple(api, baseUrl=server.url, ongoingUrl=server.url + 'ongoing-anime/',
+                                                                animeListUrl=server.url + 'anime-list/', schedulesUrl=server.url + 'jadwal-rilis/'):
+    tasks = workloads(server.url)
+    def cycle():
+      return sum(retained_elements(task()) for task in tasks.values())
+    retained = sum(cycle() for _ in range(warmup))
+    if frames: tracemalloc.start(frames)
+    try:
+      start = perf_counter()
+      baseline = _sample(start, 0, None)
+      snapshot = tracemalloc.take_snapshot() if frames else None
+      samples, cycles = [], 0
+      next_sample = start + interval
+      while perf_counter() - start < duration:
+        retained += cycle()
+        cycles += 1
+        if perf_counter() >= next_sample:
+          samples.append(_sample(start, cycles, baseline))
+          if report: report(samples[-1])
+          next_sample += interval
+      samples.append(final := _sample(start, cycles, baseline))
+      if report: report(final)
+      sites = tracemalloc.take_snapshot().compare_to(snapshot, 'traceback')[:top] if frames else []
+    finally:
+      tracemalloc.stop()
+  # the lowest of the last quarter of the samples: a leak keeps raising it, a transient peak does not
+  recent = samples[-max(1, len(samples) // 4):]
+  growth = {'rss': min(sample['rssGrowth'] for sample in recent), 'traced': min(sample['tracedGrowth'] for sample in recent)}
+  return {
+    'cycles': cycles,
+    'samples': samples,
+    'growth': growth,
+    'top': [{'where': [str(frame) for frame in site.traceback], 'sizeDiff': site.size_diff, 'countDiff': site.count_diff} for site in sites],
+    'retainedElements': retained,
+    'passed': max(growth.values()) <= max_growth and not retained
+  }
+
+
+def main(args: list=None) -> int:
+  parser = argparse.ArgumentParser(prog='python -m benchmarks.soak', description='Soak test the library against the local stand-in and watch its memory.')
+  parser.add_argument('--duration', type=float, default=600, help='seconds to keep cycling after the warm-up')
+  parser.add_argument('--interval', type=float, default=10, help='seconds between memory samples')
+  parser.add_argument('--warmup', type=int, default=3, help='cycles run before the baseline is taken')
+  parser.add_argument('--max-growth', type=float, default=20, help='MB the resident set or the traced memory may grow')
+  parser.add_argument('--top', type=int, default=10, help='allocation sites reported')
+  parser.add_argument('--latency', type=float, default=0, help='seconds the stand-in waits before every answer')
+  parser.add_argument('--frames', type=int, default=1, help='frames traced per allocation, 0 to watch the resident set only')
+  parser.add_argument('--output', default=None, help='write the full report to this JSON file')
+  options = parser.parse_args(args)
+  def report(sample):
+    print(f'{sample["elapsed"]:8.1f}s {sample["cycles"]:6d} cycles  rss {sample["rss"] / MB:8.1f} MB ({sample["rssGrowth"]:+.2f})'
+          f'  traced {sample["traced"] / MB:8.1f} MB ({sample["tracedGrowth"]:+.2f})', flush=True)
+  result = soak(options.duration, options.interval, options.warmup, options.max_growth, options.top, options.latency, options.frames, report=report)
+  print('\nallocation sites that grew the most:')
+  for site in result['top']:
+    print(f'{site["sizeDiff"] / 1024:+10.1f} KiB {site["countDiff"]:+8d} blocks  {site["where"][-1]}')
+  if result['retainedElements']: print(f'\n{result["retainedElements"]} BeautifulSoup elements are held by results')
+  print(f'\n{"passed" if result["passed"] else "FAILED"}: grew {result["growth"]["rss"]:+.2f} MB resident, '
+        f'{result["growth"]["traced"]:+.2f} MB traced (limit {options.max_growth} MB)')
+  if options.output:
+    with open(options.output, 'w', encoding='utf-8') as f:
+      json.dump(result, f, indent=2)
+  return 0 if result['passed'] else 1
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,320 @@
+from otakudesudata.constants import *
+from otakudesudata import fetch, normalize, parser
+from time import perf_counter
+import datetime
+import random
+
+
+class SearchTypes:
+  anime = 'anime'
+  batch = 'batch'
+  episode = 'episode'
+  all = None
+
+
+def search(query: str, search_type: SearchTypes=SearchTypes.anime, timeout=10, proxy=None, **kwargs):
+  """
+  Searches for anime, episodes, or batch data on the OtakuDesu website.
+
+  Args:
+    query (str): The search query string to look for.
+    search_type (SearchTypes, optional): The type of search to perform. Defaults to `SearchTypes.anime`.
+      - `SearchTypes.anime`: Search for anime titles.
+      - `SearchTypes.episode`: Search for episodes.
+      - `SearchTypes.batch`: Search for batch downloads.
+      - `SearchTypes.all`: Search for all types.
+    timeout (int, optional): Timeout duration (in seconds) for the HTTP request. Defaults to 10.
+    proxy (str or ProxyPool, optional): Proxy URL to be used for the HTTP request, or a pool of proxies (see `otakudesudata.proxies`). Defaults to None.
+    **kwargs: Additional keyword arguments passed to `SearchResultParser`. These include:
+      - user_agent (str, optional): Custom User-Agent header for the HTTP request. Defaults to a rotating user agent.
+      - get_anime_detail (bool, optional): Whether to fetch detailed information for each anime. Defaults to False.
+      - get_latest_episode (bool, optional): Whether to fetch the details and download links of the latest episode of each
+        anime into its `latestEpisode` (fetches the anime details too). Defaults to False.
+      - get_episode_details (bool, optional): Whether to fetch detailed information for each episode. Defaults to False.
+      - get_batch_details (bool, optional): Whether to fetch detailed information for each batch. Defaults to False.
+      - update_details (bool, optional): whether to update each anime details during fetching anime details
+      - client_max_connections (int, optional): The maximum number of client concurrent connections that may be established during fetching other details. Default to 100
+      - max_keepalive_connections (int, optional): Allow the connection pool to maintain keep-alive connections below this point. Should be less than or equal to `client_max_connections`. Default to 20% of `client_max_connections`.
+      - keepalive_expiry (float, optional): Time limit on idle keep-alive connections in seconds. Default to 5 seconds.
+      - http2 (bool, optional): Whether to fetch other details over HTTP/2, multiplexing them over a few connections. Requires `pip install httpx[http2]`. Defaults to False.
+      - raise_exception (bool, optional): Whether to raise exceptions while fetching additional details. Defaults to False.
+      - mirrors (MirrorSet, optional): Mirrors of the site to send every request to the fastest healthy one, failing
+        over to the next one (see `otakudesudata.mirrors`). Defaults to None.
+      - resolve_links (bool or LinkResolver, optional): Whether to resolve the download links of the fetched episodes and
+        batches to the URL of the file they end at (see `otakudesudata.resolver`). Defaults to False.
+      - normalize (bool, optional): Whether to add parsed companions (`ratingValue`, `releaseDateIso`, `durationSeconds`,
+        ...) next to the raw string fields of the results (see `otakudesudata.normalize`). Defaults to False.
+      - archive (WarcWriter or str, optional): An archive (or archive directory) every fetched page is written to, to
+        parse them again offline (see `otakudesudata.archive`). Defaults to None.
+      - deadline (float, optional): Seconds the whole call may take, enrichment included. The detail fetches still
+        running when it expires are cancelled and the results are returned as enriched so far, every enriched item
+        flagged with `fetchStatus`: 'ok', 'error' (with the exception name in `fetchError`) or 'timeout'. Detail
+        fetches that fail no longer cancel the others. Defaults to None (no deadline, no flags).
+      - hedge (HedgePolicy, optional): Sends a duplicate of a detail fetch that is slower than most, to the next mirror
+        when `mirrors` is set, and uses the first response (see `otakudesudata.hedging`). Defaults to None.
+      - scheduler (RequestScheduler, optional): Queues every request of the call by priority with the other requests
+        sharing the scheduler (see `otakudesudata.scheduler`). Defaults to the scheduler installed for the process, if any.
+      - priority (str, optional): The priority class of the requests, 'interactive', 'normal' or 'bulk'. Defaults to 'interactive'.
+
+  Returns:
+    dictionary: A dictionary of parsed search results.  containing:
+      - anime list
+      - episodes list
+      - batch list
+
+  Example:
+    ```python
+    from otakudesudata import search, SearchTypes
+
+    # Search for anime
+    results = search("One Piece", search_type=SearchTypes.anime)
+    print(results['anime'])
+
+    # Search for episodes
+    results = search("One Piece Episode 1000", search_type=SearchTypes.episode)
+    print(results['episodes'])
+
+    # Search for batch downloads
+    results = search("One Piece Batch", search_type=SearchTypes.batch)
+    print(results['batch'])
+
+      # Search for all types
+    results = search("One Piece", search_type=SearchTypes.all)
+    print(results['anime'])
+    print(results['episodes'])
+    print(results['batch'])
+      ```
+    """
+  params = {'s': query, 'post_type': search_type} if search_type else {'s': query}
+  kwargs.setdefault('priority', 'interactive')
+  r = parser.fetch_within_deadline(baseUrl, kwargs, params=params, timeout=timeout, proxy=proxy)
+  return parser.SearchResultParser(r.text, timeout=timeout, proxy=proxy, **kwargs).results
+
+def get_ongoing(get_all: bool=False, use_cache: bool=True, timeout: int=10, proxy: str=None, **kwargs: dict):
+  """
+  Fetches the list of ongoing anime from the OtakuDesu website.
+
+  Args:
+    get_all (bool, optional): Whether to get all ongoing anime from all pages, fetched concurrently. Defaults to False.
+    use_cache (bool, optional): Whether to use the cached data. Defaults to True.
+    timeout (int, optional): Timeout duration (in seconds) for the HTTP request. Defaults to 10.
+    proxy (str or ProxyPool, optional): Proxy URL to be used for the HTTP request, or a pool of proxies (see `otakudesudata.proxies`). Defaults to None.
+    **kwargs: Additional keyword arguments:
+      - user_agent (str, optional): Custom User-Agent header for the HTTP request. Defaults to a rotating user agent.
+      - cache (TTLCache, optional): A page cache shared between calls, so pages fetched by a previous call are not fetched
+        again until they expire. Defaults to a new cache for every call.
+      - cache_size (int, optional): The maximum number of pages kept by a new cache. Defaults to 64.
+      - cache_ttl (float, optional): Seconds a page of a new cache stays valid. Defaults to 300.
+      - mirrors (MirrorSet, optional): Mirrors of the site, see `otakudesudata.mirrors`. Defaults to None.
+      - normalize (bool, optional): Whether to add `uploadDateIso` and `episodeNumber` next to the raw fields of every
+        release (see `otakudesudata.normalize`). Defaults to False.
+      - archive (WarcWriter or str, optional): An archive every fetched page is written to (see `otakudesudata.archive`).
+        Defaults to None.
+      - deadline (float, optional): Seconds the call may take. With `get_all`, the pages not fetched by then are left
+        out of the result. Defaults to None.
+      - hedge (HedgePolicy, optional): Hedges the concurrent page fetches of `get_all` (see `otakudesudata.hedging`).
+        Defaults to None.
+      - scheduler (RequestScheduler, optional), priority (str, optional): Queue the requests by priority (see
+        `otakudesudata.scheduler`). Defaults to the installed scheduler and 'normal'.
+
+  Returns:
+    list: A list of parsed ongoing anime. Each item is a dictionary containing anime details such as title, URL, latestEpisode, thumbnails, and more.
+
+  Example:
+    ```python
+    from otakudesudata import get_ongoing
+
+    # Get the list of ongoing anime
+    ongoing_anime = get_ongoing()
+    print(ongoing_anime)
+    ```
+  """
+  return _listing(parser.OngoingParser, ongoingUrl, get_all, use_cache, timeout, proxy, kwargs)
+
+
+def get_completed(get_all: bool=False, use_cache: bool=True, timeout: int=10, proxy: str=None, **kwargs: dict):
+  """
+  Fetches the list of completed anime from the OtakuDesu website.
+
+  Args:
+    get_all (bool, optional): Whether to get the completed anime of every page, fetched concurrently. Defaults to False.
+    use_cache (bool, optional): Whether to use the cached data. Defaults to True.
+    timeout (int, optional): Timeout duration (in seconds) for the HTTP request. Defaults to 10.
+    proxy (str or ProxyPool, optional): Proxy URL to be used for the HTTP request, or a pool of proxies. Defaults to None.
+    **kwargs: The additional keyword arguments of `get_ongoing`.
+
+  Returns:
+    ListingParser or list: The parser of the first page (see `ListingParser`), or a list of every completed anime when `get_all` is True.
+
+  Example:
+    >>> from otakudesudata import get_completed
+    >>> completed = get_completed()
+    >>> completed.pages(range(2, 5))  # pages 2 to 4, fetched concurrently
+  """
+  return _listing(parser.ListingParser, completedUrl, get_all, use_cache, timeout, proxy, kwargs)
+
+
+def get_genre(genre: str, get_all: bool=False, use_cache: bool=True, timeout: int=10, proxy: str=None, **kwargs: dict):
+  """
+  Fetches the list of anime of a genre from the OtakuDesu website.
+
+  Args:
+    genre (str): The genre slug (e.g. 'action') or the `url` of a genre returned by the other parsers (`genres[].url`).
+    get_all (bool, optional): Whether to get the anime of every page, fetched concurrently. Defaults to False.
+    use_cache (bool, optional): Whether to use the cached data. Defaults to True.
+    timeout (int, optional): Timeout duration (in seconds) for the HTTP request. Defaults to 10.
+    proxy (str or ProxyPool, optional): Proxy URL to be used for the HTTP request, or a pool of proxies. Defaults to None.
+    **kwargs: The additional keyword arguments of `get_ongoing`.
+
+  Returns:
+    GenreParser or list: The parser of the first page (see `GenreParser`), or a list of every anime of the genre when `get_all` is True.
+
+  Example:
+    >>> from otakudesudata import search, get_genre
+    >>> anime = search('jujutsu kaisen')['anime'][0]
+    >>> action = get_genre(anime['genres'][0]['url'], get_all=True)
+  """
+  url = genre if genre.startswith(('http://', 'https://')) else f'{genreUrl}{genre.strip("/")}/'
+  return _listing(parser.GenreParser, url, get_all, use_cache, timeout, proxy, kwargs)
+
+
+def _listing(parserClass, url: str, get_all: bool, use_cache: bool, timeout: int, proxy, kwargs: dict):
+  deadline = kwargs.get('deadline')
+  expires = perf_counter() + deadline if deadline is not None else None
+  listing = parserClass(
+    url,
+    use_cache=use_cache,
+    cache=kwargs.get('cache'),
+    cache_size=kwargs.get('cache_size', 64),
+    cache_ttl=kwargs.get('cache_ttl', 300),
+    timeout=timeout if deadline is None else min(timeout, max(deadline, 0)),
+    proxy=proxy,
+    mirrors=kwargs.get('mirrors'),
+    archive=kwargs.get('archive'),
+    hedge=kwargs.get('hedge'),
+    scheduler=kwargs.get('scheduler'),
+    priority=kwargs.get('priority'),
+    normalize=kwargs.get('normalize', False),
+    headers={'User-Agent': kwargs.get('user_agent', random.choice(userAgents))}
+  )
+  if not get_all: return listing
+  # the pages after the first are fetched concurrently
+  return list(listing.pages(deadline=None if expires is None else max(expires - perf_counter(), 0)))
+
+
+def get_schedules(days=None, **kwargs: dict):
+  """
+  Retrieves the anime release schedules from the OtakuDesu website.
+
+  This function sends an HTTP GET request to the schedules URL, parses the HTML response,
+  and extracts the anime release schedules grouped by day. The result is returned as a dictionary
+  where the keys are the days of the week and the values are lists of anime titles and their URLs.
+
+  The scheduled anime can be enriched like search results: their details and latest episodes are fetched
+  concurrently, in one round of requests over one pooled client (at most `client_max_connections` at once), after
+  the schedule is restricted to `days`.
+
+  Parameters:
+    days (str or iterable, optional): The days to return, as keys of the result ('monday', ..., 'random'), the
+      Indonesian day names of the site ('senin', ...) or 'today'. Defaults to every day.
+    **kwargs (dict): Optional keyword arguments to customize the request:
+      - user_agent (str): A custom User-Agent string for the HTTP request. Defaults to a random choice from `userAgents`.
+      - timeout (int): The timeout value for the HTTP request in seconds. Defaults to 10 seconds.
+      - proxy (str or ProxyPool): A proxy URL to use for the HTTP request, or a pool of proxies. Defaults to None.
+      - mirrors (MirrorSet): Mirrors of the site, see `otakudesudata.mirrors`. Defaults to None.
+      - get_anime_details (bool): Whether to fetch the details, episodes and batch of every scheduled anime. Defaults to False.
+      - get_latest_episode (bool): Whether to fetch the details and download links of the latest episode of every
+        scheduled anime into its `latestEpisode` (fetches the anime details too). Defaults to False.
+      - update_details, client_max_connections, max_keepalive_connections, keepalive_expiry, http2, raise_exception,
+        resolve_links, normalize, archive, deadline, hedge, scheduler, priority: as for `search`.
+
+  Returns:
+    dict: A dictionary where the keys are days of the week (e.g., "monday", "tuesday") + "random" and the values
+    are lists of dictionaries containing:
+      - 'title' (str): The title of the anime.
+      - 'url' (str): The URL of the anime.
+      - the anime details and 'latestEpisode' (dict), when requested.
+
+  Example:
+    >>> from otakudesudata import get_schedules
+    >>> schedules = get_schedules()
+    >>> # Print the anime schedule for Monday
+    >>> print(schedules['monday'])
+    >>> # today's anime with the download links of their latest episode
+    >>> today = get_schedules(days='today', get_latest_episode=True)
+  """
+  kwargs.setdefault('priority', 'interactive')
+  response = parser.fetch_within_deadline(schedulesUrl, kwargs)
+  soup = parser.make_soup(response.text, schedulesUrl)
+  schedules = {
+    dayMapping.get(day.h2.text.strip().lower(), day.h2.text.strip().lower()): [
+      {
+        'title': anime.text.strip() if anime.text else None,
+        'url': anime.get('href')
+      }
+    for anime in day.find_all('a')]
+   for day in soup.find_all('div', class_='kglist321')
+   if day.h2}
+  if days is not None:
+    wanted = {_day(day) for day in ([days] if isinstance(days, str) else days)}
+    schedules = {day: anime for day, anime in schedules.items() if day in wanted}
+  # an anime listed on several days (and under 'random') is fetched once
+  scheduled = {}
+  for anime in (anime for day in schedules.values() for anime in day):
+    scheduled.setdefault(anime['url'] or id(anime), []).append(anime)
+  parser.AsyncParser.run_details(_Scheduled([same[0] for same in scheduled.values()]), **kwargs)
+  for first, *others in scheduled.values():
+    for anime in others: anime.update(first)
+  if kwargs.get('normalize'): normalize.annotate(schedules)
+  return schedules
+
+
+class _Scheduled:
+  # the scheduled anime, in the shape `AsyncParser.run_details` enriches
+  def __init__(self, anime: list):
+    self.anime = anime
+
+
+def _day(day: str) -> str:
+  day = day.strip().lower()
+  if day == 'today': return ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')[datetime.date.today().weekday()]
+  return dayMapping.get(day, day)
+
+def get_anime_list(**kwargs: dict)->list:
+  """
+  Fetches a list of anime from the OtakuDesu website.
+
+  This function sends an HTTP GET request to the anime list URL of the OtakuDesu website,
+  parses the HTML response, and extracts the anime titles and their corresponding URLs.
+
+  Args:
+    **kwargs: Arbitrary keyword arguments.
+      - user_agent (str, optional): A custom User-Agent string to use in the request headers.
+        If not provided, a random User-Agent will be selected from the `userAgents` list.
+      - timeout (int, optional): The timeout value for the HTTP request in seconds. Defaults to 10 seconds.
+      - proxy (str or ProxyPool, optional): A proxy URL to use for the HTTP request, or a pool of proxies.
+      - mirrors (MirrorSet, optional): Mirrors of the site, see `otakudesudata.mirrors`. Defaults to None.
+
+  Returns:
+    list: A list of dictionaries, where each dictionary contains:
+      - 'title' (str): The title of the anime.
+      - 'url' (str): The URL of the anime.
+
+  Example:
+    >>>from otakudesudata import get_anime_list
+    >>> anime_list = get_anime_list(user_agent="CustomUserAgent", timeout=15)
+    >>> # Print the first anime title and URL
+    >>> print(f"Title: {anime_list[0]['title']}, URL: {anime_list[0]['url']}")
+    
+    # Output:
+    [{'title': 'Anime Title 1', 'url': 'https://otakudesu.cloud/anime1'}, ...]
+    """
+  response = fetch.get(animeListUrl, **kwargs)
+  soup = parser.make_soup(response.text, animeListUrl)
+  animeListElements = soup.find_all('a',class_='hodebgst')
+  return [
+    {
+      'title': animeListElement.text.strip(),
+      'url': animeListElement.get('href')
+    }if animeListElement.text else None
+  for animeListElement in animeListElements]
@@ -0,0 +1,303 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from urllib.parse import urlsplit
+import argparse
+import base64
+import datetime
+import gzip
+import hashlib
+import os
+import threading
+import uuid
+
+# response headers that describe the transfer rather than the archived body, which is stored decoded
+_transferHeaders = ('content-encoding', 'transfer-encoding', 'content-length')
+# page kind -> the parser re-run on archived pages of that kind
+parserNames = {'anime': 'AnimeParser', 'episode': 'EpisodeParser', 'batch': 'BatchParser', 'ongoing': 'OngoingParser'}
+
+
+def _record(warcType: str, headers: dict, block: bytes, recordId: str=None) -> bytes:
+  lines = [f'WARC-Type: {warcType}', f'WARC-Record-ID: {recordId or _record_id()}', *(f'{name}: {value}' for name, value in headers.items()),
+           f'Content-Length: {len(block)}']
+  return ('WARC/1.1\r\n' + '\r\n'.join(lines) + '\r\n\r\n').encode('utf-8') + block + b'\r\n\r\n'
+
+
+def _record_id() -> str:
+  return f'<urn:uuid:{uuid.uuid4()}>'
+
+
+def _digest(data: bytes) -> str:
+  return 'sha1:' + base64.b32encode(hashlib.sha1(data).digest()).decode('ascii')
+
+
+class WarcWriter:
+  """
+  Archives fetched responses (URL, request and response headers, body and time) to gzip compressed WARC files in
+  `directory`, so pages can be parsed again later without fetching them (see `reparse`).
+
+  Every fetch function and parser takes the writer (or a directory, see `archive_for`) as its `archive` option.
+  Each record is a gzip member of its own, the format of `.warc.gz` files read by the usual WARC tools. The
+  response body is stored decoded, so the headers describing its transfer (`Content-Encoding`,
+  `Transfer-Encoding`) are dropped and `Content-Length` is the length of the stored body. A file is closed and a
+  new one started once it reaches `max_size` bytes; files are named after the writing process, so several
+  processes can archive to the same directory.
+
+  Args:
+    directory (str): The directory of the archive. It is created if missing.
+    max_size (int, optional): The size in bytes at which a new file is started. Defaults to 64 MiB.
+    prefix (str, optional): The start of the file names. Defaults to 'otakudesu'.
+
+  Methods:
+    write(response: httpx.Response):
+      Archives a response, thread-safe.
+    close():
+      Closes the current file.
+
+  Example:
+    >>> from otakudesudata.archive import WarcWriter
+    >>> from otakudesudata.parser import AnimeParser
+    >>> archive = WarcWriter('archive')
+    >>> AnimeParser('https://otakudesu.cloud/anime/jujutsu-kaisen-sub-indo/', archive=archive)
+  """
+  def __init__(self, directory: str, max_size: int=64 << 20, prefix: str='otakudesu'):
+    self.directory = directory
+    self.max_size = max_size
+    self.prefix = prefix
+    self.path = None
+    self._file = None
+    self._serial = 0
+    self._lock = threading.Lock()
+    os.makedirs(directory, exist_ok=True)
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  def _open(self) -> None:
+    self._serial += 1
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%d%H%M%S')
+    self.path = os.path.join(self.directory, f'{self.prefix}-{stamp}-{os.getpid()}-{self._serial:05d}.warc.gz')
+    self._file = open(self.path, 'ab')
+    info = b'software: otakudesudata\r\nformat: WARC File Format 1.1\r\n'
+    self._file.write(gzip.compress(_record('warcinfo', {'WARC-Date': _now(), 'WARC-Filename': os.path.basename(self.path),
+                                                         'Content-Type': 'application/warc-fields'}, info)))
+
+  def write(self, response) -> None:
+    request = response.request
+    date = _now()
+    target = str(request.url)
+    body = response.content
+    headers = ''.join(f'{name}: {value}\r\n' for name, value in response.headers.multi_items() if name.lower() not in _transferHeaders)
+    block = (f'{response.http_version} {response.status_code} {response.reason_phrase}\r\n{headers}Content-Length: {len(body)}\r\n\r\n').encode('utf-8') + body
+    requestBlock = (f'{request.method} {request.url.raw_path.decode("ascii")} {response.http_version}\r\n'
+                    + ''.join(f'{name}: {value}\r\n' for name, value in request.headers.multi_items()) + '\r\n').encode('utf-8')
+    responseHeaders = {'WARC-Date': date, 'WARC-Target-URI': target, 'Content-Type': 'application/http;msgtype=response',
+                       'WARC-Payload-Digest': _digest(body)}
+    responseId = _record_id()
+    responseRecord = _record('response', responseHeaders, block, responseId)
+    requestRecord = _record('request', {'WARC-Date': date, 'WARC-Target-URI': target, 'WARC-Concurrent-To': responseId,
+                                        'Content-Type': 'application/http;msgtype=request'}, requestBlock)
+    data = gzip.compress(responseRecord) + gzip.compress(requestRecord)
+    with self._lock:
+      if self._file is None: self._open()
+      self._file.write(data)
+      self._file.flush()
+      if self._file.tell() >= self.max_size: self._close()
+
+  def _close(self) -> None:
+    if self._file is not None: self._file.close()
+    self._file = None
+
+  def close(self) -> None:
+    with self._lock:
+      self._close()
+
+
+def _now() -> str:
+  return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+_writers = {}
+_writersLock = threading.Lock()
+
+
+def archive_for(option) -> WarcWriter:
+  """
+  Returns the writer of an `archive` option: the option itself when it is a `WarcWriter`, otherwise the writer of
+  the directory it names, shared by every fetch of the process.
+  """
+  if isinstance(option, WarcWriter): return option
+  directory = os.path.abspath(option)
+  with _writersLock:
+    if directory not in _writers: _writers[directory] = WarcWriter(directory)
+    return _writers[directory]
+
+
+def files(path: str) -> list:
+  """
+  Returns the `.warc.gz` files of an archive directory in name order, or `[path]` for a single file.
+  """
+  if not os.path.isdir(path): return [path]
+  return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith('.warc.gz'))
+
+
+def records(path: str):
+  """
+  Iterates the records of a `.warc.gz` file or of every file of an archive directory, as dictionaries containing
+  `type`, `url`, `date`, `headers` (the WARC headers) and `block` (bytes). A file cut short, such as the one a
+  crashed process was writing, ends at its last complete record.
+  """
+  for name in files(path):
+    with gzip.open(name, 'rb') as file:
+      while True:
+        try:
+          if not (line := file.readline()): break
+          if not line.strip(): continue
+          headers = {}
+          while (line := file.readline()) not in (b'\r\n', b'\n', b''):
+            key, _, value = line.decode('utf-8').partition(':')
+            headers[key.strip()] = value.strip()
+          block = file.read(length := int(headers.get('Content-Length', 0)))
+        except (EOFError, gzip.BadGzipFile, ValueError):
+          break
+        if len(block) < length: break
+        yield {'type': headers.get('WARC-Type'), 'url': headers.get('WARC-Target-URI'), 'date': headers.get('WARC-Date'),
+               'headers': headers, 'block': block}
+
+
+def responses(path: str):
+  """
+  Iterates the archived responses of a `.warc.gz` file or an archive directory, as dictionaries containing `url`,
+  `date`, `status` (int), `headers` (dict, lower case names) and `body` (bytes).
+  """
+  for record in records(path):
+    if record['type'] != 'response': continue
+    head, _, body = record['block'].partition(b'\r\n\r\n')
+    statusLine, *lines = head.decode('utf-8', 'replace').split('\r\n')
+    headers = {}
+    for line in lines:
+      name, _, value = line.partition(':')
+      headers[name.strip().lower()] = value.strip()
+    status = statusLine.split(' ', 2)
+    yield {'url': record['url'], 'date': record['date'], 'status': int(status[1]) if len(status) > 1 and status[1].isdigit() else None,
+           'headers': headers, 'body': body}
+
+
+def page_kind(url: str) -> str:
+  """
+  Returns the parser kind of an archived page ('anime', 'episode', 'batch' or 'ongoing'), or None.
+  """
+  path = urlsplit(url or '').path
+  if path.startswith('/ongoing-anime/'): return 'ongoing'
+  return next((kind for kind in ('anime', 'episode', 'batch') if path.startswith(f'/{kind}/')), None)
+
+
+def _text(response: dict) -> str:
+  charset = next((part.split('=', 1)[1].strip('"\' ') for part in response['headers'].get('content-type', '').split(';') if part.strip().startswith('charset=')), 'utf-8')
+  try:
+    return response['body'].decode(charset, 'replace')
+  except LookupError:
+    return response['body'].decode('utf-8', 'replace')
+
+
+def _results(parser):
+  results = parser.results
+  return {key: value for key, value in results.items() if not key.startswith('_')} if isinstance(results, dict) else results
+
+
+def _batches(path: str, kinds: tuple, size: int):
+  # the pages to parse, read in order and sent to the workers `size` at a time
+  batch = []
+  for response in responses(path):
+    if response['status'] != 200 or (kind := page_kind(response['url'])) not in kinds: continue
+    batch.append((response['url'], kind, response['date'], _text(response)))
+    if len(batch) >= size:
+      yield batch
+      batch = []
+  if batch: yield batch
+
+
+def _reparse_batch(batch: list, kwargs: dict) -> list:
+  from otakudesudata import parser as parsers
+  pages = []
+  for url, kind, date, text in batch:
+    try:
+      pages.append((url, kind, date, _results(getattr(parsers, parserNames[kind]).from_html(text, url, **kwargs)), None))
+    except Exception as e:
+      pages.append((url, kind, date, None, f'{type(e).__name__}: {e}'))
+  return pages
+
+
+def reparse(path: str, kinds: tuple=tuple(parserNames), processes: int=None, batch_size: int=16, **kwargs: dict) -> dict:
+  """
+  Runs the parsers again over the pages of an archive, without any request: every archived 200 response of an
+  anime, episode, batch or ongoing page is parsed with `AnimeParser`, `EpisodeParser`, `BatchParser` or
+  `OngoingParser` (`Parser.from_html`). The archive is read in this process and its pages are parsed in parallel on
+  `processes` processes, `batch_size` pages at a time, so a single large file uses every worker.
+
+  Args:
+    path (str): An archive directory or a single `.warc.gz` file.
+    kinds (tuple, optional): The page kinds to parse. Defaults to all of them.
+    processes (int, optional): Worker processes, 0 to parse in this process. Defaults to one per CPU.
+    batch_size (int, optional): Pages sent to a worker process at once. Defaults to 16.
+    **kwargs (dict): Parser options that need no network, e.g. `normalize=True`.
+
+  Returns:
+    dict: For every parsed URL (the latest archived copy of it), a dictionary containing `kind`, `date` (of the
+    archived response), `result` (the parser's results) and `error` (None, or the exception of a failed parse).
+
+  Example:
+    >>> from otakudesudata.archive import reparse
+    >>> pages = reparse('archive', kinds=('anime',))
+    >>> pages['https://otakudesu.cloud/anime/jujutsu-kaisen-sub-indo/']['result']['details']['title']
+    'Jujutsu Kaisen'
+  """
+  unknown = set(kinds) - set(parserNames)
+  if unknown: raise ValueError(f'unknown page kinds: {", ".join(sorted(unknown))}')
+  batches = _batches(path, tuple(kinds), batch_size)
+  pages = {}
+  def merge(parsed):
+    for url, kind, date, result, error in parsed:
+      if url not in pages or date >= pages[url]['date']: pages[url] = {'kind': kind, 'date': date, 'result': result, 'error': error}
+  if processes == 0:
+    for batch in batches: merge(_reparse_batch(batch, kwargs))
+    return pages
+  workers = processes or os.cpu_count() or 1
+  with ProcessPoolExecutor(max_workers=workers) as executor:
+    # a few batches ahead of the workers, so the archive is not read into memory at once; merged in archive order
+    pending = deque()
+    for batch in batches:
+      pending.append(executor.submit(_reparse_batch, batch, kwargs))
+      if len(pending) >= 2 * workers: merge(pending.popleft().result())
+    while pending: merge(pending.popleft().result())
+  return pages
+
+
+def main(args: list=None) -> None:
+  parser = argparse.ArgumentParser(prog='python -m otakudesudata.archive', description='Parses the pages of a WARC archive again, offline.')
+  parser.add_argument('archive', help='archive directory (or .warc.gz file) written with the archive option')
+  parser.add_argument('--kinds', nargs='+', default=list(parserNames), choices=list(parserNames), help='page kinds to parse')
+  parser.add_argument('--processes', type=int, default=None, help='worker processes, defaults to one per CPU')
+  parser.add_argument('--batch-size', type=int, default=16, help='pages sent to a worker process at once')
+  parser.add_argument('--normalize', action='store_true', help='add parsed dates and numbers (see otakudesudata.normalize)')
+  parser.add_argument('--output', default=None, help='write the (url, kind, result) triples to this file (see otakudesudata.serialization)')
+  parser.add_argument('--snapshot', default=None, help='write the results to this snapshot file (see otakudesudata.snapshot)')
+  options = parser.parse_args(args)
+  pages = reparse(options.archive, tuple(options.kinds), options.processes, options.batch_size, **({'normalize': True} if options.normalize else {}))
+  triples = [(url, page['kind'], page['result']) for url, page in pages.items() if page['error'] is None]
+  for url, page in pages.items():
+    if page['error']: print(f'{url}: {page["error"]}')
+  print(f'parsed {len(triples)} pages, {len(pages) - len(triples)} failed')
+  if options.output:
+    from otakudesudata import serialization
+    with open(options.output, 'wb') as file:
+      serialization.dump(triples, file)
+  if options.snapshot:
+    from otakudesudata.snapshot import write_snapshot
+    print(f'wrote {write_snapshot(options.snapshot, [triple for triple in triples if isinstance(triple[2], dict)])} results to {options.snapshot}')
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,116 @@
+from collections import OrderedDict
+import threading
+import time
+
+_missing = object()
+
+
+class TTLCache:
+  """
+  A thread-safe mapping bounded to `maxsize` entries (least recently used entries are evicted first) whose
+  entries expire `ttl` seconds after they were stored.
+
+  Args:
+    maxsize (int, optional): The maximum number of entries. Defaults to 128.
+    ttl (float, optional): Seconds an entry stays valid, None for no expiry. Defaults to 300.
+    timer (callable, optional): The clock used for expiry. Defaults to `time.monotonic`.
+
+  Attributes:
+    hits (int): Number of lookups that found a valid entry.
+    misses (int): Number of lookups that found nothing or an expired entry.
+    hit_rate (float): `hits / (hits + misses)`, 0 before the first lookup.
+
+  Example:
+    >>> from otakudesudata.cache import TTLCache
+    >>> cache = TTLCache(maxsize=32, ttl=600)
+    >>> cache['key'] = 'value'
+    >>> cache.get('key')
+    'value'
+  """
+  def __init__(self, maxsize: int=128, ttl: float=300, timer=time.monotonic):
+    if maxsize < 1: raise ValueError('maxsize must be at least 1')
+    self.maxsize = maxsize
+    self.ttl = ttl
+    self.timer = timer
+    self.hits = 0
+    self.misses = 0
+    self._data = OrderedDict()
+    self._lock = threading.RLock()
+
+  def _lookup(self, key, now: float):
+    entry = self._data.get(key, _missing)
+    if entry is _missing: return _missing
+    if entry[0] is not None and entry[0] <= now:
+      del self._data[key]
+      return _missing
+    self._data.move_to_end(key)
+    return entry[1]
+
+  def get(self, key, default=None):
+    with self._lock:
+      value = self._lookup(key, self.timer())
+      if value is _missing:
+        self.misses += 1
+        return default
+      self.hits += 1
+      return value
+
+  def peek(self, key, default=None):
+    """
+    Returns the value stored for `key` like `get`, without counting the lookup or refreshing its recency.
+    """
+    with self._lock:
+      entry = self._data.get(key, _missing)
+      return default if entry is _missing or (entry[0] is not None and entry[0] <= self.timer()) else entry[1]
+
+  def set(self, key, value, ttl: float=_missing) -> None:
+    ttl = self.ttl if ttl is _missing else ttl
+    with self._lock:
+      self._data[key] = (self.timer() + ttl if ttl is not None else None, value)
+      self._data.move_to_end(key)
+      while len(self._data) > self.maxsize:
+        self._data.popitem(last=False)
+
+  def pop(self, key, default=None):
+    with self._lock:
+      entry = self._data.pop(key, _missing)
+      return default if entry is _missing else entry[1]
+
+  def expire(self) -> int:
+    """
+    Drops every expired entry and returns how many were dropped.
+    """
+    with self._lock:
+      now = self.timer()
+      expired = [key for key, (expiry, _) in self._data.items() if expiry is not None and expiry <= now]
+      for key in expired:
+        del self._data[key]
+      return len(expired)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._data.clear()
+
+  @property
+  def hit_rate(self) -> float:
+    lookups = self.hits + self.misses
+    return self.hits / lookups if lookups else 0.0
+
+  def __getitem__(self, key):
+    value = self.get(key, _missing)
+    if value is _missing: raise KeyError(key)
+    return value
+
+  def __setitem__(self, key, value):
+    self.set(key, value)
+
+  def __delitem__(self, key):
+    if self.pop(key, _missing) is _missing: raise KeyError(key)
+
+  def __contains__(self, key):
+    return self.peek(key, _missing) is not _missing
+
+  def __len__(self):
+    with self._lock:
+      self.expire()
+      return len(self._data)
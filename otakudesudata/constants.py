@@ -2,6 +2,11 @@ baseUrl = 'https://otakudesu.cloud/'
 ongoingUrl = 'https://otakudesu.cloud/ongoing-anime/'
 animeListUrl = 'https://otakudesu.cloud/anime-list/'
 schedulesUrl = 'https://otakudesu.cloud/jadwal-rilis/'
+completedUrl = 'https://otakudesu.cloud/complete-anime/'
+# followed by the genre, e.g. 'action/'
+genreUrl = 'https://otakudesu.cloud/genres/'
+# base URLs serving the same site, see `otakudesudata.mirrors.MirrorSet`
+mirrorUrls = [baseUrl]
 
 userAgent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36'
 
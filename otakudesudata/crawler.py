@@ -0,0 +1,320 @@
+from otakudesudata.parser import AnimeParser, EpisodeParser, BatchParser
+from otakudesudata.snapshot import write_snapshot
+from otakudesudata import serialization
+from concurrent.futures import ThreadPoolExecutor
+from abc import ABC, abstractmethod
+from urllib.parse import urlsplit
+import argparse
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+crawlKinds = {'anime': AnimeParser, 'episode': EpisodeParser, 'batch': BatchParser}
+
+
+def classify(url: str) -> str:
+  """
+  Returns which parser handles `url` ('anime', 'episode' or 'batch'), or None when it is not a crawlable page.
+  """
+  path = urlsplit(url or '').path
+  return next((kind for kind in crawlKinds if path.startswith(f'/{kind}/')), None)
+
+
+class Task:
+  """
+  A leased unit of crawl work.
+
+  Attributes:
+    url (str): The URL of the page to crawl.
+    kind (str): The page type ('anime', 'episode' or 'batch').
+    depth (int): How many links away from a seed the page was discovered.
+    attempts (int): How many times the task was leased, including this lease.
+    lease_until (float): Timestamp after which the lease expires and the task can be leased by another worker.
+    worker (str): The worker holding the lease.
+  """
+  __slots__ = ('url', 'kind', 'depth', 'attempts', 'lease_until', 'worker')
+
+  def __init__(self, url: str, kind: str, depth: int=0, attempts: int=1, lease_until: float=None, worker: str=None):
+    self.url = url
+    self.kind = kind
+    self.depth = depth
+    self.attempts = attempts
+    self.lease_until = lease_until
+    self.worker = worker
+
+  def __repr__(self):
+    return f'Task({self.url!r}, {self.kind!r}, depth={self.depth}, attempts={self.attempts})'
+
+
+class WorkQueue(ABC):
+  """
+  The interface every crawl work queue backend implements. URLs are unique: putting a known URL again is a no-op,
+  which deduplicates pages discovered by several workers. A leased task that is neither acknowledged nor failed
+  before its lease expires (e.g. its worker crashed) is handed out again.
+
+  Methods:
+    put(url: str, kind: str, depth: int = 0) -> bool:
+      Enqueues a URL. Returns False if the URL was already known.
+    lease(worker: str, count: int = 1, lease_time: float = 300) -> list:
+      Leases up to `count` pending (or expired) tasks to `worker` for `lease_time` seconds.
+    ack(task: Task, result: dict) -> bool:
+      Marks a leased task as done and stores its result. Returns False when the lease was lost (it expired and the
+      task was leased again, or given up), the result is then dropped.
+    fail(task: Task, error: str) -> bool:
+      Marks a leased task as failed. It is retried until it was leased `max_attempts` times. Returns False when the
+      lease was lost, like `ack`.
+    stats() -> dict:
+      Returns the number of tasks in every state.
+    results(kind: str = None):
+      Iterates over `(url, kind, result)` of every finished task.
+  """
+  @abstractmethod
+  def put(self, url: str, kind: str, depth: int=0) -> bool:
+    ...
+
+  def put_many(self, tasks) -> int:
+    return sum(self.put(*task) for task in tasks)
+
+  @abstractmethod
+  def lease(self, worker: str, count: int=1, lease_time: float=300) -> list:
+    ...
+
+  @abstractmethod
+  def ack(self, task: Task, result: dict) -> bool:
+    ...
+
+  @abstractmethod
+  def fail(self, task: Task, error: str) -> bool:
+    ...
+
+  @abstractmethod
+  def stats(self) -> dict:
+    ...
+
+  @abstractmethod
+  def results(self, kind: str=None):
+    ...
+
+
+class SQLiteWorkQueue(WorkQueue):
+  """
+  A `WorkQueue` stored in a SQLite database file, shared by every worker (threads or processes) that opens it. The
+  workers must run on one host: the database is in WAL mode, which does not work on a network filesystem. Results
+  are stored with `serialization.dumps` (MessagePack when msgpack is installed).
+
+  Args:
+    path (str): The path of the database file. It is created if missing.
+    max_attempts (int, optional): How many times a task is leased before it is given up as failed. Defaults to 3.
+    timer (callable, optional): The clock used for leases. Defaults to `time.time`.
+
+  Example:
+    >>> from otakudesudata.crawler import SQLiteWorkQueue
+    >>> queue = SQLiteWorkQueue('crawl.db')
+    >>> queue.put('https://otakudesu.cloud/anime/one-piece-sub-indo/', 'anime')
+    >>> tasks = queue.lease('worker-1', count=10)
+  """
+  schema = '''
+    CREATE TABLE IF NOT EXISTS tasks (
+      url TEXT PRIMARY KEY,
+      kind TEXT NOT NULL,
+      depth INTEGER NOT NULL DEFAULT 0,
+      state TEXT NOT NULL DEFAULT 'pending',
+      worker TEXT,
+      lease_until REAL,
+      attempts INTEGER NOT NULL DEFAULT 0,
+      error TEXT,
+      result BLOB,
+      updated REAL
+    );
+    CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, lease_until);
+  '''
+
+  def __init__(self, path: str, max_attempts: int=3, timer=time.time):
+    self.path = path
+    self.max_attempts = max_attempts
+    self.timer = timer
+    self._lock = threading.Lock()
+    self._connection = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+    self._connection.execute('PRAGMA journal_mode=WAL')
+    self._connection.executescript(self.schema)
+
+  def _transaction(self, function, *args):
+    with self._lock:
+      self._connection.execute('BEGIN IMMEDIATE')
+      try:
+        value = function(*args)
+      except BaseException:
+        self._connection.execute('ROLLBACK')
+        raise
+      self._connection.execute('COMMIT')
+      return value
+
+  def put(self, url: str, kind: str, depth: int=0) -> bool:
+    return self.put_many([(url, kind, depth)]) == 1
+
+  def put_many(self, tasks) -> int:
+    rows = [(task[0], task[1], task[2] if len(task) > 2 else 0) for task in tasks]
+    def put():
+      now = self.timer()
+      return sum(self._connection.execute('INSERT OR IGNORE INTO tasks (url, kind, depth, updated) VALUES (?, ?, ?, ?)', (*row, now)).rowcount for row in rows)
+    return self._transaction(put)
+
+  def lease(self, worker: str, count: int=1, lease_time: float=300) -> list:
+    def lease():
+      now = self.timer()
+      rows = self._connection.execute(
+        "SELECT url, kind, depth, attempts FROM tasks WHERE (state = 'pending' OR (state = 'leased' AND lease_until <= ?)) AND attempts < ? "
+        "ORDER BY depth, updated LIMIT ?", (now, self.max_attempts, count)).fetchall()
+      tasks = [Task(url, kind, depth, attempts + 1, now + lease_time, worker) for url, kind, depth, attempts in rows]
+      self._connection.executemany(
+        "UPDATE tasks SET state = 'leased', worker = ?, lease_until = ?, attempts = ?, updated = ? WHERE url = ?",
+        [(worker, task.lease_until, task.attempts, now, task.url) for task in tasks])
+      self._connection.execute(
+        "UPDATE tasks SET state = 'failed', error = coalesce(error, 'lease expired') WHERE state = 'leased' AND lease_until <= ? AND attempts >= ?",
+        (now, self.max_attempts))
+      return tasks
+    return self._transaction(lease)
+
+  # only the lease the task was handed out with: once it expired, the task may be leased again (by this worker too)
+  _leased = "WHERE url = ? AND worker = ? AND attempts = ? AND state = 'leased'"
+
+  def ack(self, task: Task, result: dict) -> bool:
+    return self._transaction(lambda: self._connection.execute(
+      "UPDATE tasks SET state = 'done', result = ?, error = NULL, lease_until = NULL, updated = ? " + self._leased,
+      (serialization.dumps(result), self.timer(), task.url, task.worker, task.attempts)).rowcount == 1)
+
+  def fail(self, task: Task, error: str) -> bool:
+    return self._transaction(lambda: self._connection.execute(
+      "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, error = ?, lease_until = NULL, updated = ? " + self._leased,
+      (self.max_attempts, error, self.timer(), task.url, task.worker, task.attempts)).rowcount == 1)
+
+  def stats(self) -> dict:
+    with self._lock:
+      counts = dict(self._connection.execute('SELECT state, count(*) FROM tasks GROUP BY state').fetchall())
+    return {state: counts.get(state, 0) for state in ('pending', 'leased', 'done', 'failed')}
+
+  def results(self, kind: str=None):
+    with self._lock:
+      rows = self._connection.execute(
+        "SELECT url, kind, result FROM tasks WHERE state = 'done'" + (' AND kind = ?' if kind else ''), (kind,) if kind else ()).fetchall()
+    for url, kind, result in rows:
+      yield url, kind, serialization.loads(result)
+
+  def close(self) -> None:
+    self._connection.close()
+
+
+class Crawler:
+  """
+  Crawler runs a crawl worker over a `WorkQueue`: it leases URLs, runs `AnimeParser`, `EpisodeParser` or
+  `BatchParser` on them, enqueues the episode, batch and season pages discovered on anime pages and acknowledges
+  each result. Any number of crawlers (threads, processes, or nodes with a queue they can all reach) can work on the same queue.
+
+  Args:
+    queue (WorkQueue): The shared work queue.
+    worker (str, optional): The name of this worker, recorded with its leases. Defaults to `<hostname>-<pid>`.
+    lease_time (float, optional): Seconds a leased task is reserved for this worker. Defaults to 300.
+    batch_size (int, optional): How many tasks are leased at once. Defaults to 10.
+    max_depth (int, optional): Pages further than this many links from a seed are not enqueued. Defaults to None (no limit).
+    follow (tuple, optional): Which links of an anime page are followed, among 'episodes', 'batch' and 'seasons'.
+      Defaults to all three.
+    **kwargs (dict): Options passed to `get_anime_list` and to the parsers (user_agent, timeout, proxy, ...). Requests
+      are 'bulk' for a `RequestScheduler` unless `priority` is given.
+
+  Methods:
+    seed() -> int:
+      Enqueues every anime of `get_anime_list`. Returns how many were new.
+    process(task: Task) -> dict:
+      Runs the parser of a task, enqueues the pages it links to and returns its result.
+    run(concurrency: int = 1, max_tasks: int = None, idle_timeout: float = 0) -> int:
+      Works until the queue is drained (or `max_tasks` were processed). With `idle_timeout`, waits up to that many
+      seconds for other workers to enqueue more work before stopping. Returns the number of processed tasks.
+
+  Example:
+    >>> from otakudesudata.crawler import Crawler, SQLiteWorkQueue
+    >>> crawler = Crawler(SQLiteWorkQueue('crawl.db'))
+    >>> crawler.seed()
+    >>> crawler.run(concurrency=8)
+    >>> for url, kind, result in crawler.queue.results('anime'):
+    ...   print(result['title'])
+  """
+  def __init__(self, queue: WorkQueue, worker: str=None, lease_time: float=300, batch_size: int=10, max_depth: int=None,
+               follow: tuple=('episodes', 'batch', 'seasons'), **kwargs: dict):
+    self.queue = queue
+    self.worker = worker or f'{socket.gethostname()}-{os.getpid()}'
+    self.lease_time = lease_time
+    self.batch_size = batch_size
+    self.max_depth = max_depth
+    self.follow = follow
+    self._kwargs = {'priority': 'bulk', **kwargs}
+
+  def seed(self) -> int:
+    from otakudesudata import get_anime_list
+    return self.queue.put_many((anime['url'], 'anime', 0) for anime in get_anime_list(**self._kwargs) if anime and classify(anime.get('url')) == 'anime')
+
+  def discover(self, task: Task, result: dict) -> list:
+    if task.kind != 'anime' or (self.max_depth is not None and task.depth >= self.max_depth): return []
+    urls = []
+    if 'episodes' in self.follow: urls += [episode.get('url') for episode in result.get('episodes', [])]
+    if 'batch' in self.follow: urls += [result.get('batch', {}).get('url')]
+    if 'seasons' in self.follow: urls += [season.get('url') for season in result.get('seasons', [])]
+    return [(url, kind, task.depth + 1) for url in urls if (kind := classify(url))]
+
+  def process(self, task: Task) -> dict:
+    result = dict(crawlKinds[task.kind](task.url, **self._kwargs).results)
+    self.queue.put_many(self.discover(task, result))
+    return result
+
+  def _work(self, task: Task) -> bool:
+    # False when the task failed or its lease was lost (another worker crawls it again)
+    try:
+      result = self.process(task)
+    except Exception as e:
+      self.queue.fail(task, f'{type(e).__name__}: {e}')
+      return False
+    return self.queue.ack(task, result)
+
+  def run(self, concurrency: int=1, max_tasks: int=None, idle_timeout: float=0) -> int:
+    processed = 0
+    idle_since = None
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+      while max_tasks is None or processed < max_tasks:
+        count = min(self.batch_size * concurrency, max_tasks - processed) if max_tasks is not None else self.batch_size * concurrency
+        tasks = self.queue.lease(self.worker, count=count, lease_time=self.lease_time)
+        if not tasks:
+          idle_since = idle_since or time.monotonic()
+          if time.monotonic() - idle_since >= idle_timeout: break
+          time.sleep(min(1, idle_timeout))
+          continue
+        idle_since = None
+        list(executor.map(self._work, tasks))
+        processed += len(tasks)
+    return processed
+
+
+def main(args: list=None) -> None:
+  parser = argparse.ArgumentParser(prog='python -m otakudesudata.crawler', description='Runs a crawl worker over a shared SQLite work queue.')
+  parser.add_argument('database', help='path of the SQLite work queue, shared by every worker')
+  parser.add_argument('--seed', action='store_true', help='enqueue every anime of the anime list before working')
+  parser.add_argument('--concurrency', type=int, default=4, help='pages crawled at the same time by this worker')
+  parser.add_argument('--max-tasks', type=int, default=None, help='stop after this many tasks')
+  parser.add_argument('--idle-timeout', type=float, default=30, help='seconds to wait for new work before stopping')
+  parser.add_argument('--lease-time', type=float, default=300, help='seconds before a task leased by a crashed worker is handed out again')
+  parser.add_argument('--proxy', default=None)
+  parser.add_argument('--timeout', type=float, default=10)
+  parser.add_argument('--normalize', action='store_true', help='store parsed dates and numbers next to the raw fields (see otakudesudata.normalize)')
+  parser.add_argument('--archive', default=None, help='archive every fetched page to WARC files in this directory (see otakudesudata.archive)')
+  parser.add_argument('--snapshot', default=None, help='write every result of the queue to this snapshot file when done (see otakudesudata.snapshot)')
+  options = parser.parse_args(args)
+  crawler = Crawler(SQLiteWorkQueue(options.database), lease_time=options.lease_time, proxy=options.proxy, timeout=options.timeout,
+                    normalize=options.normalize, archive=options.archive)
+  if options.seed: print(f'seeded {crawler.seed()} anime')
+  print(f'processed {crawler.run(concurrency=options.concurrency, max_tasks=options.max_tasks, idle_timeout=options.idle_timeout)} tasks')
+  print(crawler.queue.stats())
+  if options.snapshot: print(f'wrote {write_snapshot(options.snapshot, crawler.queue.results())} results to {options.snapshot}')
+
+
+if __name__ == '__main__':
+  main()
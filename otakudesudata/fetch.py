@@ -0,0 +1,214 @@
+from otakudesudata.constants import userAgents
+from otakudesudata import metrics, proxies, scheduler
+from otakudesudata.archive import archive_for
+from time import perf_counter
+import importlib.util
+import asyncio
+import functools
+import httpx
+import random
+
+
+@functools.lru_cache(maxsize=None)
+def accept_encoding() -> str:
+  """
+  Returns the `Accept-Encoding` header value listing every content encoding httpx can decode in this environment:
+  gzip and deflate always, Brotli when `brotli`/`brotlicffi` is installed and Zstandard when `zstandard` is installed.
+  """
+  encodings = ['gzip', 'deflate']
+  if any(importlib.util.find_spec(name) for name in ('brotli', 'brotlicffi')): encodings.append('br')
+  if importlib.util.find_spec('zstandard'): encodings.append('zstd')
+  return ', '.join(encodings)
+
+
+def get_headers(kwargs: dict) -> dict:
+  return {
+    'User-Agent': kwargs.get('user_agent') or random.choice(userAgents),
+    'Accept-Encoding': kwargs.get('accept_encoding') or accept_encoding(),
+    **(kwargs.get('headers') or {})
+  }
+
+
+def async_client(**kwargs: dict) -> httpx.AsyncClient:
+  """
+  Builds the pooled asynchronous client used to fetch additional details.
+
+  Args:
+    **kwargs (dict): Optional keyword arguments:
+      - proxy (str or ProxyPool): Proxy to use for every request. Defaults to None.
+      - client_max_connections (int): The maximum number of concurrent connections. Defaults to 100.
+      - max_keepalive_connections (int): Connections the pool keeps alive. Defaults to 20% of `client_max_connections`.
+      - keepalive_expiry (float): Time limit on idle keep-alive connections in seconds. Defaults to 5.
+      - http2 (bool): Whether to negotiate HTTP/2, multiplexing concurrent requests to the same origin over a few
+        connections instead of one connection per request. Requires the `h2` package (`pip install httpx[http2]`). Defaults to False.
+      - http1 (bool): Whether to allow HTTP/1.1. Setting it to False together with `http2=True` speaks HTTP/2 without
+        negotiation (prior knowledge), which also works over plain `http://`. Defaults to True.
+
+  Returns:
+    httpx.AsyncClient: The client, to be used as an async context manager.
+  """
+  return httpx.AsyncClient(
+    # with a `ProxyPool` requests go through the pool's own per-proxy clients, see `aget`
+    proxy=None if isinstance(kwargs.get('proxy'), proxies.ProxyPool) else kwargs.get('proxy'),
+    **client_options(kwargs)
+  )
+
+
+def client_options(kwargs: dict) -> dict:
+  """
+  Returns the `http1`, `http2` and `limits` arguments of an httpx client from the client options of `async_client`.
+  """
+  max = kwargs.get('client_max_connections', 100)
+  _20percentage = int(20 * max / 100)
+  keepalive = kwargs.get('max_keepalive_connections', _20percentage if _20percentage > 1 else 1)
+  return {
+    'http1': kwargs.get('http1', True),
+    'http2': kwargs.get('http2', False),
+    'limits': httpx.Limits(max_connections=max, max_keepalive_connections=keepalive, keepalive_expiry=kwargs.get('keepalive_expiry', 5))
+  }
+
+
+def get(url: str, params: dict=None, **kwargs: dict) -> httpx.Response:
+  """
+  Sends a synchronous GET request the way every parser does and emits a 'fetch' instrumentation event.
+
+  Args:
+    url (str): The URL to fetch.
+    params (dict, optional): Query parameters. Defaults to None.
+    **kwargs (dict): Optional keyword arguments:
+      - user_agent (str): Custom User-Agent header. Defaults to a random choice from `userAgents`.
+      - timeout (int): Timeout for the HTTP request in seconds. Defaults to 10.
+      - proxy (str or ProxyPool): Proxy to use for the HTTP request, or a pool of proxies routing it to the best
+        one and retrying it on another (see `otakudesudata.proxies`). Defaults to None.
+      - accept_encoding (str): `Accept-Encoding` header. Defaults to every encoding httpx can decode (see `accept_encoding`).
+      - headers (dict): Extra request headers, overriding the ones above. Defaults to None.
+      - mirrors (MirrorSet): Mirrors of the site; a URL on any of them is sent to the fastest healthy one and
+        retried on the next one when it fails (see `otakudesudata.mirrors`). Defaults to None.
+      - archive (WarcWriter or str): An archive (or archive directory) every response is written to as WARC records,
+        to parse the pages again offline later (see `otakudesudata.archive`). Defaults to None.
+      - scheduler (RequestScheduler): Queues the request by priority with the other requests sharing the scheduler
+        (see `otakudesudata.scheduler`). Defaults to the scheduler installed for the process, if any.
+      - priority (str): The priority class of the request, 'interactive', 'normal' or 'bulk'. Defaults to 'normal'.
+
+  Returns:
+    httpx.Response: The response.
+  """
+  if (mirrors := kwargs.get('mirrors')) is None: return _get(url, params, kwargs)
+  candidates = mirrors.candidates(url)
+  for position, (mirror, target) in enumerate(candidates, 1):
+    try:
+      response = _get(target, params, kwargs)
+    except httpx.TransportError as e:
+      if mirror is None or position == len(candidates): raise
+      _failover(mirrors, mirror, e)
+      continue
+    if response.status_code < 500 or mirror is None or position == len(candidates): return response
+    _failover(mirrors, mirror, httpx.HTTPStatusError(f'{response.status_code}', request=response.request, response=response))
+
+
+def _get(url: str, params: dict, kwargs: dict) -> httpx.Response:
+  if (chosen := kwargs.get('scheduler') or scheduler.installed()) is None: return _send(url, params, kwargs)
+  with chosen.slot(kwargs.get('priority')):
+    return _send(url, params, kwargs)
+
+
+def _send(url: str, params: dict, kwargs: dict) -> httpx.Response:
+  options = {'params': params, 'headers': get_headers(kwargs), 'timeout': kwargs.get('timeout', 10)}
+  if isinstance(proxy := kwargs.get('proxy'), proxies.ProxyPool):
+    response = proxy.send(lambda chosen: _timed(url, lambda: proxy.client(chosen).get(url, **options)))
+  else:
+    response = _timed(url, lambda: httpx.get(url, proxy=proxy, **options))
+  if kwargs.get('archive') is not None: archive_for(kwargs['archive']).write(response)
+  return response
+
+
+def _timed(url: str, send) -> httpx.Response:
+  if not metrics.enabled('fetch'): return send()
+  start = perf_counter()
+  try:
+    response = send()
+  except Exception as e:
+    metrics.emit('fetch', url=url, error=type(e).__name__, elapsed=perf_counter() - start)
+    raise
+  metrics.emit('fetch', url=url, status=response.status_code, bytes=len(response.content), elapsed=perf_counter() - start)
+  return response
+
+
+def _failover(mirrors, mirror: str, error: Exception) -> None:
+  mirrors.failed(mirror)
+  metrics.emit('error', where='mirrors', error=type(error).__name__, mirror=mirror)
+
+
+async def aget(client: httpx.AsyncClient, url: str, **kwargs: dict) -> httpx.Response:
+  """
+  Sends an asynchronous GET request over `client` and emits a 'fetch' instrumentation event, including the
+  connect, time-to-first-byte and download phases of the request.
+
+  Args:
+    client (httpx.AsyncClient): The client (and connection pool) to send the request with.
+    url (str): The URL to fetch.
+    **kwargs (dict): Optional keyword arguments:
+      - user_agent (str): Custom User-Agent header. Defaults to a random choice from `userAgents`.
+      - timeout (int): Timeout for the HTTP request in seconds. Defaults to 10.
+      - accept_encoding (str): `Accept-Encoding` header. Defaults to every encoding httpx can decode (see `accept_encoding`).
+      - headers (dict): Extra request headers, overriding the ones above. Defaults to None.
+      - mirrors (MirrorSet): Mirrors of the site, as for `get`. Defaults to None.
+      - proxy (ProxyPool): A pool of proxies, the request is sent over the pool's client of the proxy it is routed to
+        instead of `client`. A single proxy is set on `client` itself. Defaults to None.
+      - archive (WarcWriter or str): An archive every response is written to, as for `get`. Defaults to None.
+      - hedge (HedgePolicy): Sends a duplicate of a request that is slower than most, to the next mirror when
+        `mirrors` is set, and uses the first response (see `otakudesudata.hedging`). Defaults to None.
+      - scheduler (RequestScheduler), priority (str): Queue the request by priority, as for `get`.
+
+  Returns:
+    httpx.Response: The response.
+  """
+  if (hedge := kwargs.get('hedge')) is None: return await _amirrored(client, url, kwargs)
+  return await hedge.asend(lambda attempt: _amirrored(client, url, kwargs, attempt), url)
+
+
+async def _amirrored(client: httpx.AsyncClient, url: str, kwargs: dict, attempt: int=0) -> httpx.Response:
+  if (mirrors := kwargs.get('mirrors')) is None: return await _aget(client, url, kwargs)
+  # ranking may probe the mirrors (blocking) on first use, keep that off the event loop
+  candidates = await asyncio.to_thread(mirrors.candidates, url)
+  # a hedged duplicate starts on the next mirror
+  candidates = candidates[attempt:] + candidates[:attempt]
+  for position, (mirror, target) in enumerate(candidates, 1):
+    try:
+      response = await _aget(client, target, kwargs)
+    except httpx.TransportError as e:
+      if mirror is None or position == len(candidates): raise
+      _failover(mirrors, mirror, e)
+      continue
+    if response.status_code < 500 or mirror is None or position == len(candidates): return response
+    _failover(mirrors, mirror, httpx.HTTPStatusError(f'{response.status_code}', request=response.request, response=response))
+
+
+async def _aget(client: httpx.AsyncClient, url: str, kwargs: dict) -> httpx.Response:
+  if (chosen := kwargs.get('scheduler') or scheduler.installed()) is None: return await _asend(client, url, kwargs)
+  async with chosen.aslot(kwargs.get('priority')):
+    return await _asend(client, url, kwargs)
+
+
+async def _asend(client: httpx.AsyncClient, url: str, kwargs: dict) -> httpx.Response:
+  options = {'headers': get_headers(kwargs), 'timeout': kwargs.get('timeout', 10)}
+  if isinstance(proxy := kwargs.get('proxy'), proxies.ProxyPool):
+    response = await proxy.asend(lambda chosen: _atimed(proxy.async_client(chosen), url, options))
+  else:
+    response = await _atimed(client, url, options)
+  # compressing and writing the record is kept off the event loop
+  if kwargs.get('archive') is not None: await asyncio.to_thread(archive_for(kwargs['archive']).write, response)
+  return response
+
+
+async def _atimed(client: httpx.AsyncClient, url: str, options: dict) -> httpx.Response:
+  if not metrics.enabled('fetch'): return await client.get(url, **options)
+  tracer = metrics.Tracer()
+  start = perf_counter()
+  try:
+    response = await client.get(url, **options, extensions={'trace': tracer})
+  except Exception as e:
+    metrics.emit('fetch', url=url, error=type(e).__name__, elapsed=perf_counter() - start, **tracer.phases)
+    raise
+  metrics.emit('fetch', url=url, status=response.status_code, bytes=len(response.content), elapsed=perf_counter() - start, **tracer.phases)
+  return response
@@ -0,0 +1,119 @@
+from otakudesudata import metrics
+from collections import deque
+from time import perf_counter
+import threading
+import asyncio
+
+
+class HedgePolicy:
+  """
+  Hedged requests for the asynchronous fetches of additional details: when a request has not answered after the
+  `percentile` latency of the recent requests, a duplicate is sent, the first response is used and the other
+  request is cancelled. A few slow pages then no longer hold up a whole `get_details` run.
+
+  Pass a `HedgePolicy` as `hedge=` to any function or parser. The duplicate goes to the next mirror when `mirrors=`
+  is set, and usually to another proxy of a `ProxyPool` (a proxy with a request in flight ranks lower). Hedges are
+  limited to `budget` times the requests sent, so a slow site does not get twice the load.
+
+  Args:
+    percentile (float, optional): Latency percentile (0-100) of the recent requests after which a duplicate is sent. Defaults to 95.
+    window (int, optional): Recent request latencies the percentile is computed over. Defaults to 200.
+    min_samples (int, optional): Latencies recorded before the percentile is used. Defaults to 20.
+    initial_delay (float, optional): Seconds after which a duplicate is sent until `min_samples` latencies are
+      recorded. Defaults to None (no hedging until then).
+    min_delay (float, optional): The shortest delay in seconds. Defaults to 0.05.
+    max_delay (float, optional): The longest delay in seconds. Defaults to None (no limit).
+    budget (float, optional): The most hedges sent per request. Defaults to 0.1.
+
+  Attributes:
+    stats (dict): `requests` sent through the policy, hedges `issued` and hedges `won` (the duplicate answered first).
+
+  Example:
+    >>> from otakudesudata import search
+    >>> from otakudesudata.hedging import HedgePolicy
+    >>> hedge = HedgePolicy(percentile=90)
+    >>> results = search('one piece', get_anime_details=True, hedge=hedge)
+    >>> hedge.stats
+    {'requests': 10, 'issued': 1, 'won': 1}
+  """
+  def __init__(self, percentile: float=95, window: int=200, min_samples: int=20, initial_delay: float=None,
+               min_delay: float=0.05, max_delay: float=None, budget: float=0.1):
+    if not 0 < percentile <= 100: raise ValueError('percentile must be in (0, 100]')
+    self.percentile = percentile
+    self.min_samples = min_samples
+    self.initial_delay = initial_delay
+    self.min_delay = min_delay
+    self.max_delay = max_delay
+    self.budget = budget
+    self.stats = {'requests': 0, 'issued': 0, 'won': 0}
+    self._latencies = deque(maxlen=window)
+    self._lock = threading.Lock()
+
+  def __repr__(self):
+    return f'HedgePolicy(percentile={self.percentile!r}, budget={self.budget!r})'
+
+  def observe(self, elapsed: float) -> None:
+    """
+    Records the latency of a request in seconds.
+    """
+    with self._lock:
+      self._latencies.append(elapsed)
+
+  def delay(self) -> float:
+    """
+    Returns the seconds after which a duplicate of a request is sent, None when no duplicate is sent yet.
+    """
+    with self._lock:
+      if len(self._latencies) < self.min_samples:
+        delay = self.initial_delay
+      else:
+        latencies = sorted(self._latencies)
+        delay = latencies[min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))]
+    if delay is None: return None
+    delay = max(delay, self.min_delay)
+    return min(delay, self.max_delay) if self.max_delay is not None else delay
+
+  def _allow(self) -> bool:
+    with self._lock:
+      if self.stats['issued'] + 1 > self.budget * self.stats['requests']: return False
+      self.stats['issued'] += 1
+      return True
+
+  async def asend(self, request, url: str=None):
+    """
+    Sends a request hedged by the policy: `request(attempt)` returns an awaitable of the response, `attempt` being 0
+    for the request and 1 for its duplicate. Returns the first response, or raises the error of the request when both fail.
+    """
+    with self._lock:
+      self.stats['requests'] += 1
+    start = perf_counter()
+    primary = asyncio.ensure_future(request(0))
+    delay = self.delay()
+    try:
+      if delay is not None: await asyncio.wait((primary,), timeout=delay)
+      if delay is None or primary.done() or not self._allow():
+        response = await primary
+        self.observe(perf_counter() - start)
+        return response
+    except BaseException:
+      primary.cancel()
+      raise
+    duplicate = asyncio.ensure_future(request(1))
+    attempts = (primary, duplicate)
+    try:
+      pending = set(attempts)
+      while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for attempt in (task for task in attempts if task in done):
+          if attempt.exception() is not None: continue
+          won = attempt is duplicate
+          if won:
+            with self._lock: self.stats['won'] += 1
+          # one latency per request, from the original send: what the caller waited, whichever attempt answered
+          self.observe(elapsed := perf_counter() - start)
+          metrics.emit('hedge', url=url, delay=delay, won=won, elapsed=elapsed)
+          return attempt.result()
+      metrics.emit('hedge', url=url, delay=delay, won=False, error=type(primary.exception()).__name__)
+      raise primary.exception()
+    finally:
+      for attempt in attempts: attempt.cancel()
@@ -0,0 +1,264 @@
+from urllib.parse import urlsplit
+from time import perf_counter
+import threading
+import functools
+import logging
+
+_hooks = {}
+_logger = logging.getLogger(__name__)
+
+events = ('fetch', 'tree', 'parse', 'cache', 'error', 'hedge')
+
+
+def add_hook(event: str, callback=None):
+  """
+  Registers a callback that is called every time `event` is emitted.
+
+  Args:
+    event (str): One of the instrumentation events:
+      - 'fetch': emitted after every HTTP request with `url`, `status`, `bytes`, `elapsed` and, for asynchronous
+        fetches, the `connect`, `ttfb` and `download` phases (in seconds). Failed requests carry `error` instead of `status`.
+      - 'tree': emitted after every `bs()` tree build with `bytes`, `elapsed` and `url` (when known).
+      - 'parse': emitted after every parser `get_*` method with `parser`, `method` and `elapsed`.
+      - 'cache': emitted on every cache lookup with `cache`, `key` and `hit`.
+      - 'error': emitted when fetching additional details fails, with `where` and `error`, and when a request fails
+        over to another mirror (`where='mirrors'`, with the failed `mirror`) or a proxy is quarantined
+        (`where='proxies'`, with the quarantined `proxy`).
+      - 'hedge': emitted when a hedged request (see `otakudesudata.hedging`) that sent a duplicate ends, with `url`,
+        `delay` (seconds before the duplicate was sent) and `won` (whether the duplicate answered first).
+    callback (callable, optional): A function taking one dictionary argument (the event data, including the `event` key).
+      Callbacks run synchronously on the thread that emitted the event and should be cheap. An exception raised by
+      a callback is logged (logger `otakudesudata.metrics`) and does not reach the code that emitted the event.
+
+  Returns:
+    callable: The callback, so `add_hook` can be used as a decorator.
+
+  Example:
+    >>> from otakudesudata import metrics
+    >>> @metrics.add_hook('fetch')
+    ... def log_slow_pages(data):
+    ...   if data['elapsed'] > 2: print('slow page', data['url'])
+  """
+  if event not in events: raise ValueError(f'unknown event {event!r}, expected one of {events}')
+  if callback is None: return lambda callback: add_hook(event, callback)
+  _hooks[event] = _hooks.get(event, ()) + (callback,)
+  return callback
+
+
+def remove_hook(event: str, callback) -> None:
+  """
+  Unregisters a callback previously registered with `add_hook`.
+  """
+  _hooks[event] = tuple(hook for hook in _hooks.get(event, ()) if hook != callback)
+  if not _hooks[event]: del _hooks[event]
+
+
+def enabled(event: str) -> bool:
+  """
+  Returns whether anything listens to `event`, so callers can skip collecting data nobody reads.
+  """
+  return event in _hooks
+
+
+def emit(event: str, **data) -> None:
+  callbacks = _hooks.get(event)
+  if not callbacks: return
+  data['event'] = event
+  for callback in callbacks:
+    # a faulty callback must not break the request or the parse it reports on
+    try:
+      callback(data)
+    except Exception:
+      _logger.exception('metrics hook %r failed on a %r event', callback, event)
+
+
+def timed(parser: str, method: str, function):
+  """
+  Wraps a parser `get_*` function so every call emits a 'parse' event.
+  """
+  @functools.wraps(function)
+  def wrapper(*args, **kwargs):
+    if 'parse' not in _hooks: return function(*args, **kwargs)
+    start = perf_counter()
+    try:
+      return function(*args, **kwargs)
+    finally:
+      emit('parse', parser=parser, method=method, elapsed=perf_counter() - start)
+  return wrapper
+
+
+def _escape(value) -> str:
+  return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Tracer:
+  """
+  An httpcore `trace` extension that records when each phase of an asynchronous request started and completed.
+  """
+  def __init__(self):
+    self.marks = {}
+
+  async def __call__(self, name: str, info: dict):
+    self.marks[name.split('.', 1)[-1]] = perf_counter()
+
+  def phase(self, name: str, start: str='started', end: str='complete'):
+    started, completed = self.marks.get(f'{name}.{start}'), self.marks.get(f'{name}.{end}')
+    return completed - started if started is not None and completed is not None else None
+
+  @property
+  def phases(self) -> dict:
+    sent = self.marks.get('send_request_headers.started')
+    headers = self.marks.get('receive_response_headers.complete')
+    tls = self.phase('start_tls')
+    connect = self.phase('connect_tcp')
+    return {
+      'connect': (connect or 0) + (tls or 0) if connect is not None else None,
+      'ttfb': headers - sent if sent is not None and headers is not None else None,
+      'download': self.phase('receive_response_body')
+    }
+
+
+class MetricsCollector:
+  """
+  Aggregates the instrumentation events into counters and histograms and renders them in the Prometheus text
+  exposition format, which Prometheus scrapes directly and the OpenTelemetry collector reads through its
+  Prometheus receiver.
+
+  Args:
+    buckets (tuple, optional): Upper bounds (in seconds) of the fetch latency histogram buckets.
+
+  Methods:
+    install() -> MetricsCollector:
+      Registers the collector for every event. Returns the collector itself.
+    uninstall():
+      Unregisters the collector.
+    to_prometheus() -> str:
+      Renders the collected metrics in the Prometheus text exposition format.
+    results -> dict:
+      The collected metrics as a dictionary.
+
+  Example:
+    >>> from otakudesudata import search
+    >>> from otakudesudata.metrics import MetricsCollector
+    >>> collector = MetricsCollector().install()
+    >>> search('one piece', get_anime_details=True)
+    >>> print(collector.to_prometheus())
+  """
+  def __init__(self, buckets: tuple=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)):
+    self.buckets = tuple(sorted(buckets))
+    self._lock = threading.Lock()
+    self.reset()
+
+  def reset(self):
+    with self._lock:
+      self.requests = {}
+      self.fetchErrors = {}
+      self.errors = {}
+      self.bytes = 0
+      self.latency = {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+      self.phases = {}
+      self.trees = {'sum': 0.0, 'count': 0, 'bytes': 0}
+      self.parses = {}
+      self.cache = {}
+      self.hedges = {'issued': 0, 'won': 0}
+
+  def install(self):
+    for event in events:
+      add_hook(event, self)
+    return self
+
+  def uninstall(self):
+    for event in events:
+      remove_hook(event, self)
+
+  def __call__(self, data: dict):
+    with self._lock:
+      getattr(self, f'_on_{data["event"]}')(data)
+
+  def _on_fetch(self, data: dict):
+    host = urlsplit(str(data.get('url'))).netloc
+    if data.get('error'):
+      key = (host, data['error'])
+      self.fetchErrors[key] = self.fetchErrors.get(key, 0) + 1
+    else:
+      key = (host, str(data.get('status')))
+      self.requests[key] = self.requests.get(key, 0) + 1
+      self.bytes += data.get('bytes') or 0
+    elapsed = data.get('elapsed') or 0
+    self.latency['buckets'][next((index for index, bound in enumerate(self.buckets) if elapsed <= bound), len(self.buckets))] += 1
+    self.latency['sum'] += elapsed
+    self.latency['count'] += 1
+    for phase in ('connect', 'ttfb', 'download'):
+      if data.get(phase) is None: continue
+      total = self.phases.setdefault(phase, {'sum': 0.0, 'count': 0})
+      total['sum'] += data[phase]
+      total['count'] += 1
+
+  def _on_tree(self, data: dict):
+    self.trees['sum'] += data.get('elapsed') or 0
+    self.trees['count'] += 1
+    self.trees['bytes'] += data.get('bytes') or 0
+
+  def _on_parse(self, data: dict):
+    total = self.parses.setdefault((data['parser'], data['method']), {'sum': 0.0, 'count': 0})
+    total['sum'] += data['elapsed']
+    total['count'] += 1
+
+  def _on_cache(self, data: dict):
+    key = (data.get('cache'), 'hit' if data.get('hit') else 'miss')
+    self.cache[key] = self.cache.get(key, 0) + 1
+
+  def _on_error(self, data: dict):
+    key = (data.get('where'), data.get('error'))
+    self.errors[key] = self.errors.get(key, 0) + 1
+
+  def _on_hedge(self, data: dict):
+    self.hedges['issued'] += 1
+    self.hedges['won'] += 1 if data.get('won') else 0
+
+  @property
+  def results(self) -> dict:
+    with self._lock:
+      return {
+        'requests': sum(self.requests.values()),
+        'fetchErrors': sum(self.fetchErrors.values()),
+        'errors': sum(self.errors.values()),
+        'bytes': self.bytes,
+        'latency': {'sum': self.latency['sum'], 'count': self.latency['count']},
+        'phases': {phase: dict(total) for phase, total in self.phases.items()},
+        'trees': dict(self.trees),
+        'parses': {f'{parser}.{method}': dict(total) for (parser, method), total in self.parses.items()},
+        'cache': {f'{cache}.{result}': count for (cache, result), count in self.cache.items()},
+        'hedges': dict(self.hedges)
+      }
+
+  def to_prometheus(self, prefix: str='otakudesudata') -> str:
+    def labels(**pairs):
+      return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs.items()) + '}'
+    lines = []
+    with self._lock:
+      lines += [f'# TYPE {prefix}_fetch_requests_total counter']
+      lines += [f'{prefix}_fetch_requests_total{labels(host=host, status=status)} {count}' for (host, status), count in self.requests.items()]
+      lines += [f'# TYPE {prefix}_fetch_errors_total counter']
+      lines += [f'{prefix}_fetch_errors_total{labels(host=host, error=error)} {count}' for (host, error), count in self.fetchErrors.items()]
+      lines += [f'# TYPE {prefix}_errors_total counter']
+      lines += [f'{prefix}_errors_total{labels(where=where, error=error)} {count}' for (where, error), count in self.errors.items()]
+      lines += [f'# TYPE {prefix}_fetch_bytes_total counter', f'{prefix}_fetch_bytes_total {self.bytes}']
+      lines += [f'# TYPE {prefix}_fetch_seconds histogram']
+      cumulative = 0
+      for bound, count in zip(self.buckets + ('+Inf',), self.latency['buckets']):
+        cumulative += count
+        lines.append(f'{prefix}_fetch_seconds_bucket{labels(le=bound)} {cumulative}')
+      lines += [f'{prefix}_fetch_seconds_sum {self.latency["sum"]}', f'{prefix}_fetch_seconds_count {self.latency["count"]}']
+      lines += [f'# TYPE {prefix}_fetch_phase_seconds summary']
+      for phase, total in self.phases.items():
+        lines += [f'{prefix}_fetch_phase_seconds_sum{labels(phase=phase)} {total["sum"]}', f'{prefix}_fetch_phase_seconds_count{labels(phase=phase)} {total["count"]}']
+      lines += [f'# TYPE {prefix}_tree_seconds summary', f'{prefix}_tree_seconds_sum {self.trees["sum"]}', f'{prefix}_tree_seconds_count {self.trees["count"]}']
+      lines += [f'# TYPE {prefix}_parse_seconds summary']
+      for (parser, method), total in self.parses.items():
+        lines += [f'{prefix}_parse_seconds_sum{labels(parser=parser, method=method)} {total["sum"]}', f'{prefix}_parse_seconds_count{labels(parser=parser, method=method)} {total["count"]}']
+      lines += [f'# TYPE {prefix}_cache_requests_total counter']
+      lines += [f'{prefix}_cache_requests_total{labels(cache=cache, result=result)} {count}' for (cache, result), count in self.cache.items()]
+      lines += [f'# TYPE {prefix}_hedges_issued_total counter', f'{prefix}_hedges_issued_total {self.hedges["issued"]}']
+      lines += [f'# TYPE {prefix}_hedges_won_total counter', f'{prefix}_hedges_won_total {self.hedges["won"]}']
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,181 @@
+from otakudesudata.constants import mirrorUrls, baseUrl
+from otakudesudata import fetch
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from time import perf_counter
+import threading
+import time
+import httpx
+
+
+def _base(url: str) -> str:
+  return url if url.endswith('/') else url + '/'
+
+
+class MirrorSet:
+  """
+  A set of interchangeable base URLs of the site (its current domain and any mirror), probed for health and
+  latency so every request goes to the fastest healthy one.
+
+  Pass a `MirrorSet` as `mirrors=` to any function or parser: every URL on one of the mirrors (or on an alias, such
+  as the domain hard-coded in `constants.py` or one the site moved away from) is rewritten to the selected mirror
+  before it is fetched, including detail URLs found on pages or cached from an earlier run. When a request to the
+  selected mirror fails (a connection error or a 5xx response), the mirror is marked unhealthy and the request is
+  retried on the next one, so a run fails over instead of stalling until timeout.
+
+  Mirrors are probed on first use, once: concurrent first requests wait for that probe. By default probing is lazy,
+  driven by use: once `interval` seconds have passed, the next request starts a probe in the background and keeps
+  going to the mirror selected by the previous one. Call `start()` to probe every `interval` seconds from a
+  background thread instead, so a set that sits unused is still up to date when requests come again.
+
+  Args:
+    mirrors (list, optional): Base URLs, in order of preference for equal latency. Defaults to `mirrorUrls`.
+    aliases (list, optional): Base URLs that are rewritten to the mirrors but never fetched. Defaults to `[baseUrl]`.
+    interval (float, optional): Seconds between probes. Defaults to 300.
+    timeout (float, optional): Timeout of a probe request in seconds. Defaults to 5.
+    probe_path (str, optional): Path requested on every mirror by a probe. Defaults to the home page.
+    timer (callable, optional): Clock used to schedule probes. Defaults to `time.monotonic`.
+    **kwargs (dict): Request options of the probes: user_agent, proxy (a proxy or a `ProxyPool`), headers.
+
+  Attributes:
+    stats (dict): For every mirror, `healthy` (None before the first probe), `latency` (seconds of the last
+      successful probe), `checked` (timer value of the last probe) and `failures` (requests failed over since).
+    current (str): The selected mirror, the fastest healthy one.
+
+  Example:
+    >>> from otakudesudata import search
+    >>> from otakudesudata.mirrors import MirrorSet
+    >>> mirrors = MirrorSet(['https://otakudesu.cloud/', 'https://mirror.example/'])
+    >>> results = search('one piece', mirrors=mirrors, get_anime_details=True)
+    >>> mirrors.current
+    'https://mirror.example/'
+  """
+  def __init__(self, mirrors: list=None, aliases: list=None, interval: float=300, timeout: float=5, probe_path: str='', timer=time.monotonic, **kwargs: dict):
+    self.mirrors = [_base(mirror) for mirror in (mirrors or mirrorUrls)]
+    if not self.mirrors: raise ValueError('at least one mirror is required')
+    self.aliases = [_base(alias) for alias in (aliases if aliases is not None else [baseUrl]) if _base(alias) not in self.mirrors]
+    self.interval = interval
+    self.timeout = timeout
+    self.probe_path = probe_path.lstrip('/')
+    self.timer = timer
+    self.stats = {mirror: {'healthy': None, 'latency': None, 'checked': None, 'failures': 0} for mirror in self.mirrors}
+    self._kwargs = kwargs
+    self._lock = threading.Lock()
+    # held by every probe: callers arriving before the first probe ends wait for its result
+    self._probeLock = threading.Lock()
+    self._probing = None
+    self._probed = None
+    self._stopping = None
+
+  def _probe_one(self, mirror: str) -> tuple:
+    start = perf_counter()
+    try:
+      response = fetch._get(mirror + self.probe_path, None, {**self._kwargs, 'timeout': self.timeout})
+      healthy = response.status_code < 500
+    except httpx.HTTPError:
+      healthy = False
+    return mirror, healthy, perf_counter() - start
+
+  def probe(self) -> dict:
+    """
+    Probes every mirror concurrently and returns `stats`.
+    """
+    with self._probeLock:
+      return self._probe()
+
+  def _probe(self) -> dict:
+    with ThreadPoolExecutor(max_workers=len(self.mirrors)) as executor:
+      results = list(executor.map(self._probe_one, self.mirrors))
+    now = self.timer()
+    with self._lock:
+      for mirror, healthy, latency in results:
+        self.stats[mirror].update(healthy=healthy, latency=latency if healthy else None, checked=now, failures=0)
+      self._probed = now
+    return self.stats
+
+  def _refresh(self) -> None:
+    if self._probed is None:
+      with self._probeLock:
+        if self._probed is None: self._probe()
+    elif self._stopping is None and self.timer() - self._probed >= self.interval and not (self._probing and self._probing.is_alive()):
+      self._probing = threading.Thread(target=self.probe, name='otakudesudata-mirrors', daemon=True)
+      self._probing.start()
+
+  def start(self):
+    """
+    Probes the mirrors now and then every `interval` seconds from a background thread, until `stop()`. Returns the
+    set itself.
+    """
+    with self._lock:
+      if self._stopping is None:
+        self._stopping = threading.Event()
+        self._probing = threading.Thread(target=self._run, args=(self._stopping,), name='otakudesudata-mirrors', daemon=True)
+        self._probing.start()
+    return self
+
+  def stop(self) -> None:
+    """
+    Stops the probes started by `start()`; the mirrors are probed on use again.
+    """
+    with self._lock:
+      stopping, self._stopping = self._stopping, None
+    if stopping is not None: stopping.set()
+
+  def _run(self, stopping: threading.Event) -> None:
+    while not stopping.is_set():
+      self.probe()
+      stopping.wait(self.interval)
+
+  def ranked(self) -> list:
+    """
+    Returns the mirrors from the most to the least preferred: healthy ones by latency, then the ones not probed
+    yet, then unhealthy ones (still tried last, so a run never gives up while any mirror may answer).
+    """
+    self._refresh()
+    with self._lock:
+      def rank(item):
+        position, mirror = item
+        stats = self.stats[mirror]
+        state = 0 if stats['healthy'] else 1 if stats['healthy'] is None else 2
+        return (state, stats['latency'] if stats['latency'] is not None else float('inf'), position)
+      return [mirror for _, mirror in sorted(enumerate(self.mirrors), key=rank)]
+
+  @property
+  def current(self) -> str:
+    return self.ranked()[0]
+
+  def failed(self, mirror: str) -> None:
+    """
+    Marks `mirror` unhealthy until the next probe, so the following requests go to the next mirror.
+    """
+    with self._lock:
+      if mirror in self.stats: self.stats[mirror].update(healthy=False, latency=None, failures=self.stats[mirror]['failures'] + 1)
+
+  def base_of(self, url: str) -> str:
+    """
+    Returns the mirror or alias `url` is on, None when it is on neither.
+    """
+    parts = urlsplit(url)
+    for base in self.mirrors + self.aliases:
+      baseParts = urlsplit(base)
+      if parts.netloc == baseParts.netloc and (parts.path or '/').startswith(baseParts.path): return base
+    return None
+
+  def rewrite(self, url: str, mirror: str=None) -> str:
+    """
+    Returns `url` moved to `mirror` (the selected mirror by default) when it is on a mirror or an alias, unchanged otherwise.
+    """
+    if (base := self.base_of(url)) is None: return url
+    mirror = mirror or self.current
+    if base == mirror: return url
+    parts = urlsplit(url)
+    rest = (parts.path or '/')[len(urlsplit(base).path):]
+    return mirror + rest + (f'?{parts.query}' if parts.query else '') + (f'#{parts.fragment}' if parts.fragment else '')
+
+  def candidates(self, url: str) -> list:
+    """
+    Returns `(mirror, url)` pairs to try in order for `url`: one per mirror when `url` is on a mirror or an alias,
+    otherwise `url` alone with no mirror.
+    """
+    if self.base_of(url) is None: return [(None, url)]
+    return [(mirror, self.rewrite(url, mirror)) for mirror in self.ranked()]
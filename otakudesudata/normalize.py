@@ -0,0 +1,121 @@
+from functools import lru_cache
+import datetime
+import re
+
+# the first three letters of the Indonesian and English month names and abbreviations the site uses
+months = {
+  'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'mei': 5, 'may': 5, 'jun': 6, 'jul': 7, 'agu': 8, 'agt': 8, 'aug': 8,
+  'sep': 9, 'okt': 10, 'oct': 10, 'nov': 11, 'des': 12, 'dec': 12,
+}
+# seconds per duration unit, by the first letter of 'jam'/'hr', 'menit'/'min', 'detik'/'sec'
+durationUnits = {'j': 3600, 'h': 3600, 'm': 60, 'd': 1, 's': 1}
+
+_word = re.compile(r'[^\W\d_]+')
+_number = re.compile(r'\d+(?:[.,]\d+)?')
+_duration = re.compile(r'(\d+)\s*([^\W\d_]*)')
+
+
+def parse_date(text: str, reference: datetime.date=None) -> str:
+  """
+  Parses a date written by the site ('Okt 03, 2020', '08 Okt,2020', '12 Desember 2020', '08 Nov') to an ISO date.
+
+  Dates without a year (the upload dates of listings) are given the year that puts them on or before `reference`
+  (plus a day, for time zones), which is today by default. Results are cached: pages repeat the same few dates.
+
+  Args:
+    text (str): The date.
+    reference (datetime.date, optional): The date a date without a year is at most. Defaults to today.
+
+  Returns:
+    str: The date as 'YYYY-MM-DD', or None if `text` is not a date.
+  """
+  # today is resolved before the cache lookup, so that cached dates without a year follow the calendar
+  return _parse_date(text or '', reference or datetime.date.today())
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(text: str, reference: datetime.date) -> str:
+  month = next((months[word[:3].lower()] for word in _word.findall(text) if word[:3].lower() in months), None)
+  numbers = re.findall(r'\d+', text)
+  day = next((int(number) for number in numbers if len(number) <= 2), None)
+  year = next((int(number) for number in numbers if len(number) == 4), None)
+  if month is None or day is None: return None
+  # the year itself, else the latest year the date is not ahead of the reference in (a leap year for 29 February)
+  given = year is not None
+  for year in ([year] if given else range(reference.year, reference.year - 8, -1)):
+    try:
+      date = datetime.date(year, month, day)
+    except ValueError:
+      continue
+    if given or date <= reference + datetime.timedelta(days=1): return date.isoformat()
+  return None
+
+
+def parse_number(text: str) -> float:
+  """
+  Returns the first number in `text` ('8.61', '8,61', 'Episode 5'), or None.
+  """
+  match = _number.search(str(text or ''))
+  return float(match.group().replace(',', '.')) if match else None
+
+
+def parse_int(text: str) -> int:
+  """
+  Returns the first whole number in `text` ('24', ' Episode 5'), or None ('Unknown').
+  """
+  match = re.search(r'\d+', str(text or ''))
+  return int(match.group()) if match else None
+
+
+def parse_duration(text: str) -> int:
+  """
+  Parses a duration ('23 Menit', '23 min.', '1 jam 30 menit', '1 hr. 5 min. per ep.') to seconds, or None.
+  A number without a unit is taken as minutes.
+  """
+  seconds = None
+  for number, unit in _duration.findall(str(text or '')):
+    seconds = (seconds or 0) + int(number) * durationUnits.get(unit[:1].lower(), 60)
+  return seconds
+
+
+# raw field -> (companion field, parser), the companions `annotate` adds next to the raw fields
+fields = {
+  'releaseDate': ('releaseDateIso', parse_date),
+  'uploadTime': ('uploadTimeIso', parse_date),
+  'uploadDate': ('uploadDateIso', parse_date),
+  'rating': ('ratingValue', parse_number),
+  'totalEpisodes': ('totalEpisodesCount', parse_int),
+  'duration': ('durationSeconds', parse_duration),
+  'episode': ('episodeNumber', parse_int),
+}
+
+
+def annotate(value, reference: datetime.date=None):
+  """
+  Adds normalized companions next to the raw string fields of parse results, in place: `releaseDateIso`,
+  `uploadTimeIso` and `uploadDateIso` ('YYYY-MM-DD'), `ratingValue` (float), `totalEpisodesCount`, `episodeNumber`
+  (int) and `durationSeconds` (int). A companion is None when its field could not be parsed. The raw fields are kept.
+
+  Args:
+    value: Parse results: dictionaries and lists, walked recursively.
+    reference (datetime.date, optional): The date dates without a year are at most (see `parse_date`).
+
+  Returns:
+    The annotated `value`.
+
+  Example:
+    >>> from otakudesudata.normalize import annotate
+    >>> annotate({'rating': '8.61', 'duration': '23 Menit', 'releaseDate': 'Okt 03, 2020'})
+    {'rating': '8.61', 'duration': '23 Menit', 'releaseDate': 'Okt 03, 2020', 'ratingValue': 8.61, 'durationSeconds': 1380, 'releaseDateIso': '2020-10-03'}
+  """
+  reference = reference or datetime.date.today()
+  if isinstance(value, dict):
+    for key, item in list(value.items()):
+      if isinstance(item, (dict, list)): annotate(item, reference)
+      elif key in fields and isinstance(item, str):
+        companion, parse = fields[key]
+        value[companion] = parse(item, reference) if parse is parse_date else parse(item)
+  elif isinstance(value, list):
+    for item in value:
+      annotate(item, reference)
+  return value
@@ -1,12 +1,49 @@
 from bs4 import BeautifulSoup as bs
 from otakudesudata.constants import *
+from otakudesudata import fetch, metrics, normalize, runner
+from otakudesudata.cache import TTLCache
+from otakudesudata.resolver import resolver_for
+from otakudesudata.specs import Spec, searchPage, animePage, batchPage, episodePage, listingPage, genrePage
+from time import perf_counter
 import re
 import asyncio
+import inspect
 import httpx
-import random
+
+
+def make_soup(html_string: str, url: str=None) -> bs:
+  """
+  Builds the BeautifulSoup tree every parser works on and emits a 'tree' instrumentation event.
+  """
+  if not metrics.enabled('tree'): return bs(html_string, 'html.parser')
+  start = perf_counter()
+  soup = bs(html_string, 'html.parser')
+  metrics.emit('tree', url=url, bytes=len(html_string), elapsed=perf_counter() - start)
+  return soup
+
+
+def fetch_within_deadline(url: str, kwargs: dict, **options: dict) -> httpx.Response:
+  """
+  Fetches `url` like `fetch.get(url, **kwargs, **options)`. With a `deadline` option (seconds for the whole call,
+  including enrichment), the request timeout is capped by the deadline and `kwargs['deadline']` is reduced to the
+  time left once the page is fetched.
+  """
+  if kwargs.get('deadline') is None: return fetch.get(url, **{**kwargs, **options})
+  expires = perf_counter() + kwargs['deadline']
+  options = {**kwargs, **options}
+  response = fetch.get(url, **{**options, 'timeout': min(options.get('timeout', 10), max(kwargs['deadline'], 0))})
+  kwargs['deadline'] = max(expires - perf_counter(), 0)
+  return response
 
 
 class Parser:
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+    for name, value in list(vars(cls).items()):
+      # extractors compiled from a spec emit their own 'parse' events
+      if name.startswith('get_') and isinstance(value, staticmethod) and not inspect.iscoroutinefunction(value.__func__) and not hasattr(value.__func__, 'spec'):
+        setattr(cls, name, staticmethod(metrics.timed(cls.__name__, name, value.__func__)))
+
   def __getitem__(self, key: str):
     if hasattr(self, key):
       return getattr(self, key)
@@ -16,6 +53,21 @@ class Parser:
   def results(self):
     return vars(self)
 
+  @classmethod
+  def from_html(cls, html: str, url: str=None, **kwargs: dict):
+    """
+    Parses a page fetched before (e.g. read from an archive, see `otakudesudata.archive`) without sending the request
+    for it. `kwargs` are the options of the parser; detail enrichment and link resolution still use the network.
+
+    Example:
+      >>> from otakudesudata.parser import AnimeParser
+      >>> AnimeParser.from_html(html, 'https://otakudesu.cloud/anime/jujutsu-kaisen-sub-indo/').title
+      'Jujutsu Kaisen'
+    """
+    parser = cls.__new__(cls)
+    parser._parse(html, url, kwargs)
+    return parser
+
 class SearchResultParser(Parser):
   class SearchResultParser:
     """
@@ -41,13 +93,28 @@ class SearchResultParser(Parser):
         - user_agent (str, optional): Custom user agent string. Defaults to a rotating user agent.
         - timeout (int, optional): Timeout duration (in seconds) for network requests. Defaults to a reasonable value.
         - get_anime_details (bool, optional): Whether to fetch detailed information for each anime. Defaults to False.
+        - get_latest_episode (bool, optional): Whether to fetch the details and download links of the latest episode of each
+          anime into its `latestEpisode` (fetches the anime details too). Defaults to False.
         - get_episode_details (bool, optional): Whether to fetch detailed information for each episode. Defaults to False.
         - get_batch_details (bool, optional): Whether to fetch detailed information for each batch. Defaults to False.
         - update_details (bool, optional): whether to update each anime details during fetching anime details
         - client_max_connections (int, optional): The maximum number of client concurrent connections that may be established during fetching other details. Default to 100
         - max_keepalive_connections (int, optional): Allow the connection pool to maintain keep-alive connections below this point. Should be less than or equal to `client_max_connections`. Default to 20% of `client_max_connections`.
         - keepalive_expiry (float, optional): Time limit on idle keep-alive connections in seconds. Default to 5 seconds.
+        - http2 (bool, optional): Whether to fetch other details over HTTP/2, multiplexing them over a few connections. Requires `pip install httpx[http2]`. Defaults to False.
         raise_exception (bool, optional): Whether to raise exceptions while fetching other details. Defaults to False.
+        - resolve_links (bool or LinkResolver, optional): Whether to resolve the download links of the fetched episodes and batches
+          to the URL of the file they end at (see `otakudesudata.resolver`). Defaults to False.
+        - normalize (bool, optional): Whether to add parsed companions (`ratingValue`, `releaseDateIso`, `durationSeconds`, ...)
+          next to the raw string fields, including those of the fetched details (see `otakudesudata.normalize`). Defaults to False.
+        - archive (WarcWriter or str, optional): An archive (or archive directory) the fetched detail pages are written to
+          (see `otakudesudata.archive`). Defaults to None.
+        - deadline (float, optional): Seconds the detail fetches may take together. Those still running then are cancelled,
+          and every item is flagged with `fetchStatus` ('ok', 'error' with `fetchError`, or 'timeout'). Defaults to None.
+        - hedge (HedgePolicy, optional): Sends a duplicate of a detail fetch slower than most and uses the first response
+          (see `otakudesudata.hedging`). Defaults to None.
+        - scheduler (RequestScheduler, optional), priority (str, optional): Queue every request by priority with the other
+          requests sharing the scheduler (see `otakudesudata.scheduler`). Defaults to the installed scheduler and 'normal'.
     Example:
       >>>from otakudesudata.parser import SearchResultParser
       >>>html_string = '<html>....
@@ -58,57 +125,20 @@ class SearchResultParser(Parser):
       >>>print(parser.batch)
     """
   def __init__(self, html_string: str, **kwargs:dict):
-    soup = bs(html_string, 'html.parser')
-    self.anime = self.get_anime(soup)
-    self.episodes = self.get_episodes(soup)
-    self.batch = self.get_batch(soup)
-    asyncio.run(AsyncParser.get_details(self, **kwargs))
-
-  @staticmethod
-  def get_anime(soup):
-    pattern = animeSearchPattern
-    elements = list(filter(lambda element: re.findall(pattern, element.a.text.lower()) if element.a else None, 
-                 filter(lambda element: not element.get('class'), soup.find_all('li'))))
-    return [
-      {
-        'title': element.a.text if element.a else None,
-        'url': element.a.get('href') if element.a else None,
-              'thumbnails': {
-                'width': element.img.get('width'),
-                'height': element.img.get('height'),
-                'url': element.img.get('src'),
-                'srcset': element.img.get('srcset').split()[::2] if element.img.get('srcset') and len(element.img.get('srcset').split()) > 1 else None,
-                } if element.img else {},
-                'genres': [
-                  {
-                    'text': genre.text,
-                    'url': genre.get('href')
-                    } for genre in element.div.find_all('a')] if element.div else [],
-                'status': element.find_all('div')[1].text.split(':')[1].strip() if len(element.find_all('div')) > 1 and ':' in element.find_all('div')[1].text else None,
-                'rating': element.find_all('div')[2].text.split(':')[1].strip() if len(element.find_all('div')) > 1 and ':' in element.find_all('div')[1].text else None,
-                } for element in elements]
+    self._parse(html_string, None, kwargs)
 
-  @staticmethod
-  def get_episodes(soup):
-    pattern = episodeSearchPattern
-    elements = list(filter(lambda element: re.findall(pattern, element.a.text.lower()) if element.a else None, 
-                 filter(lambda element: not element.get('class'), soup.find_all('li'))))
-    return [
-      {
-        'title': element.a.text,
-        'url': element.a.get('href'),
-        'episode': re.findall(pattern, element.a.text.lower())[0] if re.findall(pattern, element.a.text.lower()) else None}
-        for element in elements
-        if element.a]
+  def _parse(self, html: str, url: str, kwargs: dict):
+    soup = make_soup(html, url)
+    page = searchPage.extract(soup)
+    self.anime = page['anime']
+    self.episodes = page['episodes']
+    self.batch = page['batch']
+    AsyncParser.run_details(self, **kwargs)
+    if kwargs.get('normalize'): normalize.annotate([self.anime, self.episodes, self.batch])
 
-  @staticmethod
-  def get_batch(soup):
-    elements = list(filter(lambda element: batchSearchPattern in element.a.text if element.a else None, filter(lambda element: not element.get('class'), soup.find_all('li'))))
-    return [
-      {'title': element.a.text,
-       'url': element.a.get('href')
-       }  for element in elements
-       if element.a]
+  get_anime = staticmethod(searchPage.extractor('anime'))
+  get_episodes = staticmethod(searchPage.extractor('episodes'))
+  get_batch = staticmethod(searchPage.extractor('batch'))
 
 class AnimeParser(Parser):
   """
@@ -117,6 +147,7 @@ class AnimeParser(Parser):
   from the HTML content of the page using BeautifulSoup.
   Attributes:
     title (str): The title of the anime.
+    thumbnails (dict): The poster of the anime (url, width, height and srcset).
     details (dict): A dictionary containing detailed information about the anime.
     feed (list): A list of feeds related to the anime.
     description (str): A brief description of the anime.
@@ -136,7 +167,12 @@ class AnimeParser(Parser):
           - client_max_connections (int, optional): The maximum number of client concurrent connections that may be established during fetching other details. Default to 100
           - max_keepalive_connections (int, optional): Allow the connection pool to maintain keep-alive connections below this point. Should be less than or equal to `client_max_connections`. Default to 20% of `client_max_connections`.
           - keepalive_expiry (float, optional): Time limit on idle keep-alive connections in seconds. Default to 5 seconds.
+          - http2 (bool, optional): Whether to fetch other details over HTTP/2, multiplexing them over a few connections. Requires `pip install httpx[http2]`. Defaults to False.
           - raise_exception (bool, optional): Whether to raise exceptions while fetching other details. Defaults to False.
+          - normalize (bool, optional): Whether to add parsed companions next to the raw string fields of the details,
+            episodes and batch: `ratingValue`, `totalEpisodesCount`, `durationSeconds` and `releaseDateIso` (see
+            `otakudesudata.normalize`). Defaults to False.
+          - deadline (float, optional): Seconds the page and its enrichment may take, as for `search`. Defaults to None.
           
     get_title(soup: bs4.BeautifulSoup) -> str:
       Extracts the title of the anime from the parsed HTML.
@@ -232,105 +268,31 @@ class AnimeParser(Parser):
           >>> ...
   """
   def __init__(self, url: str, **kwargs: dict):
-    response = httpx.get(
-      url,
-                            headers={'User-Agent': kwargs.get('user_agent', random.choice(userAgents))},
-                            timeout=kwargs.get('timeout', 10),
-                            proxy=kwargs.get('proxy')
-                            )
-    soup = bs(response.text, 'html.parser')
-    self.title = self.get_title(soup)
-    self.details = self.get_details(soup)
-    self.feed = self.get_feed(soup)
-    self.description = self.get_description(soup)
-    self.seasons = self.get_seasons(soup)
-    #self.linked_season = self.get_linked_season(soup) # This is not implemented in the parser
-    self.episodes = self.get_episodes(soup) 
-    self.batch = self.get_batch(soup)
-    asyncio.run(AsyncParser.get_details(self, **kwargs))
+    self._parse(fetch_within_deadline(url, kwargs).text, url, kwargs)
+
+  def _parse(self, html: str, url: str, kwargs: dict):
+    soup = make_soup(html, url)
+    page = animePage.extract(soup)
+    self.title = page['title']
+    self.thumbnails = page['thumbnails']
+    self.details = page['details']
+    self.feed = page['feed']
+    self.description = page['description']
+    self.seasons = page['seasons']
+    self.episodes = page['episodes']
+    self.batch = page['batch']
+    AsyncParser.run_details(self, **kwargs)
+    if kwargs.get('normalize'): normalize.annotate([self.details, self.episodes, self.batch])
+
+  get_title = staticmethod(animePage.extractor('title'))
+  get_thumbnails = staticmethod(animePage.extractor('thumbnails'))
+  get_details = staticmethod(animePage.extractor('details'))
+  get_feed = staticmethod(animePage.extractor('feed'))
+  get_description = staticmethod(animePage.extractor('description'))
+  get_seasons = staticmethod(animePage.extractor('seasons'))
+  get_episodes = staticmethod(animePage.extractor('episodes'))
+  get_batch = staticmethod(animePage.extractor('batch'))
 
-  @staticmethod
-  def get_title(soup: bs) -> str:
-    return soup.div.h1.text if soup.div and soup.div.h1 else None
-
-    @staticmethod
-    def get_thumbnails(soup: bs) -> dict:
-      element = soup.find('div', class_='fotoanime')
-      return {
-        'url': element.img.get('src') if element.img else None,
-        'width': element.img.get('width') if element.img else None,
-        'height': element.img.get('height') if element.img else None,
-        'srcset': (element.img.get('srcset').split()[::2] if element.img.get('srcset') else None) if element.img else []
-      }
-
-  @staticmethod
-  def get_details(soup: bs) ->dict:
-    detailsSection = soup.find('div', class_='infozin').find_all('span') if soup.find('div', class_='infozin') else []
-    details = {
-      animeDetailsMapping.get(detail.text.split(detailsDelimiter, 2)[0].strip().lower(), detail.text.split(detailsDelimiter, 2)[0].strip().lower()): detail.text.split(detailsDelimiter, 2)[1].strip()
-      for detail in detailsSection[:-1]
-    if detail.text and detailsDelimiter in detail.text} if detailsSection else {}
-    details['genres'] = [
-      {
-        'text': genre.text,
-        'url': genre.get('href')
-      }
-    for genre in detailsSection[-1].find_all('a')] if detailsSection else []
-    return details
-
-  @staticmethod
-  def get_feed(soup: bs) -> list:
-    feeds = soup.find_all('div', class_='isi-anime')
-    return [
-    {
-      'title': feed.text,
-      'url': feed.a.get('href') if feed.a else None,
-      'thumbnail': (feed.a.img.get('src') if feed.a.img else None) if feed.a else None
-    }
-    for feed in feeds]
-
-  @staticmethod
-  def get_description(soup: bs) -> str:
-    return soup.find('div', class_='sinopc').text if soup.find('div', class_='sinopc') else ''
-
-  @staticmethod
-  def get_seasons(soup: bs) -> list:
-    return [
-      {
-        'title': season.text,
-        'url': season.get('href')
-      }
-       for season in soup.find('div', class_='sinopc').find_all('p')[1].find_all('a')
-      ] if (element := soup.find('div', class_='sinopc')) and len(element.find_all('p')) > 1 else []
-
-  #@staticmethod
-  #def get_linked_season(soup: bs)->str:
-    #linkedSeason = soup.find('div',class_='sinopc').a if soup.find('div',class_='sinopc') else None
-    #return {
-      #'title': linkedSeason.text,
-      #'url': linkedSeason.get('href')
-    #} if linkedSeason else {}
-
-  @staticmethod
-  def get_episodes(soup: bs):
-    episodes = soup.find_all('div', class_='episodelist')[1].find_all('li') if len(soup.find_all('div', class_='episodelist')) > 1 else []
-    return [
-      {
-        'title': episode.span.text,
-        'url': episode.span.a.get('href') if episode.span.a else None,
-        'releaseDate': episode.find_all('span')[-1].text if len(episode.find_all('span')) > 1 else None
-      }
-    for episode in episodes
-    if episode.span][::-1]
-
-  @staticmethod
-  def get_batch(soup: bs) -> list:
-    spans = soup.find('div', class_='episodelist').find_all('span') if soup.find('div', class_='episodelist') else []
-    return {
-      'title': spans[0].text,
-      'url': spans[1].a.get('href'),
-      'releaseDate': spans[2].text
-    } if len(spans) > 2 else {}
 
 
 
@@ -344,6 +306,8 @@ class BatchParser(Parser):
       - user_agent (str): Custom User-Agent header for the HTTP request. Defaults to a random choice from `userAgents`.
       - timeout (int): Timeout for the HTTP request in seconds. Defaults to 10.
       - proxy (str): Proxy to use for the HTTP request. Defaults to None.
+      - resolve_links (bool or LinkResolver): Whether to resolve the download links to the URL of the file they end at,
+        annotating each link with `finalUrl`, `contentLength` and `latency` (see `otakudesudata.resolver`). Defaults to False.
       
   Attributes:
     title (str): The title of the batch extracted from the webpage.
@@ -411,45 +375,22 @@ class BatchParser(Parser):
 
   """
   def __init__(self, url: str, **kwargs: dict):
-    response = httpx.get(url,
-                         headers={'User-Agent': kwargs.get('user_agent', random.choice(userAgents))},
-                         timeout=kwargs.get('timeout', 10),
-                         proxy=kwargs.get('proxy'))
-    soup = bs(response.text, 'html.parser')
-    self.title = self.get_title(soup)
-    self.description = self.get_description(soup)
-    self.thumbnails = self.get_thumbnails(soup)
-    self.links = self.get_links(soup)
+    self._parse(fetch_within_deadline(url, kwargs).text, url, kwargs)
 
-  @staticmethod
-  def get_title(soup: bs) ->str:
-    return soup.h4.text if soup.h4 else ''
+  def _parse(self, html: str, url: str, kwargs: dict):
+    soup = make_soup(html, url)
+    page = batchPage.extract(soup)
+    self.title = page['title']
+    self.description = page['description']
+    self.thumbnails = page['thumbnails']
+    self.links = page['links']
+    if kwargs.get('resolve_links'): resolver_for(kwargs['resolve_links'], kwargs).resolve_links(self.links)
 
-  @staticmethod
-  def get_description(soup: bs) ->str:
-    return soup.find('div',class_='deskripsi').p.text.strip() if (element := soup.find('div',class_='deskripsi')) and element.p else ''
+  get_title = staticmethod(batchPage.extractor('title'))
+  get_description = staticmethod(batchPage.extractor('description'))
+  get_thumbnails = staticmethod(batchPage.extractor('thumbnails'))
+  get_links = staticmethod(batchPage.extractor('links'))
 
-  @staticmethod
-  def get_thumbnails(soup: bs)-> dict:
-    element = soup.find('div',class_='animeinfo').img if soup.find('div',class_='animeinfo') else None
-    return {
-      'url': element.get('src'),
-      'width': element.get('width'),
-      'height': element.get('height'),
-      'srcset': element.get('srcset').split()[::2] if element.get('srcset') else []
-    } if element else {}
-
-  @staticmethod
-  def get_links(soup: bs) -> dict:
-    return {
-      resolution.strong.text.replace(' ','').lower():
-      [
-        {
-          'host': link.text.strip().lower() if link.text else '',
-          'url': link.get('href')
-        }
-      for link in resolution.find_all('a')]
-    for resolution in soup.find('div', class_='download2').find_all('li')} if soup.find('div', class_='download2') else {}
 
 
 
@@ -467,7 +408,13 @@ class EpisodeParser(Parser):
       - client_max_connections (int, optional): The maximum number of client concurrent connections that may be established during fetching other details. Default to 100
       - max_keepalive_connections (int, optional): Allow the connection pool to maintain keep-alive connections below this point. Should be less than or equal to `client_max_connections`. Default to 20% of `client_max_connections`.
       - keepalive_expiry (float, optional): Time limit on idle keep-alive connections in seconds. Default to 5 seconds.
+      - http2 (bool, optional): Whether to fetch other details over HTTP/2, multiplexing them over a few connections. Requires `pip install httpx[http2]`. Defaults to False.
       - raise_exception (bool): Whether to raise exceptions while fetching each episode  details. Defaults to False.
+      - resolve_links (bool or LinkResolver): Whether to resolve the download links to the URL of the file they end at,
+        annotating each link with `finalUrl`, `contentLength` and `latency` (see `otakudesudata.resolver`). Defaults to False.
+      - normalize (bool): Whether to add `uploadTimeIso` and `durationSeconds` next to the raw fields of the details
+        (see `otakudesudata.normalize`). Defaults to False.
+      - deadline (float): Seconds the page and its enrichment may take, as for `search`. Defaults to None.
   Attributes:
     title (str): The title of the episode extracted from the webpage.
     thumbnails (dict): A dictionary containing thumbnail information:
@@ -546,100 +493,67 @@ class EpisodeParser(Parser):
         #{'mp4480p': [{'host': 'Google Drive', 'url': 'https://example.com/download'}, ...], 'mp4720p': [{'host': 'Google Drive', 'url': 'https://example.com/download'}, ...], ...}
   """
   def __init__(self, url: str, **kwargs: dict):
-    response = httpx.get(url,
-                         headers={'User-Agent': kwargs.get('user_agent', random.choice(userAgents))},
-                         timeout=kwargs.get('timeout', 10),
-                          proxy=kwargs.get('proxy'))
-    soup = bs(response.text, 'html.parser')
-    self.title = self.get_title(soup)
-    self.thumbnails = self.get_thumbnails(soup)
-    self.details = self.get_details(soup)
-    self.episodes = self.get_episodes(soup)
-    self.links = self.get_links(soup)
-    asyncio.run(AsyncParser.get_details(self, **kwargs))
+    self._parse(fetch_within_deadline(url, kwargs).text, url, kwargs)
 
-  @staticmethod
-  def get_title(soup: bs) ->str:
-    return soup.h4.text if soup.h4 else ''
+  def _parse(self, html: str, url: str, kwargs: dict):
+    soup = make_soup(html, url)
+    page = episodePage.extract(soup)
+    self.title = page['title']
+    self.thumbnails = page['thumbnails']
+    self.details = page['details']
+    self.episodes = page['episodes']
+    self.links = page['links']
+    if kwargs.get('resolve_links'): resolver_for(kwargs['resolve_links'], kwargs).resolve_links(self.links)
+    AsyncParser.run_details(self, **kwargs)
+    if kwargs.get('normalize'): normalize.annotate(self.details)
 
-  @staticmethod
-  def get_thumbnails(soup: bs)->dict:
-    element = soup.find('div',class_='cukder').img if soup.find('div',class_='cukder') else None
-    return {
-      'url': element.get('src'),
-      'width': element.get('width'),
-      'height': element.get('height'),
-      'srcset': element.get('srcset').split()[::2] if element.get('srcset') else []
-    } if element else {}
+  get_title = staticmethod(episodePage.extractor('title'))
+  get_thumbnails = staticmethod(episodePage.extractor('thumbnails'))
+  get_details = staticmethod(episodePage.extractor('details'))
+  get_episodes = staticmethod(episodePage.extractor('episodes'))
+  get_links = staticmethod(episodePage.extractor('links'))
 
-  @staticmethod
-  def get_details(soup: bs)->dict:
-    detailsSection = soup.find('div',class_='infozingle')
-    if not detailsSection: return {}
-    uploader = soup.find('div',class_='kategoz').find_all('span')[0].text.split('by', 2)[-1].strip() if soup.find('div',class_='kategoz') and len(soup.find('div',class_='kategoz').find_all('span')) > 1 else None
-    uploadTime = soup.find('div',class_='kategoz').find_all('span')[1].text.split('on', 2)[-1].strip() if soup.find('div',class_='kategoz') and len(soup.find('div',class_='kategoz').find_all('span')) > 1 else None
-    genres = [
-        {
-          'text': genre.text,
-          'url': genre.get('href')
-        }
-        for genre in detailsSection.find_all('a')
-      ]
-    details = {
-      episodeDetailsMapping.get(detail.text.split(detailsDelimiter, 2)[0].strip().lower(), detail.text.split(detailsDelimiter, 2)[0].strip().lower()): detail.text.split(detailsDelimiter, 2)[-1].strip()
-    for detail in detailsSection.find_all('span') if detail.text and detailsDelimiter in detail.text}
-    (details.update({'uploader': uploader}), details.update({'uploadTime': uploadTime}), details.update({'genres': genres}))
-    return details
 
-  @staticmethod
-  def get_episodes(soup: bs)-> list:
-    return [
-      {
-        'title': episode.a.text.strip() ,
-        'url': episode.a.get('href')
-      }
-    for episode in soup.find('div',class_='cukder').find_all('li') if episode.a][::-1] if soup.find('div',class_='cukder') else []
 
-  @staticmethod
-  def get_links(soup: bs) -> dict:
-    return {
-      resolution.strong.text.replace(' ','').lower():
-      [
-        {
-          'host': link.text.strip().lower() if link.text else '',
-          'url': link.get('href')
-        }
-      for link in resolution.find_all('a')]
-    for resolution in soup.find('div', class_='download').find_all('li')} if soup.find('div', class_='download') else {}
-
-
-class OngoingParser(Parser):
+class ListingParser(Parser):
   """
-  OngoingParser is a class designed to parse ongoing anime releases from a given URL (otakudesu ongoing anime url). 
-  It supports caching for efficient navigation between pages and provides methods to 
-  retrieve details about releases, navigate between pages, and extract metadata.
+  ListingParser is a class designed to parse the paginated anime listings of the site: ongoing anime
+  (`ongoingUrl`) and completed anime (`completedUrl`), lists of `detpost` releases with `page-numbers` pagination.
+  The anime of a genre are listed with other markup, see `GenreParser`.
+  It supports caching for efficient navigation between pages and provides methods to
+  retrieve details about releases, navigate between pages (or fetch many concurrently), and extract metadata.
 
   Attributes:
-    _cache (dict): A dictionary to store cached releases for each page.
-    _previous_page_cache (dict): A dictionary to store cached previous page URLs for each page.
-    _next_page_cache (dict): A dictionary to store cached next page URLs for each page.
+    _cache (TTLCache): The page cache of this parser (when caching is enabled), keyed by page URL. Every entry holds a page's
+      releases and its previous/next page URLs, and expires after `cache_ttl` seconds.
+    url (str): The URL of the current page.
     current_page (int): The current page number being parsed.
+    last_page (int): The number of the last page, from the page links of the current page.
+    missing_pages (list): The pages the last `pages(..., deadline=...)` call left out.
+    all_pages (list): The page links of the current page (`get_all_pages`).
     previous_page (str): The URL of the previous page.
     next_page (str): The URL of the next page.
     releases (list): A list of parsed release details from the current page.
     use_cache (bool): A flag to enable or disable caching.
+    spec (Spec): The extraction spec of a page (see `otakudesudata.specs`).
     _kwargs (dict): Additional keyword arguments passed during initialization.
 
   Methods:
-    __init__(url: str, use_cache: bool = False, **kwargs: dict):
+    __init__(url: str, use_cache: bool = False, cache: TTLCache = None, cache_size: int = 64, cache_ttl: float = 300, **kwargs: dict):
       Initializes the parser with the given URL and optional caching.
       Args:
         url (str): The URL of the page to parse.
         use_cache (bool, optional): Whether to enable caching. Defaults to False.
+        cache (TTLCache, optional): A page cache to share between parsers (e.g. across repeated `get_ongoing` calls in a
+          long-running service), keyed by page URL so different listings can share it. Defaults to a new cache private to this parser.
+        cache_size (int, optional): The maximum number of pages of a private cache. Defaults to 64.
+        cache_ttl (float, optional): Seconds a page of a private cache stays valid before it is fetched again. Defaults to 300.
         **kwargs (dict): Additional options:
           - user_agent (str, optional): Custom User-Agent header. Defaults to a random choice from `userAgents`.
           - timeout (int, optional): Timeout for HTTP requests. Defaults to 10 seconds.
           - proxy (str, optional): Proxy to use for HTTP requests. Defaults to None.
+          - normalize (bool, optional): Whether to add `uploadDateIso` and `episodeNumber` next to the raw fields of
+            every release, once per fetched page (see `otakudesudata.normalize`). Defaults to False.
 
     __iter__():
       Returns an iterator for the releases on the current page.
@@ -649,7 +563,8 @@ class OngoingParser(Parser):
       it navigates to the next page (if available) and continues.
 
     results:
-      Returns all releases across cached pages if caching is enabled, otherwise returns releases from the current page.
+      Returns all releases across the pages this parser visited that are still cached (in page order) if caching is
+      enabled, otherwise returns releases from the current page.
 
     previous():
       Navigates to the previous page and updates the parser state. Uses cache if enabled.
@@ -657,6 +572,25 @@ class OngoingParser(Parser):
     next():
       Navigates to the next page and updates the parser state. Uses cache if enabled.
 
+    page(number: int) -> list:
+      Navigates directly to page `number` (built from `get_all_pages` or the `page/<number>/` URL pattern, without
+      fetching the pages before it) and returns its releases. Uses cache if enabled.
+
+    pages(numbers: iterable = None, deadline: float = None) -> list:
+      Fetches the pages `numbers` (e.g. `range(3, 8)`, defaults to every page) concurrently and returns their releases
+      in page order, without changing the current page, so several workers can each take a share of the pages.
+      Uses cache if enabled. With a `deadline` (seconds), the pages not fetched by then are cancelled and left out,
+      and their numbers (with those of the pages that failed) are listed in `missing_pages`.
+
+    apage(number: int, client: httpx.AsyncClient = None) / apages(numbers: iterable = None, client: httpx.AsyncClient = None):
+      The coroutine versions of `page` and `pages`, fetching over `client` (or a new client).
+
+    __aiter__():
+      Asynchronously iterates the releases from the current page on, fetching the next pages without blocking the event loop.
+
+    page_url(number: int) -> str:
+      Returns the URL of page `number`.
+
     get_releases(soup: bs4.BeautifulSoup) -> list:
       Extracts release details from the given BeautifulSoup object.
       Args:
@@ -698,28 +632,32 @@ class OngoingParser(Parser):
     - The `timeout` keyword argument specifies the timeout for HTTP requests, with a default of 10 seconds.
     - The `proxy` keyword argument allows specifying a proxy for HTTP requests.
   """
-  _cache = {}
-  _previous_page_cache = {}
-  _next_page_cache = {}
-
-  def __init__(self, url: str, use_cache: bool=False, **kwargs: dict):
-    response = httpx.get(url,
-                         headers={'User-Agent': kwargs.get('user_agent', random.choice(userAgents))},
-                         timeout=kwargs.get('timeout', 10),
-                          proxy=kwargs.get('proxy'))
-    soup = bs(response.text, 'html.parser')
+  # the extraction spec of a page, a listing with other release markup overrides it
+  spec = listingPage
+
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+    # a subclass extracts with its own spec, or a copy of the inherited one under its name for the 'parse' metrics
+    if 'spec' not in vars(cls): cls.spec = Spec(cls.__name__, **cls.spec.fields)
+    for field in cls.spec.fields:
+      setattr(cls, f'get_{field}', staticmethod(cls.spec.extractor(field)))
+
+  def __init__(self, url: str, use_cache: bool=False, cache: TTLCache=None, cache_size: int=64, cache_ttl: float=300, **kwargs: dict):
+    self._setup(use_cache, cache, cache_size, cache_ttl, kwargs)
+    self._show(self._load(url))
+
+  def _setup(self, use_cache: bool, cache: TTLCache, cache_size: int, cache_ttl: float, kwargs: dict):
     self._kwargs = kwargs
-    self.current_page = self.get_current_page_number(soup)
-    self.previous_page = self.get_previous_page(soup)
-    self.next_page = self.get_next_page(soup)
-    self.releases = self.get_releases(soup)
     self.use_cache = use_cache
+    self._cache = (cache if cache is not None else TTLCache(maxsize=cache_size, ttl=cache_ttl)) if use_cache else None
+    self._visited = {}
     self._current_index = 0
-    if use_cache:
-      self._cache[self.current_page] = self.releases
-      self._previous_page_cache[self.current_page] = self.previous_page
-      self._next_page_cache[self.current_page] = self.next_page
+    self.missing_pages = []
 
+  def _parse(self, html: str, url: str, kwargs: dict):
+    options = {key: kwargs.pop(key) for key in ('use_cache', 'cache', 'cache_size', 'cache_ttl') if key in kwargs}
+    self._setup(options.get('use_cache', False), options.get('cache'), options.get('cache_size', 64), options.get('cache_ttl', 300), kwargs)
+    self._show(self._store(url, html))
 
   def __iter__(self):
     self._current_index = 0
@@ -739,95 +677,154 @@ class OngoingParser(Parser):
 
   @property
   def results(self):
-    return [release for page in self._cache.values() for release in page] if self.use_cache else self.releases
+    if not self.use_cache: return self.releases
+    pages = sorted((page for key in self._visited if (page := self._cache.peek(key))), key=lambda page: page['currentPage'] if isinstance(page['currentPage'], int) else 0)
+    return [release for page in pages for release in page['releases']]
+
+  @staticmethod
+  def _page_key(url: str) -> str:
+    return re.sub(r'page/1/?$', '', url)
+
+  def _cached(self, key: str) -> dict:
+    if not self.use_cache: return None
+    page = self._cache.get(key)
+    metrics.emit('cache', cache=type(self).__name__, key=key, hit=page is not None)
+    return page
+
+  def _store(self, url: str, html: str) -> dict:
+    page = self.spec.extract(make_soup(html, url))
+    page = {
+      'url': url,
+      'currentPage': page['current_page_number'],
+      'previousPage': page['previous_page'],
+      'nextPage': page['next_page'],
+      'allPages': page['all_pages'],
+      'releases': page['releases']
+    }
+    if self._kwargs.get('normalize'): normalize.annotate(page['releases'])
+    if self.use_cache:
+      key = self._page_key(url)
+      self._cache[key] = page
+      self._visited[key] = None
+    return page
+
+  def _load(self, url: str) -> dict:
+    if (page := self._cached(self._page_key(url))) is not None: return page
+    response = fetch.get(url, **self._kwargs)
+    return self._store(url, response.text)
+
+  async def _aload(self, client: httpx.AsyncClient, url: str) -> dict:
+    if (page := self._cached(self._page_key(url))) is not None: return page
+    response = await fetch.aget(client, url, **self._kwargs)
+    return self._store(url, response.text)
+
+  def _show(self, page: dict):
+    self.url = page['url']
+    self.current_page = page['currentPage']
+    self.previous_page = page['previousPage']
+    self.next_page = page['nextPage']
+    self.all_pages = page.get('allPages', [])
+    self.releases = page['releases']
+    numbers = [link['pageNumber'] for link in self.all_pages if isinstance(link['pageNumber'], int)]
+    self.last_page = max([*numbers, self.current_page if isinstance(self.current_page, int) else 1])
+
+  def page_url(self, number: int) -> str:
+    listed = next((page['url'] for page in self.all_pages if page['pageNumber'] == number), None)
+    if listed: return listed
+    # paginated listings live at `<listing>/page/<number>/`, the first page at `<listing>/`
+    base = re.sub(r'page/\d+/?$', '', self.url)
+    base = base if base.endswith('/') else base + '/'
+    return base if number == 1 else f'{base}page/{number}/'
+
+  def page(self, number: int) -> list:
+    self._show(self._load(self.page_url(number)))
+    return self.releases
+
+  async def apage(self, number: int, client: httpx.AsyncClient=None) -> list:
+    if client is None:
+      async with fetch.async_client(**self._kwargs) as client:
+        return await self.apage(number, client)
+    self._show(await self._aload(client, self.page_url(number)))
+    return self.releases
+
+  async def apages(self, numbers=None, client: httpx.AsyncClient=None, deadline: float=None) -> list:
+    numbers = list(numbers if numbers is not None else range(1, self.last_page + 1))
+    if client is None:
+      async with fetch.async_client(**self._kwargs) as client:
+        return await self.apages(numbers, client, deadline)
+    async def load(number):
+      url = self.page_url(number)
+      # the current page is parsed already
+      return self.releases if url == self.url else (await self._aload(client, url))['releases']
+    if deadline is None:
+      pages = await asyncio.gather(*[load(number) for number in numbers])
+      return [release for releases in pages for release in releases]
+    tasks = {asyncio.create_task(load(number)): number for number in numbers}
+    try:
+      _, pending = await asyncio.wait(tasks, timeout=max(deadline, 0))
+    finally:
+      for task in tasks: task.cancel()
+    failed = {task for task in tasks if task not in pending and task.exception() is not None}
+    self.missing_pages = [tasks[task] for task in tasks if task in pending or task in failed]
+    if pending: metrics.emit('error', where='ListingParser.deadline', error='DeadlineExceeded', pending=len(pending), total=len(tasks))
+    return [release for task in tasks if task not in pending and task not in failed for release in task.result()]
+
+  def pages(self, numbers=None, deadline: float=None) -> list:
+    loop = runner.get_loop()
+    return loop.run(self.apages(numbers, loop.client(**self._kwargs), deadline))
+
+  async def __aiter__(self):
+    async with fetch.async_client(**self._kwargs) as client:
+      while True:
+        for release in self.releases:
+          yield release
+        if not self.next_page: break
+        self._show(await self._aload(client, self.next_page))
 
   def previous(self):
-    if self.previous_page:
-      if current_page := (self.current_page - 1) in self._cache and self.use_cache:
-        self.current_page = current_page
-        self.next_page = self._next_page_cache[current_page]
-        self.previous_page = self._previous_page_cache[current_page]
-        self.releases = self._cache[current_page]
-      else:
-        response = httpx.get(self.next_page,
-                             headers={'User-Agent': self._kwargs.get('user_agent', random.choice(userAgents))},
-                             timeout=self._kwargs.get('timeout', 10),
-                              proxy=self._kwargs.get('proxy'))
-        soup = bs(response.text, 'html.parser')
-        self.current_page = self.get_current_page_number(soup)
-        self.next_page = self.get_next_page(soup)
-        self.previous_page = self.get_previous_page(soup)
-        self.releases = self.get_releases(soup)
-        if self.use_cache:
-          self._cache[self.current_page] = self.releases
-          self._previous_page_cache[current_page] = self.get_previous_page(soup)
-          self._next_page_cache[current_page] = self.get_next_page(soup)
+    if self.previous_page: self._show(self._load(self.previous_page))
     return self.releases
 
   def next(self):
-    if self.next_page:
-      if current_page := (self.current_page + 1) in self._cache and self.use_cache:
-        self.current_page = current_page
-        self.next_page = self._next_page_cache[current_page]
-        self.previous_page = self._previous_page_cache[current_page]
-        self.releases = self._cache[current_page]
-      else:
-        response = httpx.get(self.next_page,
-                             headers={'User-Agent': self._kwargs.get('user_agent', random.choice(userAgents))},
-                             timeout=self._kwargs.get('timeout', 10),
-                              proxy=self._kwargs.get('proxy'))
-        soup = bs(response.text, 'html.parser')
-        self.current_page = self.get_current_page_number(soup)
-        self.next_page = self.get_next_page(soup)
-        self.releases = self.get_releases(soup)
-        if self.use_cache:
-          self._cache[self.current_page] = self.releases
-          self._previous_page_cache[current_page] = self.get_previous_page(soup)
-          self._next_page_cache[current_page] = self.get_next_page(soup)
+    if self.next_page: self._show(self._load(self.next_page))
     return self.releases
 
-  @staticmethod
-  def get_releases(soup: bs):
-    releases = soup.find_all('div', class_='detpost')
-    return [
-      {
-      'title': release.h2.text if release.h2 else None,
-      'latestUpload': {
-        'uploadDate': release.find(class_='newnime').text if release.find(class_='newnime') else None,
-        'uploadDay': release.find('div', class_='epztipe').text if release.find('div', class_='epztipe') else None,
-      'episode': release.find(class_='epz').text if release.find(class_='epz') else None
-      },
-      'url': release.a.get('href') if release.a else None,
-      'thumbnail': {
-        'url': release.img.get('src'),
-        'width': release.img.get('width'),
-        'height': release.img.get('height'),
-        'srcset': release.img.get('srcset').split()[::2] if release.img.get('srcset') else []
-      } if release.img else {}
-      }
-    for release in releases
-    ]
+  get_releases = staticmethod(listingPage.extractor('releases'))
+  get_all_pages = staticmethod(listingPage.extractor('all_pages'))
+  get_previous_page = staticmethod(listingPage.extractor('previous_page'))
+  get_next_page = staticmethod(listingPage.extractor('next_page'))
+  get_current_page_number = staticmethod(listingPage.extractor('current_page_number'))
 
-  @staticmethod
-  def get_all_pages(soup: bs)-> list:
-    return [
-      {
-        'pageNumber': int(page.text) if page.text.isnumeric() else page.text,
-        'url': page.get('href')
-      }
-     for page in soup.find_all('a',class_='page-numbers')]
 
-  @staticmethod
-  def get_previous_page(soup: bs) ->str:
-    return soup.find('a', class_='prev page-numbers').get('href') if soup.find('a', class_='prev page-numbers') else None
+class OngoingParser(ListingParser):
+  """
+  OngoingParser parses the ongoing anime listing (otakudesu ongoing anime url), see `ListingParser`.
+
+  Example:
+    >>> from otakudesudata.parser import OngoingParser
+    >>> from otakudesudata.constants import ongoingUrl
+    >>> ongoing = OngoingParser(ongoingUrl, use_cache=True)
+    >>> ongoing.releases[0]['title']
+    'One Piece'
+  """
 
-  @staticmethod
-  def get_next_page(soup: bs) ->str:
-    return soup.find('a', class_='next page-numbers').get('href') if soup.find('a', class_='next page-numbers') else None
 
-  @staticmethod
-  def get_current_page_number(soup: bs) ->int:
-    return (int(soup.find('span', class_='page-numbers current').text) if soup.find('span', class_='page-numbers current').text.isnumeric() else soup.find('span', class_='page-numbers current').text) if soup.find('span', class_='page-numbers current') else None
+class GenreParser(ListingParser):
+  """
+  GenreParser parses the anime of a genre (`genreUrl` + the genre, or the `url` of a genre returned by the other
+  parsers), see `ListingParser`. Genre pages have the pagination of the other listings, but list every anime as a
+  `col-anime` card: its `title`, `url`, `studio`, `totalEpisodes`, `rating`, `genres`, `synopsis`, `season` and
+  `thumbnail`.
+
+  Example:
+    >>> from otakudesudata.parser import GenreParser
+    >>> from otakudesudata.constants import genreUrl
+    >>> action = GenreParser(genreUrl + 'action/')
+    >>> action.releases[0]['studio']
+    'MAPPA'
+  """
+  spec = genrePage
+
 
 class AsyncParser(Parser):
   def __init__(self, client: httpx.AsyncClient, **kwargs: dict):
@@ -835,60 +832,138 @@ class AsyncParser(Parser):
     self._proxy = kwargs.get('proxy')
     self._userAgent = kwargs.get('user_agent')
     self._timeout = kwargs.get('timeout', 10)
+    self._mirrors = kwargs.get('mirrors')
+    self._resolver = kwargs.get('resolver')
+    self._archive = kwargs.get('archive')
+    self._hedge = kwargs.get('hedge')
+    self._scheduler = kwargs.get('scheduler')
+    self._priority = kwargs.get('priority')
+
+  @property
+  def _fetchOptions(self) -> dict:
+    return {
+      'user_agent': self._userAgent, 'timeout': self._timeout, 'mirrors': self._mirrors, 'proxy': self._proxy,
+      'archive': self._archive, 'hedge': self._hedge, 'scheduler': self._scheduler, 'priority': self._priority
+    }
+
+  detailsOptions = ('get_anime_details', 'get_latest_episode', 'get_episode_details', 'get_batch_details')
 
   @staticmethod
-  async def get_details(self, **kwargs: dict)-> None:
+  def run_details(self, **kwargs: dict)-> None:
+    """
+    Fetches other details for a parser from synchronous code. Does nothing (no event loop, no client) unless one of
+    `get_anime_details`, `get_latest_episode`, `get_episode_details` or `get_batch_details` is set; otherwise the work runs on the shared
+    background event loop over a persistent pooled client, so consecutive calls reuse open connections. A `deadline`
+    bounds the work as a whole (see `_until_deadline`).
+    """
+    if not any(kwargs.get(option) for option in AsyncParser.detailsOptions): return None
+    loop = runner.get_loop()
+    loop.run(AsyncParser.get_details(self, client=loop.client(**kwargs), **kwargs))
+
+  @staticmethod
+  async def get_details(self, client: httpx.AsyncClient=None, **kwargs: dict)-> None:
     try:
-      max = kwargs.get('client_max_connections', 100)
-      _20percentage = int(20 * max / 100)
-      keepalive = kwargs.get('max_keepalive_connections', _20percentage if _20percentage > 1 else 1)
-      async with httpx.AsyncClient(proxy=kwargs.get('proxy'), limits=httpx.Limits(max_connections=max, max_keepalive_connections=keepalive, keepalive_expiry=kwargs.get('keepalive_expiry', 5))) as client:
-        parser = AsyncParser(
-          client,
-          timout=kwargs.get('timeout'),
-          user_agent=kwargs.get('user_agent')
-        )
-        tasks = []
-        tasks.extend( [asyncio.create_task(parser.asyncGetAnimeDetails(anime, update_details=kwargs.get('update_details'))) for anime in getattr(self, 'anime', []) ] ) if kwargs.get('get_anime_details') else None 
-        tasks.extend( [asyncio.create_task(parser.asyncGetEpisodeDetails(episode)) for episode in getattr(self, 'episodes',[]) ]) if kwargs.get('get_episode_details') else None
-        if kwargs.get('get_batch_details') and isinstance(batch := getattr(self,'batch',[]), dict): tasks.append(asyncio.create_task(parser.asyncGetBatchDetails(batch)))
-        elif kwargs.get('get_batch_details') and isinstance(batch := getattr(self,'batch',[]), list): tasks.extend( [ asyncio.create_task(parser.asyncGetBatchDetails(b)) for b in batch ])        
-        await asyncio.gather(*tasks)
+      if client is not None: return await AsyncParser._get_details(self, client, **kwargs)
+      async with fetch.async_client(**kwargs) as client:
+        await AsyncParser._get_details(self, client, **kwargs)
     except Exception as e:
+      metrics.emit('error', where='AsyncParser.get_details', error=type(e).__name__)
       if kwargs.get('raise_exception'): raise e
 
+  @staticmethod
+  async def _get_details(self, client: httpx.AsyncClient, **kwargs: dict)-> None:
+    parser = AsyncParser(
+      client,
+      timeout=kwargs.get('timeout', 10),
+      user_agent=kwargs.get('user_agent'),
+      mirrors=kwargs.get('mirrors'),
+      proxy=kwargs.get('proxy'),
+      resolver=resolver_for(kwargs['resolve_links'], kwargs) if kwargs.get('resolve_links') else None,
+      archive=kwargs.get('archive'),
+      hedge=kwargs.get('hedge'),
+      scheduler=kwargs.get('scheduler'),
+      priority=kwargs.get('priority')
+    )
+    # every task with the item it enriches
+    tasks = {}
+    def add(item, coroutine): tasks[asyncio.create_task(coroutine)] = item
+    if kwargs.get('get_latest_episode'): [add(anime, parser.asyncGetLatestEpisode(anime, update_details=kwargs.get('update_details'))) for anime in getattr(self, 'anime', [])]
+    elif kwargs.get('get_anime_details'): [add(anime, parser.asyncGetAnimeDetails(anime, update_details=kwargs.get('update_details'))) for anime in getattr(self, 'anime', [])]
+    [add(episode, parser.asyncGetEpisodeDetails(episode)) for episode in getattr(self, 'episodes', [])] if kwargs.get('get_episode_details') else None
+    if kwargs.get('get_batch_details') and isinstance(batch := getattr(self,'batch',[]), dict): add(batch, parser.asyncGetBatchDetails(batch))
+    elif kwargs.get('get_batch_details') and isinstance(batch := getattr(self,'batch',[]), list): [add(b, parser.asyncGetBatchDetails(b)) for b in batch]
+    try:
+      if kwargs.get('deadline') is None: await asyncio.gather(*tasks)
+      else: await AsyncParser._until_deadline(tasks, kwargs['deadline'], kwargs.get('raise_exception'))
+    finally:
+      for task in tasks: task.cancel() # a failed task must not leave the others running on a shared loop
+
+  @staticmethod
+  async def _until_deadline(tasks: dict, deadline: float, raise_exception: bool=False) -> None:
+    # waits for the tasks until `deadline` seconds have passed, cancels the others, and flags every item with how its
+    # enrichment ended: 'ok', 'error' (with the exception name in `fetchError`) or 'timeout'
+    pending = set()
+    if tasks: _, pending = await asyncio.wait(tasks, timeout=max(deadline, 0))
+    for task in pending: task.cancel()
+    errors = []
+    for task, item in tasks.items():
+      if not isinstance(item, dict): continue
+      if task in pending: item['fetchStatus'] = 'timeout'
+      elif (error := task.exception()) is not None:
+        item['fetchStatus'], item['fetchError'] = 'error', type(error).__name__
+        errors.append(error)
+      else: item['fetchStatus'] = 'ok'
+    if pending: metrics.emit('error', where='AsyncParser.deadline', error='DeadlineExceeded', pending=len(pending), total=len(tasks))
+    if errors and raise_exception: raise errors[0]
+
   async def asyncGetAnimeDetails(self, anime: dict, update_details: bool=False)-> None:
     try:
       if not isinstance(anime, dict) or not anime.get('url'): return None #validate object and url
-      r = await self._client.get(
-        url=anime['url'],
-        headers={'User-Agent': self._userAgent or random.choice(userAgents)},
-                           timeout=self._timeout
-                           )
-      soup = bs(r.text, 'html.parser')
-      details = AnimeParser.get_details(soup)
+      r = await fetch.aget(self._client, anime['url'], **self._fetchOptions)
+      soup = make_soup(r.text, anime['url'])
+      page = animePage.extract(soup, ('details', 'episodes', 'batch', 'description', 'seasons', 'feed'))
+      details = page['details']
       [anime.update({key: details.get(key)}) for key in details.keys() if key not in anime.keys() and not update_details]                        
-      anime['episodes'] = AnimeParser.get_episodes(soup)
-      anime['batch'] = AnimeParser.get_batch(soup)
-      anime['description'] = AnimeParser.get_description(soup)
-      anime['seasons'] = AnimeParser.get_seasons(soup)
-      anime['feeds'] = AnimeParser.get_feed(soup)
+      anime['episodes'] = page['episodes']
+      anime['batch'] = page['batch']
+      anime['description'] = page['description']
+      anime['seasons'] = page['seasons']
+      anime['feeds'] = page['feed']
     except Exception as e:
       raise e
 
+  @staticmethod
+  def latest_episode(episodes: list) -> dict:
+    """
+    Returns the latest of the episodes of an anime page, by release date then episode number, whatever order the page
+    lists them in, or None.
+    """
+    def key(episode):
+      number = re.search(r'Episode\s*(\d+)', episode.get('title') or '', re.I)
+      return normalize.parse_date(episode.get('releaseDate')) or '', int(number.group(1)) if number else 0
+    episodes = [episode for episode in episodes or [] if isinstance(episode, dict) and episode.get('url')]
+    return max(episodes, key=key) if episodes else None
+
+  async def asyncGetLatestEpisode(self, anime: dict, update_details: bool=False)-> None:
+    if not isinstance(anime, dict) or not anime.get('url'): return None
+    # the episode list comes with the anime details
+    if 'episodes' not in anime: await self.asyncGetAnimeDetails(anime, update_details=update_details)
+    if (latest := self.latest_episode(anime.get('episodes'))) is None: return None
+    episode = dict(latest)
+    await self.asyncGetEpisodeDetails(episode)
+    anime['latestEpisode'] = episode
+
   async def asyncGetEpisodeDetails(self, episode: dict)->None:
     try:
       if not isinstance(episode, dict) or not episode.get('url'): return None #validate object and url
-      r = await self._client.get(
-        url=episode['url'],
-        headers={'User-Agent': self._userAgent or random.choice(userAgents)},
-                           timeout=self._timeout
-                           )
-      soup = bs(r.text, 'html.parser')
-      episode['details'] = EpisodeParser.get_details(soup)
-      episode['thumbnails'] = EpisodeParser.get_thumbnails(soup)
-      episode['otherEpisodes'] = EpisodeParser.get_episodes(soup)
-      episode['links'] = EpisodeParser.get_links(soup)
+      r = await fetch.aget(self._client, episode['url'], **self._fetchOptions)
+      soup = make_soup(r.text, episode['url'])
+      page = episodePage.extract(soup, ('details', 'thumbnails', 'episodes', 'links'))
+      episode['details'] = page['details']
+      episode['thumbnails'] = page['thumbnails']
+      episode['otherEpisodes'] = page['episodes']
+      episode['links'] = page['links']
+      if self._resolver: await self._resolver.annotate(episode['links'], self._client)
     except Exception as e:
       print(e)
       raise e
@@ -896,14 +971,12 @@ class AsyncParser(Parser):
   async def asyncGetBatchDetails(self, batch:dict)-> None:
     try:
       if not isinstance(batch, dict) or not batch.get('url'): return None #validate object and url
-      r = await self._client.get(
-        url=batch['url'],
-        headers={'User-Agent': self._userAgent or random.choice(userAgents)},
-                           timeout=self._timeout
-                           )
-      soup = bs(r.text, 'html.parser')
-      batch['thumbnails'] = BatchParser.get_thumbnails(soup)
-      batch['description'] = BatchParser.get_description(soup)
-      batch['links'] = BatchParser.get_links(soup)
+      r = await fetch.aget(self._client, batch['url'], **self._fetchOptions)
+      soup = make_soup(r.text, batch['url'])
+      page = batchPage.extract(soup, ('thumbnails', 'description', 'links'))
+      batch['thumbnails'] = page['thumbnails']
+      batch['description'] = page['description']
+      batch['links'] = page['links']
+      if self._resolver: await self._resolver.annotate(batch['links'], self._client)
     except Exception as e:
       raise e
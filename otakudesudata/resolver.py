@@ -0,0 +1,159 @@
+from otakudesudata import fetch, metrics, proxies, runner, scheduler
+from otakudesudata.cache import TTLCache
+from time import perf_counter
+import asyncio
+import re
+import httpx
+
+_contentRange = re.compile(r'/\s*(\d+)\s*$')
+
+
+class LinkResolver:
+  """
+  Resolves the download links returned by `EpisodeParser.get_links` / `BatchParser.get_links` (shortener and
+  safelink URLs) to the URL of the file they end at, concurrently.
+
+  Every link is requested with `HEAD`, following redirects; when the final server refuses `HEAD` or does not tell
+  the size, a `GET` of the first byte (`Range: bytes=0-0`) gets it from `Content-Range` without downloading the
+  file. Resolved targets are cached (with a TTL), and a URL appearing several times is resolved once.
+
+  Only HTTP redirects are followed: a host that redirects with JavaScript or an HTML form ends at that page.
+
+  Args:
+    concurrency (int, optional): Links resolved at once. Defaults to 20.
+    max_redirects (int, optional): Redirects followed per link. Defaults to 10.
+    cache (TTLCache, optional): Cache of resolved targets, to share between resolvers. Defaults to a new cache.
+    cache_size (int, optional): Entries of a new cache. Defaults to 1024.
+    cache_ttl (float, optional): Seconds a resolved target stays cached. Defaults to 3600.
+    **kwargs (dict): Request options: user_agent, timeout, headers, proxy (a proxy or a `ProxyPool`, which every
+      request goes through even on a given client), scheduler and priority (see `otakudesudata.scheduler`) and the
+      client options of `fetch.async_client` (http2, client_max_connections, ...) used when no client is given.
+
+  Each link dictionary (`{'host': ..., 'url': ...}`) is annotated with:
+    - finalUrl (str): The URL the link ends at, None when it could not be reached.
+    - contentLength (int): The size of the file in bytes, None when the server does not tell.
+    - latency (float): Seconds the resolution took (0 when it came from the cache).
+    - error (str): Only when the resolution failed, the exception name or the HTTP status.
+
+  Methods:
+    resolve(url: str, client: httpx.AsyncClient = None) -> dict:
+      Resolves one URL (a coroutine). Returns `finalUrl`, `contentLength`, `latency` (and `error`).
+    annotate(links: dict, client: httpx.AsyncClient = None) -> dict:
+      Resolves every link of a `get_links` dictionary concurrently and annotates the link dictionaries in place (a coroutine).
+    resolve_links(links: dict) -> dict:
+      `annotate` for synchronous code, run on the shared background event loop.
+
+  Example:
+    >>> from otakudesudata.parser import EpisodeParser
+    >>> from otakudesudata.resolver import LinkResolver
+    >>> episode = EpisodeParser('https://otakudesu.cloud/episode/jjk-episode-12-sub-indo/')
+    >>> LinkResolver().resolve_links(episode.links)
+    >>> episode.links['mp4480p'][0]
+    {'host': 'odfiles', 'url': 'https://desustream.com/safelink/link/?id=2e05cb5c7427', 'finalUrl': 'https://...mp4', 'contentLength': 90911539, 'latency': 0.84}
+  """
+  def __init__(self, concurrency: int=20, max_redirects: int=10, cache: TTLCache=None, cache_size: int=1024, cache_ttl: float=3600, **kwargs: dict):
+    self.concurrency = concurrency
+    self.max_redirects = max_redirects
+    self.cache = cache if cache is not None else TTLCache(maxsize=cache_size, ttl=cache_ttl)
+    self._kwargs = kwargs
+
+  async def _request(self, client: httpx.AsyncClient, method: str, url: str, headers: dict=None) -> httpx.Response:
+    start = perf_counter()
+    request = client.build_request(method, url, headers={**fetch.get_headers(self._kwargs), **(headers or {})}, timeout=self._kwargs.get('timeout', 10))
+    try:
+      # redirects are followed here rather than by the client so `max_redirects` holds for shared clients too
+      for redirects in range(self.max_redirects + 1):
+        response = await self._send(client, request)
+        if response.next_request is None: break
+        request = response.next_request
+      else:
+        raise httpx.TooManyRedirects('Exceeded maximum allowed redirects.', request=request)
+    except Exception as e:
+      metrics.emit('fetch', url=url, error=type(e).__name__, elapsed=perf_counter() - start)
+      raise
+    metrics.emit('fetch', url=url, status=response.status_code, bytes=0, elapsed=perf_counter() - start)
+    return response
+
+  async def _send(self, client: httpx.AsyncClient, request: httpx.Request) -> httpx.Response:
+    # every hop takes a slot of the request scheduler, like the requests of `fetch`
+    if (chosen := self._kwargs.get('scheduler') or scheduler.installed()) is None: return await self._hop(client, request)
+    async with chosen.aslot(self._kwargs.get('priority')):
+      return await self._hop(client, request)
+
+  async def _hop(self, client: httpx.AsyncClient, request: httpx.Request) -> httpx.Response:
+    async def send(client):
+      response = await client.send(request, stream=True)
+      # the body is never needed: HEAD has none and the ranged GET only asks for one byte
+      await response.aclose()
+      return response
+    # with a `ProxyPool` the client has no proxy, every hop goes through the pool's own per-proxy clients
+    if isinstance(pool := self._kwargs.get('proxy'), proxies.ProxyPool): return await pool.asend(lambda proxy: send(pool.async_client(proxy)))
+    return await send(client)
+
+  @staticmethod
+  def _length(response: httpx.Response) -> int:
+    if response.status_code == 206 and (match := _contentRange.search(response.headers.get('content-range', ''))): return int(match.group(1))
+    if response.status_code == 200 and (length := response.headers.get('content-length', '')).isdigit(): return int(length)
+    return None
+
+  async def _resolve(self, client: httpx.AsyncClient, url: str) -> dict:
+    start = perf_counter()
+    try:
+      response = await self._request(client, 'HEAD', url)
+      length = self._length(response)
+      if length is None and (response.status_code < 300 or response.status_code in (400, 403, 405, 501)):
+        # HEAD refused or no size: ask for the first byte of the final URL instead
+        response = await self._request(client, 'GET', str(response.url), {'Range': 'bytes=0-0'})
+        length = self._length(response)
+    except httpx.HTTPError as e:
+      return {'finalUrl': None, 'contentLength': None, 'latency': perf_counter() - start, 'error': type(e).__name__}
+    result = {'finalUrl': str(response.url), 'contentLength': length, 'latency': perf_counter() - start}
+    if response.status_code >= 400: result['error'] = str(response.status_code)
+    else: self.cache[url] = result
+    return result
+
+  async def resolve(self, url: str, client: httpx.AsyncClient=None) -> dict:
+    cached = self.cache.get(url)
+    metrics.emit('cache', cache=type(self).__name__, key=url, hit=cached is not None)
+    if cached is not None: return {**cached, 'latency': 0}
+    if client is not None: return await self._resolve(client, url)
+    async with self._client() as client:
+      return await self._resolve(client, url)
+
+  def _client(self) -> httpx.AsyncClient:
+    return fetch.async_client(**self._kwargs)
+
+  async def annotate(self, links: dict, client: httpx.AsyncClient=None) -> dict:
+    items = [link for resolution in (links or {}).values() for link in resolution if isinstance(link, dict) and link.get('url')]
+    if not items: return links
+    if client is None:
+      async with self._client() as client:
+        return await self.annotate(links, client)
+    semaphore = asyncio.Semaphore(self.concurrency)
+    async def resolve(url):
+      async with semaphore:
+        return await self.resolve(url, client)
+    urls = list(dict.fromkeys(link['url'] for link in items))
+    results = dict(zip(urls, await asyncio.gather(*[resolve(url) for url in urls])))
+    for link in items:
+      link.update(results[link['url']])
+    return links
+
+  def resolve_links(self, links: dict) -> dict:
+    loop = runner.get_loop()
+    client = loop.client(**self._kwargs)
+    return loop.run(self.annotate(links, client))
+
+
+_cache = TTLCache(maxsize=1024, ttl=3600)
+
+_requestOptions = ('user_agent', 'timeout', 'headers', 'scheduler', 'priority') + runner.BackgroundLoop.clientOptions
+
+
+def resolver_for(option, kwargs: dict) -> LinkResolver:
+  """
+  Returns the resolver of a `resolve_links` option: the option itself when it is a `LinkResolver`, otherwise a
+  resolver with the request options of `kwargs` sharing one cache with every other such resolver of the process.
+  """
+  if isinstance(option, LinkResolver): return option
+  return LinkResolver(cache=_cache, **{key: kwargs[key] for key in _requestOptions if key in kwargs})
@@ -0,0 +1,111 @@
+from otakudesudata import fetch
+import asyncio
+import threading
+import atexit
+import os
+
+
+class BackgroundLoop:
+  """
+  A single event loop running on a daemon thread, so synchronous callers can run coroutines without creating a new
+  event loop per call, and the pooled asynchronous clients (and their open connections) it holds are reused
+  across calls.
+
+  Methods:
+    run(coroutine, timeout: float = None):
+      Runs `coroutine` on the loop and blocks until it finishes. Returns its result or raises its exception.
+    client(**kwargs) -> httpx.AsyncClient:
+      Returns the persistent client for the given client options (see `fetch.async_client`), creating it on first use.
+    on_close(callback):
+      Registers a coroutine function awaited on the loop when it is closed, e.g. to close clients kept elsewhere.
+    close():
+      Awaits the `on_close` callbacks, closes every client and stops the loop.
+
+  Example:
+    >>> from otakudesudata.runner import get_loop
+    >>> loop = get_loop()
+    >>> response = loop.run(loop.client().get('https://otakudesu.cloud/'))
+  """
+  clientOptions = ('proxy', 'client_max_connections', 'max_keepalive_connections', 'keepalive_expiry', 'http1', 'http2')
+
+  def __init__(self):
+    self._loop = asyncio.new_event_loop()
+    self._clients = {}
+    self._callbacks = []
+    self._lock = threading.Lock()
+    self._thread = threading.Thread(target=self._loop.run_forever, name='otakudesudata-loop', daemon=True)
+    self._thread.start()
+
+  def run(self, coroutine, timeout: float=None):
+    if threading.current_thread() is self._thread: raise RuntimeError('BackgroundLoop.run() cannot be called from the loop it runs on')
+    return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+  def client(self, **kwargs: dict):
+    key = tuple(repr(kwargs.get(option)) for option in self.clientOptions)
+    with self._lock:
+      if (client := self._clients.get(key)) is None or client.is_closed:
+        client = self._clients[key] = fetch.async_client(**kwargs)
+      return client
+
+  def on_close(self, callback) -> None:
+    with self._lock:
+      self._callbacks.append(callback)
+
+  def close(self) -> None:
+    if self._loop.is_closed(): return None
+    async def close():
+      await asyncio.gather(*[callback() for callback in self._callbacks], return_exceptions=True)
+      await asyncio.gather(*[client.aclose() for client in self._clients.values()], return_exceptions=True)
+    if self._thread.is_alive():
+      asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+      self._loop.call_soon_threadsafe(self._loop.stop)
+      self._thread.join()
+    self._clients.clear()
+    self._callbacks.clear()
+    self._loop.close()
+
+
+_background = None
+_lock = threading.Lock()
+
+
+def get_loop() -> BackgroundLoop:
+  """
+  Returns the process-wide `BackgroundLoop`, starting it on first use.
+  """
+  global _background
+  with _lock:
+    if _background is None: _background = BackgroundLoop()
+    return _background
+
+
+def current() -> BackgroundLoop:
+  """
+  Returns the process-wide `BackgroundLoop` when called from the event loop it runs, else None.
+  """
+  try:
+    loop = asyncio.get_running_loop()
+  except RuntimeError:
+    return None
+  background = _background
+  return background if background is not None and background._loop is loop else None
+
+
+def close() -> None:
+  """
+  Stops the process-wide `BackgroundLoop` (if started) and closes its clients. It is started again on next use.
+  """
+  global _background
+  with _lock:
+    background, _background = _background, None
+  if background is not None: background.close()
+
+
+def _forget_after_fork() -> None:
+  # the loop thread does not survive a fork, the child starts its own loop on first use
+  global _background, _lock
+  _background, _lock = None, threading.Lock()
+
+
+atexit.register(close)
+if hasattr(os, 'register_at_fork'): os.register_at_fork(after_in_child=_forget_after_fork)
@@ -0,0 +1,192 @@
+from collections import deque
+from time import perf_counter
+import contextlib
+import threading
+import asyncio
+
+priorities = ('interactive', 'normal', 'bulk')
+defaultShares = {'interactive': 16, 'normal': 4, 'bulk': 1}
+
+_installed = None
+
+
+class RequestScheduler:
+  """
+  Schedules the requests of every function, parser and crawler by priority, so interactive calls are not queued
+  behind the hundreds of requests of a background crawl sharing the same process and connection pool.
+
+  At most `capacity` requests are sent at once. When a request finishes, the next one is taken from the waiting
+  priority classes by weighted fair queuing: each class gets a turn in proportion to its share (16 interactive
+  requests for 4 normal and 1 bulk by default), so higher classes go first without ever starving the lower ones,
+  and requests of one class start in the order they came. A class may also be limited to fewer concurrent
+  requests than `capacity`; bulk requests are limited to three quarters of it by default, which keeps slots free
+  for interactive requests even while a crawl uses every slot it can.
+
+  Pass a `RequestScheduler` as `scheduler=` to any function or parser, or `install()` it for every request of the
+  process, and choose the class of a call with `priority=`. `search` and `get_schedules` default to 'interactive',
+  the crawlers and `ThumbnailStore` to 'bulk' and everything else to 'normal'. Link resolution (`LinkResolver`)
+  takes the priority of the call it is part of.
+
+  Args:
+    capacity (int, optional): Requests sent at once. Defaults to 16.
+    shares (dict, optional): The weight of every priority class. Defaults to `defaultShares`.
+    limits (dict, optional): The most requests of a class sent at once. Defaults to three quarters of `capacity` for bulk.
+
+  Attributes:
+    stats (dict): For every class, the requests `active` and `queued` now, `requests` started and `waited`
+      (seconds spent queued by all of them).
+
+  Example:
+    >>> from otakudesudata import search
+    >>> from otakudesudata.crawler import Crawler, SQLiteWorkQueue
+    >>> from otakudesudata.scheduler import RequestScheduler
+    >>> scheduler = RequestScheduler(capacity=20).install()
+    >>> # in a background thread, every request of the crawl is a bulk request
+    >>> Crawler(SQLiteWorkQueue('crawl.db')).run(concurrency=16)
+    >>> # user searches go ahead of the crawl
+    >>> results = search('one piece', get_anime_details=True)
+  """
+  def __init__(self, capacity: int=16, shares: dict=None, limits: dict=None):
+    if capacity < 1: raise ValueError('capacity must be at least 1')
+    self.capacity = capacity
+    self.shares = {**defaultShares, **(shares or {})}
+    if any(share <= 0 for share in self.shares.values()): raise ValueError('shares must be positive')
+    self.limits = {'bulk': max(1, capacity - capacity // 4), **(limits or {})}
+    self.stats = {priority: {'active': 0, 'queued': 0, 'requests': 0, 'waited': 0.0} for priority in self.shares}
+    self._queues = {priority: deque() for priority in self.shares}
+    # the virtual finish time of the last request every class started, each request taking the inverse of its share
+    self._passes = {priority: 0.0 for priority in self.shares}
+    self._clock = 0.0
+    self._active = 0
+    self._lock = threading.Lock()
+
+  def __repr__(self):
+    return f'RequestScheduler(capacity={self.capacity!r}, shares={self.shares!r})'
+
+  def install(self):
+    """
+    Schedules every request of the process that is not given a `scheduler=`. Returns the scheduler itself.
+    """
+    global _installed
+    _installed = self
+    return self
+
+  def uninstall(self) -> None:
+    global _installed
+    if _installed is self: _installed = None
+
+  def _priority(self, priority: str) -> str:
+    priority = priority or 'normal'
+    if priority not in self.shares: raise ValueError(f'unknown priority {priority!r}, expected one of {tuple(self.shares)}')
+    return priority
+
+  def _startable(self, priority: str) -> bool:
+    return self._active < self.capacity and self.stats[priority]['active'] < self.limits.get(priority, self.capacity)
+
+  def _start(self, priority: str, queued: float=None) -> None:
+    stats = self.stats[priority]
+    stats['active'] += 1
+    stats['requests'] += 1
+    if queued is not None: stats['waited'] += perf_counter() - queued
+    self._active += 1
+    self._clock = max(self._clock, self._passes[priority])
+    self._passes[priority] += 1 / self.shares[priority]
+
+  def _finish(self, priority: str) -> float:
+    return self._passes[priority] + 1 / self.shares[priority]
+
+  def _dispatch(self) -> None:
+    while self._active < self.capacity:
+      waiting = [priority for priority, queue in self._queues.items() if queue and self._startable(priority)]
+      if not waiting: return None
+      priority = min(waiting, key=self._finish)
+      waiter = self._queues[priority].popleft()
+      self.stats[priority]['queued'] -= 1
+      self._start(priority, waiter['queued'])
+      waiter['granted'] = True
+      waiter['wake']()
+
+  def _enter(self, priority: str, wake) -> dict:
+    # starts the request when it may, otherwise queues it and returns its waiter
+    if not self._queues[priority]:
+      # a class that had nothing waiting does not get the turns it missed
+      self._passes[priority] = max(self._passes[priority], self._clock)
+      if self._startable(priority):
+        self._start(priority)
+        return None
+    waiter = {'wake': wake, 'granted': False, 'queued': perf_counter()}
+    self._queues[priority].append(waiter)
+    self.stats[priority]['queued'] += 1
+    return waiter
+
+  def release(self, priority: str) -> None:
+    """
+    Ends a request of `priority` started by `acquire` or `aacquire`, starting the next waiting one.
+    """
+    priority = self._priority(priority)
+    with self._lock:
+      self.stats[priority]['active'] -= 1
+      self._active -= 1
+      self._dispatch()
+
+  def acquire(self, priority: str=None) -> None:
+    """
+    Blocks until a request of `priority` may start.
+    """
+    priority = self._priority(priority)
+    event = threading.Event()
+    with self._lock:
+      waiter = self._enter(priority, event.set)
+    if waiter is not None: event.wait()
+
+  async def aacquire(self, priority: str=None) -> None:
+    """
+    Waits until a request of `priority` may start, without blocking the event loop.
+    """
+    priority = self._priority(priority)
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    def wake(): loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+    with self._lock:
+      waiter = self._enter(priority, wake)
+    if waiter is None: return None
+    try:
+      await future
+    except asyncio.CancelledError:
+      with self._lock:
+        if not waiter['granted']:
+          self._queues[priority].remove(waiter)
+          self.stats[priority]['queued'] -= 1
+          raise
+      # started while being cancelled, the slot goes to the next one
+      self.release(priority)
+      raise
+
+  @contextlib.contextmanager
+  def slot(self, priority: str=None):
+    """
+    Holds a slot of `priority` for the duration of the block.
+    """
+    self.acquire(priority)
+    try:
+      yield self
+    finally:
+      self.release(priority)
+
+  @contextlib.asynccontextmanager
+  async def aslot(self, priority: str=None):
+    """
+    `slot` for asynchronous code.
+    """
+    await self.aacquire(priority)
+    try:
+      yield self
+    finally:
+      self.release(priority)
+
+
+def installed() -> RequestScheduler:
+  """
+  Returns the scheduler installed for the process, None when there is none.
+  """
+  return _installed
@@ -0,0 +1,129 @@
+import json
+
+try:
+  import msgpack
+except ImportError:  # the `msgpack` extra, JSON is used without it
+  msgpack = None
+
+# every serialized value starts with the prefix, the schema version and the format code
+_prefix = b'ODS'
+schema = 1
+_codes = {'msgpack': b'm', 'keys': b'k', 'json': b'j'}
+_formats = {code: name for name, code in _codes.items()}
+# schema version -> function upgrading a value of that version to the next one, applied in order by `loads`
+migrations = {}
+
+
+def default_format() -> str:
+  """
+  Returns the format `dumps` writes by default: 'msgpack' when msgpack is installed, 'json' otherwise.
+  """
+  return 'msgpack' if msgpack is not None else 'json'
+
+
+def _require_msgpack(format: str) -> None:
+  if msgpack is None: raise ImportError(f'the {format} format needs msgpack: pip install otakudesudata[msgpack]')
+
+
+def _encode_keys(value, keys: dict):
+  # replaces every dictionary key with its index in `keys`, so that repeated keys are stored once
+  if isinstance(value, dict):
+    encoded = {}
+    for key, item in value.items():
+      if not isinstance(key, str): raise TypeError(f'keys must be strings, not {type(key).__name__}')
+      encoded[keys.setdefault(key, len(keys))] = _encode_keys(item, keys)
+    return encoded
+  if isinstance(value, (list, tuple)): return [_encode_keys(item, keys) for item in value]
+  return value
+
+
+def _decode_keys(value, table: list):
+  if isinstance(value, dict): return {table[key]: _decode_keys(item, table) for key, item in value.items()}
+  if isinstance(value, list): return [_decode_keys(item, table) for item in value]
+  return value
+
+
+def _results(value):
+  # a parser serializes as its results, without the private state (clients, caches) of `vars()`
+  if hasattr(value, 'results') and not isinstance(value, (dict, list, tuple)):
+    value = value.results
+    if isinstance(value, dict): value = {key: item for key, item in value.items() if not key.startswith('_')}
+  return value
+
+
+def dumps(value, format: str=None) -> bytes:
+  """
+  Serializes parse results (dictionaries, lists, strings, numbers, booleans and None) or a parser's `results`.
+
+  Formats:
+    - 'msgpack': MessagePack, smaller than JSON and several times faster to write.
+    - 'keys': MessagePack with a key table: every dictionary key is stored once and referenced by its index,
+      which makes large exports with many records of the same shape noticeably smaller, at the cost of a slower
+      encoding and decoding than both other formats.
+    - 'json': compact UTF-8 JSON, for consumers without msgpack.
+
+  Args:
+    value: The value to serialize. Dictionary keys must be strings.
+    format (str, optional): One of the formats above. Defaults to `default_format()`.
+
+  Returns:
+    bytes: The value prefixed with the schema version and the format, which `loads` reads back.
+
+  Example:
+    >>> from otakudesudata import serialization
+    >>> data = serialization.dumps({'title': 'Jujutsu Kaisen', 'episodes': []})
+    >>> serialization.loads(data)
+    {'title': 'Jujutsu Kaisen', 'episodes': []}
+  """
+  format = format or default_format()
+  if format not in _codes: raise ValueError(f'unknown format {format!r}, expected one of {", ".join(_codes)}')
+  value = _results(value)
+  header = _prefix + bytes([schema]) + _codes[format]
+  if format == 'json': return header + json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+  _require_msgpack(format)
+  if format == 'keys':
+    keys = {}
+    encoded = _encode_keys(value, keys)
+    return header + msgpack.packb([list(keys), encoded])
+  return header + msgpack.packb(value)
+
+
+def loads(data):
+  """
+  Deserializes what `dumps` wrote, in any format, upgrading values of an older schema with `migrations`.
+
+  Raises:
+    TypeError: If `data` is not bytes.
+    ValueError: If `data` was not written by `dumps`, or with a newer schema than this version of the library reads.
+  """
+  if isinstance(data, str): raise TypeError('serialized data is bytes, not str')
+  data = bytes(data)
+  if len(data) < len(_prefix) + 2 or not data.startswith(_prefix): raise ValueError('not data written by otakudesudata.serialization')
+  version, code, payload = data[len(_prefix)], data[len(_prefix) + 1:len(_prefix) + 2], data[len(_prefix) + 2:]
+  if version > schema: raise ValueError(f'data of schema {version} is newer than the supported schema {schema}')
+  format = _formats.get(code)
+  if format is None: raise ValueError(f'unknown format code {code!r}')
+  if format == 'json': value = json.loads(payload)
+  else:
+    _require_msgpack(format)
+    if format == 'keys':
+      table, encoded = msgpack.unpackb(payload, strict_map_key=False)
+      value = _decode_keys(encoded, table)
+    else: value = msgpack.unpackb(payload)
+  for version in range(version, schema):
+    value = migrations[version](value)
+  return value
+
+
+def dump(value, file, format: str=None) -> None:
+  """
+  Writes `dumps(value, format)` to a binary file object.
+  """
+  file.write(dumps(value, format))
+
+
+def load(file):
+  """
+  Reads a value written by `dump` from a binary file object.
+  """
+  return loads(file.read())
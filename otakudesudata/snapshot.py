@@ -0,0 +1,177 @@
+from otakudesudata import serialization
+import hashlib
+import struct
+import mmap
+import os
+
+# magic, format version, records, then offset and slot count of the URL and title indexes
+_header = struct.Struct('<8sIIQQQQ')
+# key hash (0 marks an empty slot), record offset, record length
+_slot = struct.Struct('<QQI')
+magic = b'ODSNAP\x00\x00'
+# the records are written by `serialization.dumps`
+version = 1
+
+
+def _hash(key: str) -> int:
+  # stable across processes, unlike `hash()`
+  return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+
+def normalize_title(title: str) -> str:
+  """
+  Returns the form titles are indexed and looked up in: case-folded with runs of whitespace collapsed.
+  """
+  return ' '.join(str(title).casefold().split())
+
+
+def _records(items):
+  # `WorkQueue.results()` triples, (url, result) pairs or result dictionaries holding their `url`
+  for item in items:
+    if isinstance(item, dict): url, kind, result = item.get('url'), item.get('kind'), item
+    elif len(item) == 3: url, kind, result = item
+    else: (url, result), kind = item, None
+    if not url: continue
+    record = dict(result)
+    record.setdefault('url', url)
+    if kind: record.setdefault('kind', kind)
+    yield url, record
+
+
+def _table(entries: list) -> tuple:
+  slots = 1
+  while slots < 2 * len(entries): slots *= 2
+  table = [None] * slots
+  for key, offset, length in entries:
+    position = (hashed := _hash(key)) & (slots - 1)
+    while table[position] is not None:
+      position = (position + 1) & (slots - 1)
+    table[position] = (hashed, offset, length)
+  return b''.join(_slot.pack(*(entry or (0, 0, 0))) for entry in table), slots
+
+
+def write_snapshot(path: str, items) -> int:
+  """
+  Writes parse results to a snapshot file that `Snapshot` opens.
+
+  The file holds every record (a result dictionary with its `url` and `kind`, serialized with `serialization.dumps`)
+  followed by two open addressing hash tables, by URL and by normalized title, pointing to the records. It is
+  written to a temporary file and moved over `path`, so processes that have the previous snapshot open keep reading
+  it undisturbed.
+
+  Args:
+    path (str): The path of the snapshot file.
+    items (iterable): The results: `(url, kind, result)` triples such as `SQLiteWorkQueue.results()` yields,
+      `(url, result)` pairs, or result dictionaries holding their `url`. A URL given twice keeps its last result.
+
+  Returns:
+    int: The number of records written.
+  """
+  records = dict(_records(items))
+  temporary = f'{path}.{os.getpid()}.tmp'
+  try:
+    with open(temporary, 'wb') as file:
+      file.write(b'\x00' * _header.size)
+      urls, titles = [], []
+      for url, record in records.items():
+        data = serialization.dumps(record)
+        offset = file.tell()
+        file.write(data)
+        urls.append((url, offset, len(data)))
+        if record.get('title'): titles.append((normalize_title(record['title']), offset, len(data)))
+      urlTable, urlSlots = _table(urls)
+      titleTable, titleSlots = _table(titles)
+      urlOffset = file.tell()
+      file.write(urlTable)
+      titleOffset = file.tell()
+      file.write(titleTable)
+      file.seek(0)
+      file.write(_header.pack(magic, version, len(records), urlOffset, urlSlots, titleOffset, titleSlots))
+    os.replace(temporary, path)
+  except BaseException:
+    if os.path.exists(temporary): os.remove(temporary)
+    raise
+  return len(records)
+
+
+class Snapshot:
+  """
+  A read-only catalog snapshot written by `write_snapshot`, memory-mapped so that every process serving it shares
+  the same pages of memory (the operating system's page cache) instead of holding its own copy of the parsed
+  catalog. A lookup hashes the key, probes the index in the mapping and decodes only the record it points to.
+
+  Args:
+    path (str): The path of the snapshot file.
+
+  Methods:
+    get(url: str, default=None) -> dict:
+      Returns the record of `url`, or `default`.
+    find(title: str) -> list:
+      Returns the records whose title matches `title` (compared after `normalize_title`).
+    urls() -> iterator:
+      Iterates the URLs of the snapshot.
+    close():
+      Unmaps the file.
+
+  Example:
+    >>> from otakudesudata.crawler import SQLiteWorkQueue
+    >>> from otakudesudata.snapshot import Snapshot, write_snapshot
+    >>> write_snapshot('catalog.snap', SQLiteWorkQueue('crawl.db').results())
+    >>> catalog = Snapshot('catalog.snap')  # in every worker process
+    >>> catalog.get('https://otakudesu.cloud/anime/jujutsu-kaisen-sub-indo/')['title']
+    'Jujutsu Kaisen'
+    >>> [record['url'] for record in catalog.find('jujutsu kaisen')]
+    ['https://otakudesu.cloud/anime/jujutsu-kaisen-sub-indo/']
+  """
+  def __init__(self, path: str):
+    self.path = path
+    with open(path, 'rb') as file:
+      self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    fileMagic, fileVersion, self._count, self._urlOffset, self._urlSlots, self._titleOffset, self._titleSlots = _header.unpack_from(self._map)
+    if fileMagic != magic: raise ValueError(f'{path} is not a snapshot')
+    if fileVersion != version: raise ValueError(f'{path} is a version {fileVersion} snapshot, only version {version} is supported')
+    self.version = fileVersion
+
+  def __len__(self) -> int:
+    return self._count
+
+  def __contains__(self, url: str) -> bool:
+    return self.get(url) is not None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  def _record(self, offset: int, length: int) -> dict:
+    data = self._map[offset:offset + length]
+    return serialization.loads(data)
+
+  def _probe(self, tableOffset: int, slots: int, key: str):
+    # yields the (offset, length) of every record whose key hashes like `key`, in probing order
+    hashed = _hash(key)
+    position = hashed & (slots - 1)
+    while True:
+      slotHash, offset, length = _slot.unpack_from(self._map, tableOffset + position * _slot.size)
+      if slotHash == 0: return
+      if slotHash == hashed: yield offset, length
+      position = (position + 1) & (slots - 1)
+
+  def get(self, url: str, default=None) -> dict:
+    for offset, length in self._probe(self._urlOffset, self._urlSlots, url):
+      if (record := self._record(offset, length))['url'] == url: return record
+    return default
+
+  def find(self, title: str) -> list:
+    key = normalize_title(title)
+    records = (self._record(offset, length) for offset, length in self._probe(self._titleOffset, self._titleSlots, key))
+    return [record for record in records if normalize_title(record.get('title', '')) == key]
+
+  def urls(self):
+    for position in range(self._urlSlots):
+      slotHash, offset, length = _slot.unpack_from(self._map, self._urlOffset + position * _slot.size)
+      if slotHash: yield self._record(offset, length)['url']
+
+  def close(self) -> None:
+    self._map.close()
@@ -0,0 +1,429 @@
+from bs4 import BeautifulSoup as bs
+from bs4.element import Tag
+from otakudesudata.constants import *
+from otakudesudata import metrics
+from time import perf_counter
+import re
+
+
+def find(name=None, class_: str=None) -> tuple:
+  """Step selecting the first descendant tag named `name` (any tag when None) with the class `class_`."""
+  return ('find', name, class_)
+
+
+def find_all(name=None, class_: str=None) -> tuple:
+  """Step selecting every descendant tag named `name` (a tuple of names selects any of them in one walk)."""
+  return ('find_all', name, class_)
+
+
+def index(position: int) -> tuple:
+  """Step selecting the item at `position` of a list, None when the list is too short."""
+  return ('index', position, None)
+
+
+def call(function) -> tuple:
+  """Step passing the current node to `function`, which must be a module level function so the step stays hashable."""
+  return ('call', function, None)
+
+
+def _apply(step: tuple, node):
+  kind, argument, class_ = step
+  if kind == 'find': return node.find(argument, class_=class_) if class_ else node.find(argument)
+  if kind == 'find_all': return node.find_all(argument, class_=class_) if class_ else node.find_all(argument)
+  if kind == 'index': return node[argument] if -len(node) <= argument < len(node) else None
+  return argument(node)
+
+
+class Field:
+  """
+  One value extracted from a page.
+
+  Args:
+    *paths (tuple): Paths of steps (see `find`, `find_all`, `index`, `call`) starting at the page. The node every path
+      resolves to is passed to `post`, in order; a step applied to None resolves to None.
+    post (callable, optional): Turns the resolved nodes into the value. Defaults to returning the first node.
+    default (optional): The value when the first path resolves to None; a callable (e.g. `dict`) is called for
+      every page, so mutable defaults are not shared. Defaults to None.
+  """
+  __slots__ = ('paths', 'post', 'default')
+
+  def __init__(self, *paths: tuple, post=None, default=None):
+    self.paths = tuple(tuple(path) for path in paths)
+    self.post = post or (lambda node, *nodes: node)
+    self.default = default
+
+
+class Spec:
+  """
+  A declarative description of a page type: named fields, each a set of selector paths plus post-processing.
+
+  The spec is compiled once, when it is built: the paths of all fields are merged into a tree of unique prefixes,
+  so a selector shared by several fields (e.g. `div.cukder` for both the thumbnails and the episode list of an
+  episode page) is evaluated once per page, however many fields read it. `extract` resolves prefixes lazily, so
+  extracting a subset of the fields only walks the tree for what those fields need.
+
+  Args:
+    name (str): The name reported in 'parse' instrumentation events (the parser class name).
+    **fields (Field): The fields, in the order `extract` returns them.
+
+  Methods:
+    extract(soup: bs4.BeautifulSoup, fields: tuple = None) -> dict:
+      Extracts `fields` (every field when None) from a page, emitting one 'parse' event per field.
+    extractor(field: str) -> callable:
+      Returns a function extracting a single field from a page, the `get_*` methods of the parsers.
+
+  Example:
+    >>> from otakudesudata.specs import Spec, Field, find
+    >>> spec = Spec('TitleParser', title=Field([find('h4')], post=lambda h4: h4.text, default=''))
+    >>> spec.extract(soup)
+    {'title': 'One Piece Episode 1000'}
+  """
+  def __init__(self, name: str, **fields: Field):
+    self.name = name
+    self.fields = fields
+    slots = {}
+    for field in fields.values():
+      for path in field.paths:
+        for end in range(1, len(path) + 1):
+          slots.setdefault(path[:end], len(slots))
+    # a prefix is always registered before its extensions, so a parent slot has a lower number than its children
+    self._steps = tuple((slots[prefix[:-1]] if len(prefix) > 1 else None, prefix[-1]) for prefix in slots)
+    self._slots = {name: tuple(slots[path] for path in field.paths) for name, field in fields.items()}
+
+  def _resolve(self, slot: int, soup: bs, nodes: dict):
+    if slot in nodes: return nodes[slot]
+    parent, step = self._steps[slot]
+    node = soup if parent is None else self._resolve(parent, soup, nodes)
+    nodes[slot] = value = None if node is None else _apply(step, node)
+    return value
+
+  def _value(self, name: str, soup: bs, nodes: dict):
+    field = self.fields[name]
+    resolved = [self._resolve(slot, soup, nodes) for slot in self._slots[name]]
+    if resolved and resolved[0] is None: return field.default() if callable(field.default) else field.default
+    return field.post(*resolved)
+
+  def extract(self, soup: bs, fields: tuple=None) -> dict:
+    nodes = {}
+    if not metrics.enabled('parse'): return {name: self._value(name, soup, nodes) for name in fields or self.fields}
+    values = {}
+    for name in fields or self.fields:
+      start = perf_counter()
+      try:
+        values[name] = self._value(name, soup, nodes)
+      finally:
+        metrics.emit('parse', parser=self.name, method=f'get_{name}', elapsed=perf_counter() - start)
+    return values
+
+  def extractor(self, field: str):
+    if field not in self.fields: raise KeyError(field)
+    def extract(soup: bs):
+      return self.extract(soup, (field,))[field]
+    extract.__name__ = extract.__qualname__ = f'get_{field}'
+    extract.spec = self
+    return extract
+
+
+def _text(node) -> str:
+  return node.text
+
+
+def _stripped(node) -> str:
+  return node.text.strip()
+
+
+def _firsts(node) -> dict:
+  # one walk over a small subtree instead of one `find` per element looked up in it: maps 'name', '.class' and
+  # 'name.class' to the first matching descendant, like `node.name` / `node.find(...)` would return
+  firsts = {}
+  for tag in node.descendants:
+    if not isinstance(tag, Tag): continue
+    firsts.setdefault(tag.name, tag)
+    for class_ in tag.get('class') or ():
+      firsts.setdefault(f'.{class_}', tag)
+      firsts.setdefault(f'{tag.name}.{class_}', tag)
+  return firsts
+
+
+def _thumbnail(img) -> dict:
+  srcset = img.get('srcset')
+  return {
+    'url': img.get('src'),
+    'width': img.get('width'),
+    'height': img.get('height'),
+    'srcset': srcset.split()[::2] if srcset else []
+  }
+
+
+def _links(resolutions: list) -> dict:
+  return {
+    resolution.strong.text.replace(' ','').lower():
+    [
+      {
+        'host': link.text.strip().lower() if link.text else '',
+        'url': link.get('href')
+      }
+    for link in resolution.find_all('a')]
+  for resolution in resolutions}
+
+
+def _details(spans: list, mapping: dict, value: int) -> dict:
+  details = {}
+  for span in spans:
+    if not (text := span.text) or detailsDelimiter not in text: continue
+    parts = text.split(detailsDelimiter, 2)
+    key = parts[0].strip().lower()
+    details[mapping.get(key, key)] = parts[value].strip()
+  return details
+
+
+def _genres(anchors) -> list:
+  return [
+    {
+      'text': genre.text,
+      'url': genre.get('href')
+    }
+  for genre in anchors]
+
+
+# search results page
+
+_animePattern = re.compile(animeSearchPattern)
+_episodePattern = re.compile(episodeSearchPattern)
+
+
+def _unclassed(items: list) -> list:
+  return [item for item in items if not item.get('class')]
+
+
+def _search_anime(items: list) -> list:
+  anime = []
+  for item in items:
+    if not (a := item.a) or not _animePattern.findall(a.text.lower()): continue
+    img = item.img
+    srcset = img.get('srcset') if img else None
+    divs = item.find_all('div')
+    described = len(divs) > 1 and ':' in divs[1].text
+    anime.append({
+      'title': a.text,
+      'url': a.get('href'),
+      'thumbnails': {
+        'width': img.get('width'),
+        'height': img.get('height'),
+        'url': img.get('src'),
+        'srcset': srcset.split()[::2] if srcset and len(srcset.split()) > 1 else None,
+      } if img else {},
+      'genres': _genres(divs[0].find_all('a')) if divs else [],
+      'status': divs[1].text.split(':')[1].strip() if described else None,
+      'rating': divs[2].text.split(':')[1].strip() if described else None,
+    })
+  return anime
+
+
+def _search_episodes(items: list) -> list:
+  episodes = []
+  for item in items:
+    if not (a := item.a) or not (found := _episodePattern.findall(a.text.lower())): continue
+    episodes.append({'title': a.text, 'url': a.get('href'), 'episode': found[0]})
+  return episodes
+
+
+def _search_batch(items: list) -> list:
+  return [{'title': a.text, 'url': a.get('href')} for item in items if (a := item.a) and batchSearchPattern in a.text]
+
+
+_searchItems = (find_all('li'), call(_unclassed))
+
+searchPage = Spec(
+  'SearchResultParser',
+  anime=Field(_searchItems, post=_search_anime),
+  episodes=Field(_searchItems, post=_search_episodes),
+  batch=Field(_searchItems, post=_search_batch),
+)
+
+
+# anime page
+
+def _anime_details(spans: list) -> dict:
+  details = _details(spans[:-1], animeDetailsMapping, 1)
+  details['genres'] = _genres(spans[-1].find_all('a')) if spans else []
+  return details
+
+
+def _feed(feeds: list) -> list:
+  items = []
+  for feed in feeds:
+    a = feed.a
+    items.append({
+      'title': feed.text,
+      'url': a.get('href') if a else None,
+      'thumbnail': (a.img.get('src') if a.img else None) if a else None
+    })
+  return items
+
+
+def _seasons(paragraphs: list) -> list:
+  return [{'title': season.text, 'url': season.get('href')} for season in paragraphs[1].find_all('a')] if len(paragraphs) > 1 else []
+
+
+def _anime_episodes(lists: list) -> list:
+  episodes = []
+  for episode in lists[1].find_all('li') if len(lists) > 1 else []:
+    if not (spans := episode.find_all('span')): continue
+    episodes.append({
+      'title': spans[0].text,
+      'url': spans[0].a.get('href') if spans[0].a else None,
+      'releaseDate': spans[-1].text if len(spans) > 1 else None
+    })
+  return episodes[::-1]
+
+
+def _batch(spans: list) -> dict:
+  return {
+    'title': spans[0].text,
+    'url': spans[1].a.get('href'),
+    'releaseDate': spans[2].text
+  } if len(spans) > 2 else {}
+
+
+_sinopc = find('div', 'sinopc')
+_episodeLists = find_all('div', 'episodelist')
+
+animePage = Spec(
+  'AnimeParser',
+  title=Field([find('div'), find('h1')], post=_text),
+  thumbnails=Field([find('div', 'fotoanime'), find('img')], post=_thumbnail, default=dict),
+  details=Field([find('div', 'infozin'), find_all('span')], post=_anime_details, default=lambda: {'genres': []}),
+  feed=Field([find_all('div', 'isi-anime')], post=_feed),
+  description=Field([_sinopc], post=_text, default=''),
+  seasons=Field([_sinopc, find_all('p')], post=_seasons, default=list),
+  episodes=Field([_episodeLists], post=_anime_episodes),
+  batch=Field([_episodeLists, index(0), find_all('span')], post=_batch, default=dict),
+)
+
+
+# batch page
+
+batchPage = Spec(
+  'BatchParser',
+  title=Field([find('h4')], post=_text, default=''),
+  description=Field([find('div', 'deskripsi'), find('p')], post=_stripped, default=''),
+  thumbnails=Field([find('div', 'animeinfo'), find('img')], post=_thumbnail, default=dict),
+  links=Field([find('div', 'download2'), find_all('li')], post=_links, default=dict),
+)
+
+
+# episode page
+
+def _episode_details(nodes: list, kategoz: list) -> dict:
+  # `nodes` holds the spans and the anchors of div.infozingle, collected by a single walk
+  details = _details([node for node in nodes if node.name == 'span'], episodeDetailsMapping, -1)
+  uploaded = kategoz is not None and len(kategoz) > 1
+  details['uploader'] = kategoz[0].text.split('by', 2)[-1].strip() if uploaded else None
+  details['uploadTime'] = kategoz[1].text.split('on', 2)[-1].strip() if uploaded else None
+  details['genres'] = _genres(node for node in nodes if node.name == 'a')
+  return details
+
+
+def _other_episodes(items: list) -> list:
+  return [{'title': a.text.strip(), 'url': a.get('href')} for episode in items if (a := episode.a)][::-1]
+
+
+_cukder = find('div', 'cukder')
+
+episodePage = Spec(
+  'EpisodeParser',
+  title=Field([find('h4')], post=_text, default=''),
+  thumbnails=Field([_cukder, find('img')], post=_thumbnail, default=dict),
+  details=Field([find('div', 'infozingle'), find_all(('span', 'a'))], [find('div', 'kategoz'), find_all('span')], post=_episode_details, default=dict),
+  episodes=Field([_cukder, find_all('li')], post=_other_episodes, default=list),
+  links=Field([find('div', 'download'), find_all('li')], post=_links, default=dict),
+)
+
+
+# ongoing (and other paginated listing) pages
+
+def _release(release) -> dict:
+  firsts = _firsts(release)
+  img = firsts.get('img')
+  return {
+    'title': firsts['h2'].text if 'h2' in firsts else None,
+    'latestUpload': {
+      'uploadDate': firsts['.newnime'].text if '.newnime' in firsts else None,
+      'uploadDay': firsts['div.epztipe'].text if 'div.epztipe' in firsts else None,
+      'episode': firsts['.epz'].text if '.epz' in firsts else None
+    },
+    'url': firsts['a'].get('href') if 'a' in firsts else None,
+    'thumbnail': _thumbnail(img) if img else {}
+  }
+
+
+def _releases(releases: list) -> list:
+  return [_release(release) for release in releases]
+
+
+def _pages(anchors: list) -> list:
+  return [
+    {
+      'pageNumber': int(text) if (text := page.text).isnumeric() else text,
+      'url': page.get('href')
+    }
+  for page in anchors]
+
+
+def _sibling(class_: str):
+  def href(anchors: list) -> str:
+    # the exact class attribute, as `find('a', class_='prev page-numbers')` matches it
+    return next((anchor.get('href') for anchor in anchors if ' '.join(anchor.get('class')) == class_), None)
+  return href
+
+
+def _page_number(span) -> int:
+  return int(text) if (text := span.text).isnumeric() else text
+
+
+_pageNumbers = find_all('a', 'page-numbers')
+
+_pagination = {
+  'current_page_number': Field([find('span', 'page-numbers current')], post=_page_number),
+  'previous_page': Field([_pageNumbers], post=_sibling('prev page-numbers')),
+  'next_page': Field([_pageNumbers], post=_sibling('next page-numbers')),
+  'all_pages': Field([_pageNumbers], post=_pages),
+}
+
+listingPage = Spec(
+  'ListingParser',
+  releases=Field([find_all('div', 'detpost')], post=_releases),
+  **_pagination
+)
+
+
+# genre pages: the same pagination, but `col-anime` cards instead of `detpost` releases
+
+def _genre_release(card) -> dict:
+  firsts = _firsts(card)
+  def text(key): return firsts[key].text.strip() if key in firsts else None
+  anchor = firsts['.col-anime-title'].find('a') if '.col-anime-title' in firsts else None
+  img = firsts.get('img')
+  return {
+    'title': text('.col-anime-title'),
+    'url': anchor.get('href') if anchor else None,
+    'studio': text('.col-anime-studio'),
+    'totalEpisodes': text('.col-anime-eps'),
+    'rating': text('.col-anime-rating'),
+    'genres': _genres(firsts['.col-anime-genre'].find_all('a')) if '.col-anime-genre' in firsts else [],
+    'synopsis': text('.col-synopsis'),
+    'season': text('.col-anime-date'),
+    'thumbnail': _thumbnail(img) if img else {}
+  }
+
+
+def _genre_releases(cards: list) -> list:
+  return [_genre_release(card) for card in cards]
+
+
+genrePage = Spec(
+  'GenreParser',
+  releases=Field([find_all('div', 'col-anime')], post=_genre_releases),
+  **_pagination
+)
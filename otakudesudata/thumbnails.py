@@ -0,0 +1,255 @@
+from otakudesudata import fetch, metrics, proxies, runner, scheduler
+from time import perf_counter
+from urllib.parse import urlsplit
+import threading
+import posixpath
+import tempfile
+import hashlib
+import asyncio
+import json
+import math
+import time
+import os
+import re
+import httpx
+
+# WordPress names the resized copies of an upload `<name>-<width>x<height>.<ext>`
+_dimensions = re.compile(r'-(\d+)x(\d+)\.\w+$')
+_extensions = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/webp': '.webp', 'image/gif': '.gif', 'image/avif': '.avif'}
+
+
+def variants(thumbnail: dict) -> list:
+  """
+  Returns the variants of a thumbnail dictionary (its `url` and `srcset` entries) as `(url, width, height)`
+  tuples. The size of a variant is read from its `-<width>x<height>` file name suffix, or from the `width` and
+  `height` of the thumbnail for its `url`; it is None when unknown (the original upload).
+  """
+  found = {}
+  for url in [*(thumbnail.get('srcset') or []), thumbnail.get('url')]:
+    if not url or url in found: continue
+    if match := _dimensions.search(urlsplit(url).path): found[url] = (int(match.group(1)), int(match.group(2)))
+    elif url == thumbnail.get('url') and str(thumbnail.get('width')).isdigit(): found[url] = (int(thumbnail['width']), int(thumbnail['height']) if str(thumbnail.get('height')).isdigit() else None)
+    else: found[url] = (None, None)
+  return [(url, width, height) for url, (width, height) in found.items()]
+
+
+def choose(thumbnail: dict, width: int=None) -> str:
+  """
+  Picks the variant of a thumbnail to download: the narrowest one at least `width` pixels wide, the widest one when
+  none is (or when `width` is None). A variant of unknown size is the original upload, wider than its copies.
+  Returns None when the thumbnail has no URL.
+  """
+  options = variants(thumbnail)
+  if not options: return None
+  size = lambda option: option[1] if option[1] is not None else math.inf
+  fitting = [option for option in options if width is not None and size(option) >= width]
+  return (min(fitting, key=size) if fitting else max(options, key=size))[0]
+
+
+def collect(results) -> list:
+  """
+  Returns every thumbnail dictionary (any dictionary with a `srcset` key) found in parser results: search results,
+  `OngoingParser.get_releases`, anime, episode or batch details, or lists of them.
+  """
+  found, stack = [], [results]
+  while stack:
+    node = stack.pop()
+    if isinstance(node, dict):
+      if 'srcset' in node: found.append(node)
+      else: stack.extend(reversed(list(node.values())))
+    elif isinstance(node, (list, tuple)):
+      stack.extend(reversed(node))
+  return found
+
+
+class ThumbnailStore:
+  """
+  Downloads thumbnails to a content-addressed store on disk, so they can be served locally instead of hot-linked.
+
+  Images are streamed straight to disk and stored under the SHA-256 of their content
+  (`<root>/objects/<2 hex>/<sha256><ext>`), so an image shared by several anime (or served under several URLs) is
+  stored once. `<root>/index.json` maps every downloaded URL to its object with the `ETag` and `Last-Modified` of
+  the response, used to re-fetch it conditionally (`If-None-Match` / `If-Modified-Since`) when `refresh=True`.
+
+  Args:
+    root (str): The directory of the store, created when missing.
+    concurrency (int, optional): Thumbnails downloaded at once. Defaults to 8.
+    width (int, optional): The width wanted, the narrowest `srcset` variant at least that wide is downloaded (see
+      `choose`). Defaults to None, the widest variant.
+    **kwargs (dict): Request options: user_agent, timeout, headers, proxy (a proxy or a `ProxyPool`, which every
+      download goes through even on a given client), scheduler and priority (see `otakudesudata.scheduler`, every
+      download holds a 'bulk' slot, unless `priority` is given, until its file is written) and the client options of `fetch.async_client` (http2,
+      client_max_connections, ...) used when no client is given.
+
+  Files are written from worker threads, so a slow disk does not hold up the event loop the downloads run on.
+
+  Each thumbnail dictionary downloaded is annotated with:
+    - localPath (str): The path of the image file, None when it could not be downloaded.
+
+  Methods:
+    download(thumbnails: list, client: httpx.AsyncClient = None, refresh: bool = False) -> list:
+      Downloads thumbnail dictionaries concurrently (a coroutine). Returns an entry per thumbnail with `url` (the
+      variant downloaded), `path`, `digest`, `contentType`, `size`, `etag`, `lastModified`, `fetched` and `status`:
+      'stored', 'duplicate' (the content was already stored), 'cached' (not requested), 'notModified' or 'error'
+      (with `error`).
+    fetch_thumbnails(results, refresh: bool = False) -> list:
+      `download` of every thumbnail of parser results (see `collect`) for synchronous code, run on the shared
+      background event loop.
+    path(url: str) -> str:
+      The local path of a downloaded URL, None when it was not downloaded.
+
+  Example:
+    >>> from otakudesudata import get_ongoing
+    >>> from otakudesudata.thumbnails import ThumbnailStore
+    >>> store = ThumbnailStore('thumbnails', width=200)
+    >>> releases = get_ongoing(get_all=True)
+    >>> store.fetch_thumbnails(releases)
+    >>> releases[0]['thumbnail']['localPath']
+    'thumbnails/objects/3f/3f9c...e1.jpg'
+  """
+  def __init__(self, root: str, concurrency: int=8, width: int=None, **kwargs: dict):
+    self.root = root
+    self.concurrency = concurrency
+    self.width = width
+    self._kwargs = {'priority': 'bulk', **kwargs}
+    self._indexPath = os.path.join(root, 'index.json')
+    self._lock = threading.Lock()
+    self._placing = threading.Lock()
+    os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+    try:
+      with open(self._indexPath, encoding='utf-8') as file:
+        self.index = json.load(file)
+    except FileNotFoundError:
+      self.index = {}
+
+  def path(self, url: str) -> str:
+    entry = self.index.get(url)
+    return os.path.join(self.root, entry['path']) if entry else None
+
+  def save(self) -> None:
+    """
+    Writes the index to disk, atomically.
+    """
+    self._save(dict(self.index))
+
+  def _save(self, index: dict) -> None:
+    # `index` is a copy: downloads on the event loop keep changing `self.index` while it is written
+    with self._lock:
+      descriptor, temporary = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+      with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+        json.dump(index, file)
+      os.replace(temporary, self._indexPath)
+
+  def _extension(self, response: httpx.Response) -> str:
+    contentType = response.headers.get('content-type', '').split(';')[0].strip().lower()
+    return _extensions.get(contentType) or posixpath.splitext(urlsplit(str(response.url)).path)[1].lower()[:5]
+
+  async def _write(self, response: httpx.Response) -> tuple:
+    # hashed while streamed to a temporary file, then moved under its digest; the disk is only touched from worker threads
+    digest = hashlib.sha256()
+    size = 0
+    descriptor, temporary = await asyncio.to_thread(tempfile.mkstemp, dir=os.path.join(self.root, 'objects'), suffix='.tmp')
+    file = os.fdopen(descriptor, 'wb')
+    try:
+      async for chunk in response.aiter_bytes():
+        await asyncio.to_thread(file.write, chunk)
+        digest.update(chunk)
+        size += len(chunk)
+      await asyncio.to_thread(file.close)
+      digest = digest.hexdigest()
+      path = posixpath.join('objects', digest[:2], digest + self._extension(response))
+      duplicate = await asyncio.to_thread(self._place, temporary, os.path.join(self.root, path))
+    except BaseException:
+      # cancelled or failed: cleaned up right away, cancellation cannot wait for a thread
+      file.close()
+      if os.path.exists(temporary): os.remove(temporary)
+      raise
+    return path, digest, size, duplicate
+
+  def _place(self, temporary: str, target: str) -> bool:
+    # moves a downloaded file to its path in the store, returns whether that content was already stored;
+    # one at a time, or two threads placing the same content would both find it missing
+    with self._placing:
+      if os.path.exists(target):
+        os.remove(temporary)
+        return True
+      os.makedirs(os.path.dirname(target), exist_ok=True)
+      os.replace(temporary, target)
+      return False
+
+  async def _send(self, client: httpx.AsyncClient, request: httpx.Request) -> httpx.Response:
+    # with a `ProxyPool` the client has no proxy, the download goes through the pool's own per-proxy clients
+    if not isinstance(pool := self._kwargs.get('proxy'), proxies.ProxyPool): return await client.send(request, follow_redirects=True, stream=True)
+    async def send(proxy):
+      response = await pool.async_client(proxy).send(request, follow_redirects=True, stream=True)
+      # a response the pool retries on another proxy is never read
+      if response.status_code in pool.ban_statuses: await response.aclose()
+      return response
+    return await pool.asend(send)
+
+  async def _download(self, client: httpx.AsyncClient, url: str, refresh: bool) -> dict:
+    entry = self.index.get(url)
+    stored = entry is not None and await asyncio.to_thread(os.path.exists, os.path.join(self.root, entry['path']))
+    metrics.emit('cache', cache=type(self).__name__, key=url, hit=stored)
+    if stored and not refresh: return {**entry, 'url': url, 'status': 'cached'}
+    if (chosen := self._kwargs.get('scheduler') or scheduler.installed()) is None: return await self._fetch(client, url, entry, stored)
+    async with chosen.aslot(self._kwargs.get('priority')):
+      return await self._fetch(client, url, entry, stored)
+
+  async def _fetch(self, client: httpx.AsyncClient, url: str, entry: dict, stored: bool) -> dict:
+    conditions = {}
+    if stored and entry.get('etag'): conditions['If-None-Match'] = entry['etag']
+    if stored and entry.get('lastModified'): conditions['If-Modified-Since'] = entry['lastModified']
+    request = client.build_request('GET', url, headers={**fetch.get_headers(self._kwargs), **conditions}, timeout=self._kwargs.get('timeout', 10))
+    start = perf_counter()
+    size = 0
+    # a disk error (a full disk, a permission) fails that thumbnail only, like a network error
+    try:
+      response = await self._send(client, request)
+      try:
+        if response.status_code == 304 and stored: result = {**entry, 'fetched': time.time(), 'status': 'notModified'}
+        elif response.status_code >= 300: result = {'status': 'error', 'error': str(response.status_code)}
+        else:
+          path, digest, size, duplicate = await self._write(response)
+          result = {
+            'path': path,
+            'digest': digest,
+            'contentType': response.headers.get('content-type'),
+            'size': size,
+            'etag': response.headers.get('etag'),
+            'lastModified': response.headers.get('last-modified'),
+            'fetched': time.time(),
+            'status': 'duplicate' if duplicate else 'stored'
+          }
+      finally:
+        await response.aclose()
+    except (httpx.HTTPError, OSError) as e:
+      metrics.emit('fetch', url=url, error=type(e).__name__, elapsed=perf_counter() - start)
+      return {'url': url, 'status': 'error', 'error': type(e).__name__}
+    metrics.emit('fetch', url=url, status=response.status_code, bytes=size, elapsed=perf_counter() - start)
+    if result['status'] != 'error': self.index[url] = {key: value for key, value in result.items() if key != 'status'}
+    return {**result, 'url': url}
+
+  async def download(self, thumbnails: list, client: httpx.AsyncClient=None, refresh: bool=False) -> list:
+    if client is None:
+      async with fetch.async_client(**self._kwargs) as client:
+        return await self.download(thumbnails, client, refresh)
+    semaphore = asyncio.Semaphore(self.concurrency)
+    async def download(url):
+      async with semaphore:
+        return await self._download(client, url, refresh)
+    chosen = [choose(thumbnail, self.width) for thumbnail in thumbnails]
+    urls = list(dict.fromkeys(url for url in chosen if url))
+    results = dict(zip(urls, await asyncio.gather(*[download(url) for url in urls])))
+    await asyncio.to_thread(self._save, dict(self.index))
+    entries = []
+    for thumbnail, url in zip(thumbnails, chosen):
+      entry = results.get(url, {'url': None, 'status': 'error', 'error': 'NoURL'})
+      thumbnail['localPath'] = os.path.join(self.root, entry['path']) if entry.get('path') else None
+      entries.append(entry)
+    return entries
+
+  def fetch_thumbnails(self, results, refresh: bool=False) -> list:
+    loop = runner.get_loop()
+    client = loop.client(**self._kwargs)
+    return loop.run(self.download(collect(results), client, refresh))
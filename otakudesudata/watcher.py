@@ -0,0 +1,155 @@
+from otakudesudata.parser import OngoingParser, AnimeParser, AsyncParser, EpisodeParser, make_soup
+from otakudesudata.constants import ongoingUrl
+from otakudesudata import fetch, runner
+import asyncio
+import hashlib
+import inspect
+import httpx
+
+
+class OngoingWatcher:
+  """
+  OngoingWatcher polls the otakudesu ongoing anime page and emits an event for every newly released episode.
+
+  Each poll is a conditional request (`If-None-Match` / `If-Modified-Since`), so an unchanged page costs a `304`
+  and no parsing; when the server ignores those headers an identical body is still detected by its hash and
+  not parsed again. Releases are compared with the previous snapshot by URL and `latestUpload.episode`, and only
+  the ones that were not there before are emitted.
+
+  Args:
+    url (str, optional): The URL of the ongoing anime page. Defaults to `ongoingUrl`.
+    interval (float, optional): Seconds between polls. Defaults to 300.
+    get_episode_links (bool, optional): Whether to resolve the latest episode of every new release (its details
+      and download links, fetched concurrently). Defaults to False.
+    emit_initial (bool, optional): Whether the releases found by the first poll are emitted as new. Defaults to False.
+    **kwargs (dict): Additional optional arguments:
+      - user_agent (str): Custom User-Agent header. Defaults to a random choice from `userAgents`.
+      - timeout (int): Timeout for each HTTP request in seconds. Defaults to 10.
+      - proxy (str): Proxy to use for the HTTP requests. Defaults to None.
+      - http2 (bool), client_max_connections (int), max_keepalive_connections (int), keepalive_expiry (float):
+        Options of the client kept open between polls, see `fetch.async_client`.
+      - raise_exception (bool): Whether a failed poll raises instead of being retried at the next interval. Defaults to False.
+
+  Events are dictionaries containing:
+    - title (str): The title of the anime.
+    - url (str): The URL of the anime.
+    - episode (str): The latest episode, as shown on the ongoing page (e.g. 'Episode 5').
+    - release (dict): The full release, as returned by `OngoingParser.get_releases`.
+    - latestEpisode (dict): Only with `get_episode_links`, the latest episode's `title`, `url`, `details` and `links`.
+
+  Methods:
+    poll() -> list:
+      Fetches the ongoing page once and returns the new events (a coroutine).
+    watch(max_polls: int = None):
+      Asynchronous generator polling every `interval` seconds and yielding new events.
+    run(callback, max_polls: int = None):
+      Blocking loop calling `callback(event)` (a function or coroutine function) for every new event. The polls run
+      on the shared `runner.BackgroundLoop` with its persistent client, so the callback runs on the loop's thread.
+    stop():
+      Stops `watch`/`run` after the current poll.
+
+  Example:
+    >>> from otakudesudata import OngoingWatcher
+    >>> async def main():
+    ...   async for event in OngoingWatcher(interval=120, get_episode_links=True).watch():
+    ...     print(event['title'], event['episode'], event['latestEpisode']['links'])
+    >>> # or, from synchronous code
+    >>> OngoingWatcher(interval=120).run(lambda event: print(event['title'], event['episode']))
+  """
+  def __init__(self, url: str=ongoingUrl, interval: float=300, get_episode_links: bool=False, emit_initial: bool=False, **kwargs: dict):
+    self.url = url
+    self.interval = interval
+    self.get_episode_links = get_episode_links
+    self.emit_initial = emit_initial
+    self.snapshot = None
+    self.polls = 0
+    self._kwargs = kwargs
+    self._validators = {}
+    self._digest = None
+    self._client = None
+    self._stopped = False
+
+  @staticmethod
+  def key(release: dict) -> tuple:
+    return (release.get('url'), (release.get('latestUpload', {}).get('episode') or '').strip())
+
+  async def poll(self) -> list:
+    client = self._client or fetch.async_client(**self._kwargs)
+    try:
+      response = await fetch.aget(client, self.url, **{**self._kwargs, 'headers': {**(self._kwargs.get('headers') or {}), **self._validators}})
+      self.polls += 1
+      if response.status_code == 304: return []
+      response.raise_for_status()
+      self._validators = {
+        header: response.headers[validator]
+        for header, validator in (('If-None-Match', 'etag'), ('If-Modified-Since', 'last-modified'))
+        if validator in response.headers}
+      if (digest := hashlib.sha1(response.content).digest()) == self._digest: return []
+      self._digest = digest
+      releases = OngoingParser.get_releases(make_soup(response.text, self.url))
+      if self.snapshot is None: new = releases if self.emit_initial else []
+      else: new = [release for release in releases if self.key(release) not in self.snapshot]
+      self.snapshot = {self.key(release) for release in releases}
+      events = [
+        {
+          'title': release.get('title'),
+          'url': release.get('url'),
+          'episode': self.key(release)[1],
+          'release': release
+        }
+      for release in new]
+      if self.get_episode_links and events: await asyncio.gather(*[self._resolve(client, event) for event in events])
+      return events
+    finally:
+      if client is not self._client: await client.aclose()
+
+  async def _resolve(self, client: httpx.AsyncClient, event: dict) -> None:
+    try:
+      if not event['url']: return None
+      response = await fetch.aget(client, event['url'], **self._kwargs)
+      episodes = AnimeParser.get_episodes(make_soup(response.text, event['url']))
+      if (latest := AsyncParser.latest_episode(episodes)) is None: return None
+      response = await fetch.aget(client, latest['url'], **self._kwargs)
+      soup = make_soup(response.text, latest['url'])
+      event['latestEpisode'] = {
+        'title': latest['title'],
+        'url': latest['url'],
+        'details': EpisodeParser.get_details(soup),
+        'links': EpisodeParser.get_links(soup)
+      }
+    except Exception as e:
+      if self._kwargs.get('raise_exception'): raise e
+
+  async def watch(self, max_polls: int=None):
+    async with fetch.async_client(**self._kwargs) as client:
+      async for event in self._watch(client, max_polls):
+        yield event
+
+  async def _watch(self, client: httpx.AsyncClient, max_polls: int=None):
+    self._stopped = False
+    self._client = client
+    try:
+      polls = 0
+      while not self._stopped and (max_polls is None or polls < max_polls):
+        if polls: await asyncio.sleep(self.interval)
+        polls += 1
+        try:
+          events = await self.poll()
+        except Exception as e:
+          if self._kwargs.get('raise_exception'): raise e
+          continue
+        for event in events:
+          yield event
+    finally:
+      self._client = None
+
+  def run(self, callback, max_polls: int=None) -> None:
+    loop = runner.get_loop()
+    client = loop.client(**self._kwargs)
+    async def run():
+      async for event in self._watch(client, max_polls):
+        if inspect.isawaitable(result := callback(event)): await result
+    loop.run(run())
+
+  def stop(self) -> None:
+    self._stopped = True
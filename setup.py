@@ -20,11 +20,16 @@ setup(
         "httpx",
         "beautifulsoup4"
     ],
+    extras_require={
+        "http2": ["httpx[http2]"],
+        "brotli": ["httpx[brotli]"],
+        "msgpack": ["msgpack"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.7",
+    python_requires=">=3.9",
     platforms=["any"],
 )
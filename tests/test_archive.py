@@ -0,0 +1,167 @@
+import unittest
+import asyncio
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import httpx
+from otakudesudata import fetch
+from otakudesudata.archive import WarcWriter, archive_for, records, responses, reparse, page_kind, main
+from otakudesudata.parser import AnimeParser, EpisodeParser, BatchParser, OngoingParser
+from otakudesudata.snapshot import Snapshot
+
+fixtures = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+class StandIn:
+    """A local server standing in for anime, episode, batch and ongoing pages (the recorded fixtures), sent gzip encoded."""
+    def __init__(self):
+        self.paths = []
+        standIn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                standIn.paths.append(self.path)
+                name = {'anime': 'anime', 'episode': 'episode', 'batch': 'batch', 'ongoing-anime': 'ongoing'}.get(self.path.strip('/').split('/')[0])
+                if name is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    return self.end_headers()
+                body = gzip.compress(standIn.page(name).encode())
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=UTF-8')
+                self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def page(self, name):
+        with open(os.path.join(fixtures, f'{name}.html'), encoding='utf-8') as file:
+            return file.read().replace('https://otakudesu.cloud/', self.url)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.standIn = StandIn()
+        self.directory = tempfile.mkdtemp()
+        self.urls = {kind: self.standIn.url + path for kind, path in
+                     (('anime', 'anime/jujutsu-kaisen-sub-indo/'), ('episode', 'episode/jujutsu-kaisen-episode-1-sub-indo/'),
+                      ('batch', 'batch/jujutsu-kaisen-batch-sub-indo/'), ('ongoing', 'ongoing-anime/'))}
+
+    def tearDown(self):
+        self.standIn.close()
+        shutil.rmtree(self.directory)
+
+    def crawl(self, archive):
+        return {
+            'anime': AnimeParser(self.urls['anime'], archive=archive, timeout=2),
+            'episode': EpisodeParser(self.urls['episode'], archive=archive, timeout=2),
+            'batch': BatchParser(self.urls['batch'], archive=archive, timeout=2),
+            'ongoing': OngoingParser(self.urls['ongoing'], archive=archive, timeout=2),
+        }
+
+    def test_records(self):
+        with WarcWriter(self.directory) as archive:
+            self.crawl(archive)
+        self.assertEqual([record['type'] for record in records(self.directory)], ['warcinfo'] + ['response', 'request'] * 4)
+        archived = {response['url']: response for response in responses(self.directory)}
+        self.assertEqual(set(archived), set(self.urls.values()))
+        anime = archived[self.urls['anime']]
+        self.assertEqual(anime['status'], 200)
+        # the body is stored decoded, without the headers of its transfer encoding
+        self.assertEqual(anime['body'].decode(), self.standIn.page('anime'))
+        self.assertNotIn('content-encoding', anime['headers'])
+        self.assertEqual(anime['headers']['content-length'], str(len(anime['body'])))
+
+    def test_reparse_offline(self):
+        live = {kind: parser.results for kind, parser in self.crawl(self.directory).items()}
+        archive_for(self.directory).close()
+        fetched = len(self.standIn.paths)
+        pages = reparse(self.directory, processes=0)
+        self.assertEqual(len(self.standIn.paths), fetched)
+        self.assertEqual({url: page['kind'] for url, page in pages.items()}, {url: kind for kind, url in self.urls.items()})
+        for kind, url in self.urls.items():
+            self.assertIsNone(pages[url]['error'])
+            self.assertEqual(pages[url]['result'], live[kind])
+        normalized = reparse(self.directory, kinds=('anime',), processes=0, normalize=True)
+        self.assertEqual(normalized[self.urls['anime']]['result']['details']['ratingValue'], 8.61)
+
+    def test_reparse_in_parallel(self):
+        # a new file for every record, parsed by two processes
+        with WarcWriter(self.directory, max_size=1) as archive:
+            live = {kind: parser.results for kind, parser in self.crawl(archive).items()}
+            self.crawl(archive)
+        self.assertEqual(len(os.listdir(self.directory)), 8)
+        pages = reparse(self.directory, processes=2)
+        self.assertEqual({url: page['result'] for url, page in pages.items()}, {self.urls[kind]: live[kind] for kind in self.urls})
+
+    def test_reparse_one_file_in_parallel(self):
+        with WarcWriter(self.directory) as archive:
+            live = {kind: parser.results for kind, parser in self.crawl(archive).items()}
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        submitted = []
+        class Executor(ThreadPoolExecutor):
+            def submit(self, function, batch, *args):
+                submitted.append([url for url, *_ in batch])
+                return super().submit(function, batch, *args)
+        with patch('otakudesudata.archive.ProcessPoolExecutor', Executor):
+            pages = reparse(self.directory, processes=2, batch_size=1)
+        # the pages of the one file went to the workers one at a time
+        self.assertEqual(submitted, [[self.urls[kind]] for kind in ('anime', 'episode', 'batch', 'ongoing')])
+        self.assertEqual({url: page['result'] for url, page in pages.items()}, {self.urls[kind]: live[kind] for kind in self.urls})
+        self.assertEqual(reparse(self.directory, processes=2), pages)
+
+    def test_truncated_file(self):
+        with WarcWriter(self.directory) as archive:
+            self.crawl(archive)
+            path = archive.path
+        with open(path, 'rb') as file:
+            data = file.read()
+        with open(path, 'wb') as file:
+            file.write(data[:len(data) - 100])
+        # the last request record is cut, every response before it is read
+        self.assertEqual(len(list(responses(self.directory))), 4)
+
+    def test_async_fetch(self):
+        archive = WarcWriter(self.directory)
+        async def main():
+            async with httpx.AsyncClient() as client:
+                return await fetch.aget(client, self.urls['episode'], archive=archive, timeout=2)
+        response = asyncio.run(main())
+        archive.close()
+        self.assertEqual([archived['body'] for archived in responses(self.directory)], [response.content])
+
+    def test_command(self):
+        self.crawl(self.directory)
+        archive_for(self.directory).close()
+        snapshot = os.path.join(self.directory, 'catalog.snap')
+        main([self.directory, '--processes', '0', '--kinds', 'anime', 'episode', '--snapshot', snapshot])
+        with Snapshot(snapshot) as catalog:
+            self.assertEqual(len(catalog), 2)
+            self.assertEqual(catalog.get(self.urls['anime'])['title'], 'Jujutsu Kaisen Subtitle Indonesia')
+
+    def test_page_kind(self):
+        self.assertEqual(page_kind('https://otakudesu.cloud/ongoing-anime/page/2/'), 'ongoing')
+        self.assertEqual(page_kind('https://otakudesu.cloud/batch/x/'), 'batch')
+        self.assertIsNone(page_kind('https://otakudesu.cloud/jadwal-rilis/'))
+        with self.assertRaises(ValueError):
+            reparse(self.directory, kinds=('schedule',))
+
+
+if __name__ == '__main__':
+    unittest.main()
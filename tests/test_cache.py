@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from otakudesudata.cache import TTLCache
+from otakudesudata.parser import OngoingParser
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_bounded(self):
+        cache = TTLCache(maxsize=2)
+        cache['a'], cache['b'] = 1, 2
+        cache.get('a')
+        cache['c'] = 3
+        self.assertEqual(len(cache), 2)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+
+    def test_expiry(self):
+        clock = Clock()
+        cache = TTLCache(ttl=10, timer=clock)
+        cache['a'] = 1
+        clock.now = 9.9
+        self.assertEqual(cache.get('a'), 1)
+        clock.now = 10
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(len(cache), 0)
+
+
+def page(number, last=3):
+    links = ''.join(f'<a class="page-numbers" href="https://otakudesu.cloud/ongoing-anime/page/{n}/">{n}</a>' if n != number
+                    else f'<span class="page-numbers current">{n}</span>' for n in range(1, last + 1))
+    if number > 1: links += f'<a class="prev page-numbers" href="https://otakudesu.cloud/ongoing-anime/page/{number - 1}/">prev</a>'
+    if number < last: links += f'<a class="next page-numbers" href="https://otakudesu.cloud/ongoing-anime/page/{number + 1}/">next</a>'
+    return f'<div class="detpost"><a href="https://otakudesu.cloud/anime/page-{number}/"><h2>Anime {number}</h2></a></div>{links}'
+
+
+def fake_get(url, **kwargs):
+    number = int(url.rstrip('/').rsplit('/', 1)[-1]) if '/page/' in url else 1
+    response = MagicMock()
+    response.text = page(number)
+    return response
+
+
+class TestOngoingParserCache(unittest.TestCase):
+    @patch('httpx.get', side_effect=fake_get)
+    def test_navigation(self, mock_get):
+        parser = OngoingParser('https://otakudesu.cloud/ongoing-anime/', use_cache=True)
+        self.assertEqual(parser.next()[0]['title'], 'Anime 2')
+        self.assertEqual(parser.current_page, 2)
+        self.assertEqual(parser.previous()[0]['title'], 'Anime 1')
+        self.assertEqual(parser.current_page, 1)
+
+    @patch('httpx.get', side_effect=fake_get)
+    def test_hit_rate(self, mock_get):
+        parser = OngoingParser('https://otakudesu.cloud/ongoing-anime/', use_cache=True)
+        for _ in range(3):
+            parser.next(), parser.next(), parser.previous(), parser.previous()
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(parser._cache.misses, 3)
+        self.assertEqual(parser._cache.hits, 10)
+        self.assertEqual([release['title'] for release in parser.results], ['Anime 1', 'Anime 2', 'Anime 3'])
+
+    @patch('httpx.get', side_effect=fake_get)
+    def test_shared_cache_expires(self, mock_get):
+        clock = Clock()
+        cache = TTLCache(ttl=60, timer=clock)
+        OngoingParser('https://otakudesu.cloud/ongoing-anime/', use_cache=True, cache=cache)
+        OngoingParser('https://otakudesu.cloud/ongoing-anime/', use_cache=True, cache=cache)
+        self.assertEqual(mock_get.call_count, 1)
+        clock.now = 61
+        OngoingParser('https://otakudesu.cloud/ongoing-anime/', use_cache=True, cache=cache)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('httpx.get', side_effect=fake_get)
+    def test_caches_are_not_shared_by_default(self, mock_get):
+        first = OngoingParser('https://otakudesu.cloud/ongoing-anime/', use_cache=True)
+        second = OngoingParser('https://otakudesu.cloud/ongoing-anime/', use_cache=True)
+        self.assertIsNot(first._cache, second._cache)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('httpx.get', side_effect=fake_get)
+    def test_without_cache(self, mock_get):
+        parser = OngoingParser('https://otakudesu.cloud/ongoing-anime/')
+        parser.next(), parser.previous()
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(parser.results[0]['title'], 'Anime 1')
+        self.assertEqual(len(list(OngoingParser('https://otakudesu.cloud/ongoing-anime/'))), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
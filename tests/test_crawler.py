@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from otakudesudata.crawler import SQLiteWorkQueue, WorkQueue, Crawler, classify
+
+anime_page = ('<div class="sinopc"><p>synopsis</p><p><a href="https://otakudesu.cloud/anime/x-season-2/">Season 2</a></p></div>'
+              '<div class="episodelist"><span>Batch</span><span><a href="https://otakudesu.cloud/batch/x-batch/">x</a></span><span>date</span></div>'
+              '<div class="episodelist"><ul><li><span><a href="https://otakudesu.cloud/episode/x-2/">Episode 2</a></span></li>'
+              '<li><span><a href="https://otakudesu.cloud/episode/x-1/">Episode 1</a></span></li></ul></div>')
+
+
+def fake_get(url, **kwargs):
+    if '/anime-list/' in url:
+        return MagicMock(text='<a class="hodebgst" href="https://otakudesu.cloud/anime/x/">X</a>')
+    if '/anime/' in url:
+        return MagicMock(text=anime_page)
+    if '/broken/' in url:
+        raise ConnectionError('boom')
+    return MagicMock(text='<h4>page</h4>')
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSQLiteWorkQueue(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.clock = Clock()
+        self.queue = SQLiteWorkQueue(os.path.join(directory.name, 'crawl.db'), max_attempts=2, timer=self.clock)
+        self.addCleanup(self.queue.close)
+
+    def test_deduplication(self):
+        self.assertTrue(self.queue.put('https://otakudesu.cloud/anime/x/', 'anime'))
+        self.assertFalse(self.queue.put('https://otakudesu.cloud/anime/x/', 'anime'))
+        self.assertEqual(self.queue.stats()['pending'], 1)
+
+    def test_lease_expiry(self):
+        self.queue.put('https://otakudesu.cloud/anime/x/', 'anime')
+        self.assertEqual(len(self.queue.lease('a', lease_time=10)), 1)
+        self.assertEqual(self.queue.lease('b', lease_time=10), [])
+        self.clock.now += 10
+        tasks = self.queue.lease('b', lease_time=10)
+        self.assertEqual(tasks[0].attempts, 2)
+        self.queue.ack(tasks[0], {'title': 'x'})
+        self.assertEqual(list(self.queue.results()), [('https://otakudesu.cloud/anime/x/', 'anime', {'title': 'x'})])
+
+    def test_lost_lease(self):
+        self.queue.put('https://otakudesu.cloud/anime/x/', 'anime')
+        expired, = self.queue.lease('a', lease_time=10)
+        self.clock.now += 10
+        # leased again, by the same worker: only the new lease may finish the task
+        task, = self.queue.lease('a', lease_time=10)
+        self.assertFalse(self.queue.ack(expired, {'title': 'late'}))
+        self.assertFalse(self.queue.fail(expired, 'late'))
+        self.assertEqual(self.queue.stats()['leased'], 1)
+        self.assertTrue(self.queue.ack(task, {'title': 'x'}))
+        self.assertFalse(self.queue.ack(task, {'title': 'again'}))
+        self.assertEqual(list(self.queue.results()), [('https://otakudesu.cloud/anime/x/', 'anime', {'title': 'x'})])
+
+    def test_interface(self):
+        with self.assertRaises(TypeError):
+            WorkQueue()
+        class Partial(WorkQueue):
+            def put(self, url, kind, depth=0):
+                return True
+        with self.assertRaises(TypeError):
+            Partial()
+
+    def test_fail_and_give_up(self):
+        self.queue.put('https://otakudesu.cloud/anime/x/', 'anime')
+        self.queue.fail(self.queue.lease('a')[0], 'error')
+        self.assertEqual(self.queue.stats()['pending'], 1)
+        self.queue.fail(self.queue.lease('a')[0], 'error')
+        self.assertEqual(self.queue.stats()['failed'], 1)
+        self.assertEqual(self.queue.lease('a'), [])
+
+
+class TestCrawler(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.queue = SQLiteWorkQueue(os.path.join(directory.name, 'crawl.db'))
+        self.addCleanup(self.queue.close)
+
+    def test_classify(self):
+        self.assertEqual(classify('https://otakudesu.cloud/episode/x-1/'), 'episode')
+        self.assertIsNone(classify('https://otakudesu.cloud/genres/action/'))
+
+    @patch('httpx.get', side_effect=fake_get)
+    def test_crawl(self, mock_get):
+        crawler = Crawler(self.queue)
+        self.assertEqual(crawler.seed(), 1)
+        self.assertEqual(crawler.run(concurrency=2), 5)
+        self.assertEqual(self.queue.stats(), {'pending': 0, 'leased': 0, 'done': 5, 'failed': 0})
+        self.assertEqual(sorted(kind for _, kind, _ in self.queue.results()), ['anime', 'anime', 'batch', 'episode', 'episode'])
+        self.assertEqual(mock_get.call_count, 6)
+
+    @patch('httpx.get', side_effect=fake_get)
+    def test_max_depth(self, mock_get):
+        self.queue.put('https://otakudesu.cloud/anime/x/', 'anime')
+        Crawler(self.queue, max_depth=0).run()
+        self.assertEqual(self.queue.stats()['done'], 1)
+
+    @patch('httpx.get', side_effect=fake_get)
+    def test_failures_are_recorded(self, mock_get):
+        self.queue.put('https://otakudesu.cloud/episode/broken/', 'episode')
+        Crawler(self.queue).run()
+        self.assertEqual(self.queue.stats()['failed'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
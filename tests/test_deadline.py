@@ -0,0 +1,104 @@
+import unittest
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import patch
+from otakudesudata import search
+from otakudesudata.parser import OngoingParser, fetch_within_deadline
+
+fixtures = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+class Server(ThreadingHTTPServer):
+    # the ten detail pages of a search are requested at once: past the default listen backlog of 5,
+    # a connection waits a second for its SYN to be sent again
+    request_queue_size = 128
+
+
+class StandIn:
+    """
+    A local server standing in for the search, anime and ongoing pages (the recorded fixtures). Requests for a path
+    containing one of `slow` wait until the test ends, those for a path containing one of `broken` are dropped.
+    """
+    def __init__(self, slow=(), broken=()):
+        self.release = threading.Event()
+        standIn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if any(part in self.path for part in slow): standIn.release.wait(10)
+                if any(part in self.path for part in broken):
+                    self.close_connection = True
+                    return None
+                name = {'': 'search', 'anime': 'anime', 'ongoing-anime': 'ongoing'}.get(self.path.split('?')[0].strip('/').split('/')[0])
+                with open(os.path.join(fixtures, f'{name}.html'), encoding='utf-8') as file:
+                    body = file.read().replace('https://otakudesu.cloud/', standIn.url).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def close(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestSearchDeadline(unittest.TestCase):
+    def setUp(self):
+        self.standIn = StandIn(slow=('/anime/naruto-',), broken=('/anime/bleach-',))
+
+    def tearDown(self):
+        self.standIn.close()
+
+    def test_partial_results(self):
+        start = time.perf_counter()
+        with patch('otakudesudata.api.baseUrl', self.standIn.url):
+            results = search('x', get_anime_details=True, deadline=1, timeout=5)
+        self.assertLess(time.perf_counter() - start, 3)
+        statuses = {anime['url'].split('/')[-2]: anime['fetchStatus'] for anime in results['anime']}
+        self.assertEqual(statuses.pop('naruto-sub-indo'), 'timeout')
+        self.assertEqual(statuses.pop('bleach-sub-indo'), 'error')
+        self.assertEqual(set(statuses.values()), {'ok'})
+        enriched = {anime['url'].split('/')[-2]: anime for anime in results['anime']}
+        self.assertIn('episodes', enriched['one-piece-sub-indo'])
+        self.assertNotIn('episodes', enriched['naruto-sub-indo'])
+        self.assertEqual(enriched['bleach-sub-indo']['fetchError'], 'RemoteProtocolError')
+
+    def test_without_deadline(self):
+        with patch('otakudesudata.api.baseUrl', self.standIn.url):
+            results = search('x', timeout=5)
+        self.assertFalse(any('fetchStatus' in anime for anime in results['anime']))
+
+    def test_search_page_counts(self):
+        kwargs = {'deadline': 5, 'timeout': 10}
+        fetch_within_deadline(self.standIn.url, kwargs)
+        self.assertLess(kwargs['deadline'], 5)
+        self.assertGreater(kwargs['deadline'], 4)
+
+
+class TestPagesDeadline(unittest.TestCase):
+    def setUp(self):
+        self.standIn = StandIn(slow=('/page/3/',), broken=('/page/4/',))
+
+    def tearDown(self):
+        self.standIn.close()
+
+    def test_missing_pages(self):
+        ongoing = OngoingParser(self.standIn.url + 'ongoing-anime/', timeout=5)
+        releases = ongoing.pages([1, 2, 3, 4], deadline=1)
+        self.assertEqual(len(releases), 2 * len(ongoing.releases))
+        self.assertEqual(ongoing.missing_pages, [3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from otakudesudata.graph import FranchiseCrawler
+
+
+class StandIn:
+    """A local server standing in for anime pages linked by the seasons and feed of `graph` (`/anime/<name>/`)."""
+    def __init__(self, graph):
+        self.graph = graph
+        self.paths = []
+        standIn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                standIn.paths.append(self.path)
+                name = self.path.strip('/').split('/')[-1]
+                if name not in standIn.graph:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    return self.end_headers()
+                links = standIn.graph[name]
+                seasons = ''.join(f'<a href="{standIn.url}anime/{other}/">{other}</a>' for other in links.get('seasons', []))
+                feed = ''.join(f'<div class="isi-anime"><a href="{standIn.url}anime/{other}/"><img src="{other}.jpg"></a>{other}</div>' for other in links.get('feed', []))
+                body = (f'<div><h1>{name}</h1></div><div class="sinopc"><p>about {name}</p><p>{seasons}</p></div>{feed}').encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestFranchiseCrawler(unittest.TestCase):
+    graph = {
+        's1': {'seasons': ['s2', 's3'], 'feed': ['other']},
+        's2': {'seasons': ['s1', 's3', 'movie']},
+        's3': {'seasons': ['s1', 's2', 'gone'], 'feed': ['other']},
+        'movie': {'seasons': ['s1']},
+        'other': {'feed': ['far']},
+        'far': {},
+    }
+
+    def setUp(self):
+        self.standIn = StandIn(self.graph)
+
+    def tearDown(self):
+        self.standIn.close()
+
+    def url(self, name):
+        return f'{self.standIn.url}anime/{name}/'
+
+    def test_breadth_first(self):
+        graph = FranchiseCrawler(max_depth=2, timeout=2).crawl([self.url('s1')])
+        depths = {node['title']: node['depth'] for node in graph['nodes'].values()}
+        self.assertEqual(depths, {'s1': 0, 's2': 1, 's3': 1, 'other': 1, 'movie': 2, 'far': 2})
+        self.assertEqual(graph['edges'][self.url('s1')], [
+            {'url': self.url('s2'), 'kind': 'season'}, {'url': self.url('s3'), 'kind': 'season'}, {'url': self.url('other'), 'kind': 'feed'}])
+        self.assertEqual(graph['errors'], {self.url('gone'): '404'})
+        self.assertTrue(graph['nodes'][self.url('s1')]['description'].startswith('about s1'))
+        # every page is fetched once although most are linked from several others
+        self.assertEqual(len(self.standIn.paths), len(set(self.standIn.paths)))
+
+    def test_limits(self):
+        crawler = FranchiseCrawler(max_depth=1, follow=('seasons',), timeout=2)
+        graph = asyncio.run(crawler.acrawl([self.url('s1')]))
+        self.assertEqual(set(graph['nodes']), {self.url('s1'), self.url('s2'), self.url('s3')})
+        # edges to the pages beyond the depth are still listed
+        self.assertIn({'url': self.url('movie'), 'kind': 'season'}, graph['edges'][self.url('s2')])
+        graph = FranchiseCrawler(max_nodes=2, timeout=2).crawl([self.url('s1'), self.url('s1#x')])
+        self.assertEqual(len(graph['nodes']), 2)
+
+    def test_unknown_edge(self):
+        with self.assertRaises(ValueError):
+            FranchiseCrawler(follow=('episodes',))
+
+
+if __name__ == '__main__':
+    unittest.main()
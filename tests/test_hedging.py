@@ -0,0 +1,127 @@
+import unittest
+import asyncio
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import httpx
+from otakudesudata import fetch
+from otakudesudata.hedging import HedgePolicy
+from otakudesudata.metrics import MetricsCollector
+from otakudesudata.mirrors import MirrorSet
+
+
+class StandIn:
+    """A local server answering with its name; the first `stalls` requests to /slow/ wait until the test ends."""
+    def __init__(self, name, stalls=0):
+        self.paths = []
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        standIn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with standIn.lock:
+                    standIn.paths.append(self.path)
+                    stall = self.path == '/slow/' and standIn.paths.count('/slow/') <= stalls
+                if stall: standIn.release.wait(10)
+                body = name.encode()
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def close(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def get(url, **kwargs):
+    async def main():
+        async with httpx.AsyncClient() as client:
+            return await fetch.aget(client, url, timeout=5, **kwargs)
+    return asyncio.run(main())
+
+
+class TestHedgePolicy(unittest.TestCase):
+    def test_delay(self):
+        hedge = HedgePolicy(percentile=95, min_samples=10)
+        self.assertIsNone(hedge.delay())
+        self.assertEqual(HedgePolicy(initial_delay=0.5).delay(), 0.5)
+        for latency in range(1, 101):
+            hedge.observe(latency / 100)
+        self.assertEqual(hedge.delay(), 0.96)
+        hedge.max_delay = 0.5
+        self.assertEqual(hedge.delay(), 0.5)
+        with self.assertRaises(ValueError):
+            HedgePolicy(percentile=0)
+
+
+class TestHedging(unittest.TestCase):
+    def setUp(self):
+        self.standIn = StandIn('one', stalls=1)
+        self.collector = MetricsCollector().install()
+
+    def tearDown(self):
+        self.collector.uninstall()
+        self.standIn.close()
+
+    def test_duplicate_wins(self):
+        hedge = HedgePolicy(initial_delay=0.1, budget=1)
+        start = time.perf_counter()
+        response = get(self.standIn.url + 'slow/', hedge=hedge)
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(response.text, 'one')
+        self.assertEqual(self.standIn.paths, ['/slow/', '/slow/'])
+        self.assertEqual(hedge.stats, {'requests': 1, 'issued': 1, 'won': 1})
+        self.assertEqual(self.collector.results['hedges'], {'issued': 1, 'won': 1})
+        self.assertIn('otakudesudata_hedges_won_total 1', self.collector.to_prometheus())
+        # only the winner's latency, counted from the original send
+        self.assertEqual(len(hedge._latencies), 1)
+        self.assertGreaterEqual(hedge._latencies[0], 0.1)
+
+    def test_fast_requests(self):
+        hedge = HedgePolicy(initial_delay=1, budget=1)
+        for _ in range(3):
+            get(self.standIn.url + 'fast/', hedge=hedge)
+        self.assertEqual(hedge.stats, {'requests': 3, 'issued': 0, 'won': 0})
+        self.assertEqual(len(self.standIn.paths), 3)
+
+    def test_budget(self):
+        hedge = HedgePolicy(initial_delay=0.05, budget=0)
+        threading.Timer(0.3, self.standIn.release.set).start()
+        self.assertEqual(get(self.standIn.url + 'slow/', hedge=hedge).text, 'one')
+        self.assertEqual(hedge.stats['issued'], 0)
+        self.assertEqual(self.standIn.paths, ['/slow/'])
+
+
+class TestHedgingMirrors(unittest.TestCase):
+    def setUp(self):
+        self.slow = StandIn('slow', stalls=2)
+        self.fast = StandIn('fast')
+        self.mirrors = MirrorSet([self.slow.url, self.fast.url], aliases=[], timeout=2)
+        self.mirrors.probe()
+        # the slow mirror ranks first
+        self.mirrors.stats[self.slow.url]['latency'], self.mirrors.stats[self.fast.url]['latency'] = 0.001, 1
+
+    def tearDown(self):
+        self.slow.close()
+        self.fast.close()
+
+    def test_duplicate_on_next_mirror(self):
+        hedge = HedgePolicy(initial_delay=0.1, budget=1)
+        response = get(self.slow.url + 'slow/', mirrors=self.mirrors, hedge=hedge)
+        self.assertEqual(response.text, 'fast')
+        self.assertEqual(self.fast.paths[-1], '/slow/')
+        self.assertEqual(hedge.stats['won'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
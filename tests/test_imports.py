@@ -0,0 +1,57 @@
+import unittest
+import subprocess
+import sys
+import os
+import otakudesudata
+
+# cumulative microseconds `import otakudesudata` may take, override with OTAKUDESUDATA_IMPORT_BUDGET_US on slow machines
+budget = int(os.environ.get('OTAKUDESUDATA_IMPORT_BUDGET_US', 20000))
+
+
+def import_times(statement: str) -> dict:
+    """Runs `statement` in a fresh interpreter with `-X importtime` and returns the cumulative microseconds per module."""
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line: continue
+        _, cumulative, module = line.split('|')
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime(unittest.TestCase):
+    def test_package_import_is_lazy(self):
+        times = import_times('import otakudesudata')
+        for heavy in ('httpx', 'bs4', 'asyncio', 'otakudesudata.parser', 'otakudesudata.constants'):
+            self.assertNotIn(heavy, times)
+        self.assertLess(times['otakudesudata'], budget)
+
+    def test_first_use_imports(self):
+        times = import_times('import otakudesudata; otakudesudata.search')
+        self.assertIn('otakudesudata.api', times)
+        self.assertIn('httpx', times)
+
+
+class TestLazyAttributes(unittest.TestCase):
+    def test_exports(self):
+        from otakudesudata import search, get_ongoing, OngoingWatcher, baseUrl, userAgents
+        from otakudesudata.api import search as apiSearch, get_ongoing as apiGetOngoing
+        from otakudesudata.watcher import OngoingWatcher as watcher
+        self.assertIs(search, apiSearch)
+        self.assertIs(get_ongoing, apiGetOngoing)
+        self.assertIs(OngoingWatcher, watcher)
+        self.assertEqual(baseUrl, otakudesudata.constants.baseUrl)
+        self.assertIs(userAgents, otakudesudata.constants.userAgents)
+        self.assertIn('get_schedules', dir(otakudesudata))
+        self.assertIs(otakudesudata.fetch, sys.modules['otakudesudata.fetch'])
+
+    def test_unknown(self):
+        with self.assertRaises(AttributeError):
+            otakudesudata.unknown
+        with self.assertRaises(ImportError):
+            from otakudesudata import unknown  # noqa: F401
+
+
+if __name__ == '__main__':
+    unittest.main()
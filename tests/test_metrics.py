@@ -0,0 +1,91 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from otakudesudata import metrics, get_schedules
+from otakudesudata.metrics import MetricsCollector
+from otakudesudata.parser import AnimeParser, make_soup
+
+
+class TestHooks(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        metrics.add_hook('parse', self.events.append)
+
+    def tearDown(self):
+        metrics.remove_hook('parse', self.events.append)
+
+    def test_parse_event(self):
+        AnimeParser.get_description(make_soup('<div class="sinopc">text</div>'))
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(self.events[0]['parser'], 'AnimeParser')
+        self.assertEqual(self.events[0]['method'], 'get_description')
+
+    def test_remove_hook(self):
+        metrics.remove_hook('parse', self.events.append)
+        AnimeParser.get_description(make_soup('<html></html>'))
+        self.assertEqual(self.events, [])
+        self.assertFalse(metrics.enabled('parse'))
+
+    def test_faulty_hook(self):
+        def broken(data):
+            raise RuntimeError('broken hook')
+        metrics.add_hook('parse', broken)
+        try:
+            with self.assertLogs('otakudesudata.metrics', 'ERROR'):
+                self.assertEqual(AnimeParser.get_description(make_soup('<div class="sinopc">text</div>')), 'text')
+        finally:
+            metrics.remove_hook('parse', broken)
+        # the other hooks still ran
+        self.assertEqual(len(self.events), 1)
+
+    def test_unknown_event(self):
+        with self.assertRaises(ValueError):
+            metrics.add_hook('unknown', print)
+
+
+class TestMetricsCollector(unittest.TestCase):
+    @patch('httpx.get')
+    def test_collects_fetch_tree_and_parse(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.text = '<html></html>'
+        mock_response.content = b'<html></html>'
+        mock_response.status_code = 200
+        mock_get.return_value = mock_response
+
+        collector = MetricsCollector().install()
+        try:
+            get_schedules()
+        finally:
+            collector.uninstall()
+        results = collector.results
+        self.assertEqual(results['requests'], 1)
+        self.assertEqual(results['bytes'], 13)
+        self.assertEqual(results['trees']['count'], 1)
+        text = collector.to_prometheus()
+        self.assertIn('otakudesudata_fetch_requests_total{host="otakudesu.cloud",status="200"} 1', text)
+        self.assertIn('otakudesudata_fetch_seconds_bucket{le="+Inf"} 1', text)
+
+    @patch('httpx.get')
+    def test_collects_errors(self, mock_get):
+        mock_get.side_effect = ConnectionError()
+        collector = MetricsCollector().install()
+        try:
+            with self.assertRaises(ConnectionError):
+                get_schedules()
+        finally:
+            collector.uninstall()
+        self.assertEqual(collector.results['fetchErrors'], 1)
+        self.assertEqual(collector.results['errors'], 0)
+        self.assertIn('otakudesudata_fetch_errors_total{host="otakudesu.cloud",error="ConnectionError"} 1', collector.to_prometheus())
+
+    def test_fetch_and_parser_errors_apart(self):
+        collector = MetricsCollector()
+        collector({'event': 'fetch', 'url': 'https://otakudesu.cloud/anime/x/', 'error': 'ReadTimeout', 'elapsed': 1})
+        collector({'event': 'error', 'where': 'get_anime_details', 'error': 'AttributeError'})
+        text = collector.to_prometheus()
+        self.assertIn('otakudesudata_fetch_errors_total{host="otakudesu.cloud",error="ReadTimeout"} 1', text)
+        self.assertIn('otakudesudata_errors_total{where="get_anime_details",error="AttributeError"} 1', text)
+        self.assertEqual((collector.results['fetchErrors'], collector.results['errors']), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+import asyncio
+import socket
+import threading
+import time
+import httpx
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from otakudesudata.mirrors import MirrorSet
+from otakudesudata.parser import AnimeParser
+from otakudesudata import fetch, metrics
+
+
+class StandIn:
+    """A local server standing in for one mirror, answering every path after `latency` seconds with `status`."""
+    def __init__(self, latency=0.0, status=200):
+        self.latency = latency
+        self.status = status
+        self.paths = []
+        standIn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                standIn.paths.append(self.path)
+                time.sleep(standIn.latency)
+                body = f'<html><div><h1>{standIn.url}</h1></div></html>'.encode()
+                self.send_response(standIn.status)
+                self.send_header('Content-Type', 'text/html')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def unused_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f'http://127.0.0.1:{sock.getsockname()[1]}/'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMirrorSet(unittest.TestCase):
+    def setUp(self):
+        self.slow, self.fast = StandIn(latency=0.2), StandIn()
+        self.down = unused_url()
+        self.mirrors = MirrorSet([self.slow.url, self.down, self.fast.url], aliases=['https://otakudesu.cloud/'], timeout=2)
+
+    def tearDown(self):
+        self.slow.close()
+        self.fast.close()
+
+    def test_selects_fastest_healthy(self):
+        self.assertEqual(self.mirrors.current, self.fast.url)
+        self.assertEqual(self.mirrors.ranked(), [self.fast.url, self.slow.url, self.down])
+        self.assertFalse(self.mirrors.stats[self.down]['healthy'])
+        self.assertLess(self.mirrors.stats[self.fast.url]['latency'], self.mirrors.stats[self.slow.url]['latency'])
+
+    def test_rewrite(self):
+        self.assertEqual(self.mirrors.rewrite('https://otakudesu.cloud/anime/jujutsu-kaisen-sub-indo/'), self.fast.url + 'anime/jujutsu-kaisen-sub-indo/')
+        self.assertEqual(self.mirrors.rewrite(self.slow.url + 'ongoing-anime/page/2/?a=1'), self.fast.url + 'ongoing-anime/page/2/?a=1')
+        self.assertEqual(self.mirrors.rewrite('https://example.com/anime/x/'), 'https://example.com/anime/x/')
+        self.assertEqual(self.mirrors.candidates('https://example.com/'), [(None, 'https://example.com/')])
+
+    def test_failover(self):
+        self.mirrors.probe()
+        self.fast.status = 503
+        events = []
+        metrics.add_hook('error', events.append)
+        try:
+            response = fetch.get('https://otakudesu.cloud/anime/x/', mirrors=self.mirrors)
+        finally:
+            metrics.remove_hook('error', events.append)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(str(response.url), self.slow.url + 'anime/x/')
+        self.assertEqual(self.mirrors.current, self.slow.url)
+        self.assertEqual(self.mirrors.stats[self.fast.url]['failures'], 1)
+        self.assertEqual([(event['where'], event['mirror']) for event in events], [('mirrors', self.fast.url)])
+
+    def test_last_mirror_error_is_returned(self):
+        mirrors = MirrorSet([self.fast.url], aliases=[])
+        self.fast.status = 503
+        self.assertEqual(fetch.get(self.fast.url, mirrors=mirrors).status_code, 503)
+        with self.assertRaises(httpx.ConnectError):
+            fetch.get(self.down, mirrors=MirrorSet([self.down], aliases=[]))
+
+    def test_parser_uses_mirror(self):
+        parser = AnimeParser('https://otakudesu.cloud/anime/x/', mirrors=self.mirrors)
+        self.assertEqual(parser.title, self.fast.url)
+        self.assertIn('/anime/x/', self.fast.paths)
+
+    def test_async_failover(self):
+        self.mirrors.probe()
+        self.fast.status = 500
+        async def main():
+            async with fetch.async_client() as client:
+                return await fetch.aget(client, 'https://otakudesu.cloud/anime/x/', mirrors=self.mirrors)
+        self.assertEqual(str(asyncio.run(main()).url), self.slow.url + 'anime/x/')
+
+    def test_periodic_probe(self):
+        clock = Clock()
+        mirrors = MirrorSet([self.slow.url, self.fast.url], interval=60, timer=clock)
+        self.assertEqual(mirrors.current, self.fast.url)
+        mirrors.failed(self.fast.url)
+        self.assertEqual(mirrors.current, self.slow.url)
+        clock.now = 61
+        self.assertEqual(mirrors.current, self.slow.url)  # the probe it starts runs in the background
+        mirrors._probing.join(5)
+        self.assertEqual(mirrors.current, self.fast.url)
+
+    def test_first_probe_once(self):
+        mirrors = MirrorSet([self.slow.url, self.fast.url], timeout=2)
+        threads = [threading.Thread(target=mirrors.ranked) for _ in range(10)]
+        [thread.start() for thread in threads]
+        [thread.join() for thread in threads]
+        # the callers that came during the first probe waited for it instead of probing again
+        self.assertEqual(self.slow.paths.count('/'), 1)
+        self.assertEqual(self.fast.paths.count('/'), 1)
+
+    def test_timer(self):
+        mirrors = MirrorSet([self.slow.url, self.fast.url], interval=0.1, timeout=2).start()
+        try:
+            time.sleep(0.6)
+        finally:
+            mirrors.stop()
+        # probed by the timer without being used
+        self.assertGreater(self.fast.paths.count('/'), 1)
+        mirrors._probing.join(5)
+        probes = self.fast.paths.count('/')
+        time.sleep(0.3)
+        self.assertEqual(self.fast.paths.count('/'), probes)
+
+
+if __name__ == '__main__':
+    unittest.main()
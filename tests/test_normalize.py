@@ -0,0 +1,84 @@
+import unittest
+import datetime
+import os
+from unittest.mock import patch, MagicMock
+from otakudesudata.normalize import annotate, parse_date, parse_duration, parse_number, parse_int
+from otakudesudata.parser import AnimeParser, EpisodeParser
+
+fixtures = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+def fixture(name):
+    with open(os.path.join(fixtures, f'{name}.html'), encoding='utf-8') as file:
+        response = MagicMock()
+        response.text = file.read()
+        response.status_code = 200
+        return response
+
+
+class TestParsers(unittest.TestCase):
+    def test_dates(self):
+        reference = datetime.date(2024, 1, 5)
+        self.assertEqual(parse_date('Okt 03, 2020'), '2020-10-03')
+        self.assertEqual(parse_date('08 Okt,2020'), '2020-10-08')
+        self.assertEqual(parse_date('12 Desember 2020'), '2020-12-12')
+        self.assertEqual(parse_date('1 Agustus 2023'), '2023-08-01')
+        # a date without a year is the latest one not ahead of the reference
+        self.assertEqual(parse_date('06 Jan', reference), '2024-01-06')
+        self.assertEqual(parse_date('08 Nov', reference), '2023-11-08')
+        self.assertEqual(parse_date('29 Feb', reference), '2020-02-29')
+        for text in ('', None, 'Unknown', '31 Feb 2020', '2020'):
+            self.assertIsNone(parse_date(text))
+
+    def test_numbers(self):
+        self.assertEqual(parse_number('8.61'), 8.61)
+        self.assertEqual(parse_number('8,61'), 8.61)
+        self.assertIsNone(parse_number(''))
+        self.assertEqual(parse_int(' Episode 5'), 5)
+        self.assertIsNone(parse_int('Unknown'))
+
+    def test_durations(self):
+        self.assertEqual(parse_duration('23 Menit'), 23 * 60)
+        self.assertEqual(parse_duration('23 min.'), 23 * 60)
+        self.assertEqual(parse_duration('1 jam 30 menit'), 90 * 60)
+        self.assertEqual(parse_duration('1 hr. 5 min. per ep.'), 65 * 60)
+        self.assertEqual(parse_duration('24'), 24 * 60)
+        self.assertIsNone(parse_duration('Unknown'))
+
+    def test_annotate(self):
+        releases = annotate([{'title': 'Naruto', 'latestUpload': {'uploadDate': '08 Nov', 'episode': ' Episode 5'}}], datetime.date(2024, 1, 5))
+        self.assertEqual(releases[0]['latestUpload'], {'uploadDate': '08 Nov', 'episode': ' Episode 5', 'uploadDateIso': '2023-11-08', 'episodeNumber': 5})
+        self.assertEqual(annotate({'rating': None, 'totalEpisodes': 'Unknown'}), {'rating': None, 'totalEpisodes': 'Unknown', 'totalEpisodesCount': None})
+
+
+class TestNormalizedParsers(unittest.TestCase):
+    @patch('httpx.get')
+    def test_anime(self, mock_get):
+        mock_get.return_value = fixture('anime')
+        parser = AnimeParser('https://otakudesu.cloud/anime/jujutsu-kaisen-sub-indo/', normalize=True)
+        self.assertEqual(parser.details['ratingValue'], 8.61)
+        self.assertEqual(parser.details['totalEpisodesCount'], 24)
+        self.assertEqual(parser.details['durationSeconds'], 23 * 60)
+        self.assertEqual(parser.details['releaseDateIso'], '2020-10-03')
+        self.assertEqual(parser.episodes[0]['releaseDateIso'], '2020-10-08')
+        self.assertEqual(parser.batch['releaseDateIso'], '2021-03-28')
+        self.assertEqual(parser.details['rating'], '8.61')
+        # sorting by recency needs no parsing any more
+        self.assertEqual(max(parser.episodes, key=lambda episode: episode['releaseDateIso']), parser.episodes[-1])
+
+    @patch('httpx.get')
+    def test_episode(self, mock_get):
+        mock_get.return_value = fixture('episode')
+        parser = EpisodeParser('https://otakudesu.cloud/episode/jujutsu-kaisen-episode-1-sub-indo/', normalize=True)
+        self.assertEqual(parser.details['uploadTimeIso'], '2020-12-12')
+        self.assertEqual(parser.details['durationSeconds'], 23 * 60)
+
+    @patch('httpx.get')
+    def test_off_by_default(self, mock_get):
+        mock_get.return_value = fixture('anime')
+        parser = AnimeParser('https://otakudesu.cloud/anime/jujutsu-kaisen-sub-indo/')
+        self.assertNotIn('ratingValue', parser.details)
+
+
+if __name__ == '__main__':
+    unittest.main()
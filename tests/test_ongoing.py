@@ -0,0 +1,188 @@
+import unittest
+import asyncio
+import threading
+import re
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import patch
+from otakudesudata.parser import OngoingParser, ListingParser, GenreParser, make_soup
+from otakudesudata.cache import TTLCache
+from otakudesudata import get_completed, get_genre, get_ongoing, metrics
+
+
+def listing_page(url, listing, number, count, per_page=2):
+    """
+    A listing page in the markup of the site: `detpost` releases, or the `col-anime` cards of a genre page, and
+    WordPress `page-numbers` pagination.
+    """
+    if listing.startswith('genres/'):
+        releases = ''.join(
+            f'<div class="col-anime"><div class="col-anime-title"><a href="{url}anime/{listing}-{number}-{index}/">{listing} {number}-{index}</a></div>'
+            f'<div class="col-anime-studio">MAPPA</div><div class="col-anime-eps">{12 + index} Eps</div><div class="col-anime-rating">8.5{index}</div>'
+            f'<div class="col-anime-genre"><a href="{url}genres/action/">Action</a>, <a href="{url}{listing}/">Isekai</a></div>'
+            f'<div class="col-anime-cover"><img src="{url}{number}-{index}.jpg"></div>'
+            f'<div class="col-synopsis"><p>about {number}-{index}</p></div><div class="col-anime-date">Fall 2023</div></div>'
+            for index in range(per_page))
+        releases = f'<div class="col-anime-con">{releases}</div>'
+    else:
+        releases = ''.join(
+            f'<li><div class="detpost"><div class="epz">Episode {index}</div><div class="epztipe">Senin</div><div class="newnime">08 Nov</div>'
+            f'<div class="thumb"><a href="{url}anime/{listing}-{number}-{index}/"><div class="thumbz"><img src="{url}{number}-{index}.jpg">'
+            f'<h2 class="jdlflm">{listing} {number}-{index}</h2></div></a></div></div></li>'
+            for index in range(per_page))
+    links = [f'<a class="prev page-numbers" href="{url}{listing}/page/{number - 1}/">&laquo;</a>'] if number > 1 else []
+    for other in sorted({1, number - 1, number, number + 1, count} & set(range(1, count + 1))):
+        if other == number: links.append(f'<span aria-current="page" class="page-numbers current">{number}</span>')
+        else: links.append(f'<a class="page-numbers" href="{url}{listing}/page/{other}/">{other}</a>')
+    if number < count: links.append(f'<a class="next page-numbers" href="{url}{listing}/page/{number + 1}/">Berikutnya &raquo;</a>')
+    return f'<div class="venz"><ul>{releases}</ul></div><div class="pagination"><div class="pagenavix">{"".join(links)}</div></div>'
+
+
+class StandIn:
+    """A local server standing in for the site's paginated listings: every `/<listing>/page/<n>/` of `pages` pages."""
+    def __init__(self, pages=7):
+        self.pages = pages
+        self.paths = []
+        standIn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                standIn.paths.append(self.path)
+                match = re.fullmatch(r'/([\w-]+(?:/[\w-]+)?)/(?:page/(\d+)/)?', self.path)
+                number = int(match.group(2) or 1) if match else 0
+                if not 1 <= number <= standIn.pages:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    return self.end_headers()
+                body = listing_page(standIn.url, match.group(1), number, standIn.pages).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def titles(releases):
+    return [release['title'] for release in releases]
+
+
+class TestOngoingPages(unittest.TestCase):
+    def setUp(self):
+        self.standIn = StandIn(pages=7)
+        self.parser = OngoingParser(self.standIn.url + 'ongoing-anime/', timeout=2)
+
+    def tearDown(self):
+        self.standIn.close()
+
+    def test_page_urls(self):
+        self.assertEqual(self.parser.last_page, 7)
+        self.assertEqual(self.parser.page_url(1), self.standIn.url + 'ongoing-anime/')
+        self.assertEqual(self.parser.page_url(5), self.standIn.url + 'ongoing-anime/page/5/')
+
+    def test_page_jumps_directly(self):
+        self.assertEqual(titles(self.parser.page(5)), ['ongoing-anime 5-0', 'ongoing-anime 5-1'])
+        self.assertEqual(self.parser.current_page, 5)
+        self.assertEqual(self.standIn.paths, ['/ongoing-anime/', '/ongoing-anime/page/5/'])
+        self.assertEqual(titles(self.parser.next()), ['ongoing-anime 6-0', 'ongoing-anime 6-1'])
+
+    def test_pages(self):
+        releases = self.parser.pages(range(3, 6))
+        self.assertEqual(titles(releases), [f'ongoing-anime {number}-{index}' for number in (3, 4, 5) for index in (0, 1)])
+        self.assertEqual(self.parser.current_page, 1)
+        self.assertEqual(len(self.parser.pages()), 14)
+
+    def test_pages_shared_across_workers(self):
+        parser = OngoingParser(self.standIn.url + 'ongoing-anime/', use_cache=True, cache=TTLCache(), timeout=2)
+        shards = [parser.pages(range(worker + 1, parser.last_page + 1, 3)) for worker in range(3)]
+        self.assertEqual(sorted(title for shard in shards for title in titles(shard)), sorted(titles(parser.pages())))
+        # every page was fetched once (the first one also by the parser of setUp), the full listing came from the cache
+        self.assertEqual(len(self.standIn.paths), 1 + 7)
+
+    def test_async_iteration(self):
+        async def main():
+            return [release async for release in self.parser]
+        releases = asyncio.run(main())
+        self.assertEqual(len(releases), 14)
+        self.assertEqual(titles(releases)[-1], 'ongoing-anime 7-1')
+        self.assertEqual(self.parser.current_page, 7)
+
+    def test_parse_events_name_the_parser(self):
+        events = []
+        metrics.add_hook('parse', events.append)
+        try:
+            self.parser.pages([2])
+            GenreParser.get_releases(make_soup(''))
+        finally:
+            metrics.remove_hook('parse', events.append)
+        self.assertEqual({event['parser'] for event in events if event['method'] == 'get_releases'}, {'OngoingParser', 'GenreParser'})
+
+    def test_apage(self):
+        async def main():
+            return await self.parser.apage(3), await self.parser.apages([7, 6])
+        page, pages = asyncio.run(main())
+        self.assertEqual(titles(page), ['ongoing-anime 3-0', 'ongoing-anime 3-1'])
+        self.assertEqual(titles(pages), ['ongoing-anime 7-0', 'ongoing-anime 7-1', 'ongoing-anime 6-0', 'ongoing-anime 6-1'])
+
+
+class TestListings(unittest.TestCase):
+    def setUp(self):
+        self.standIn = StandIn(pages=4)
+
+    def tearDown(self):
+        self.standIn.close()
+
+    def test_completed(self):
+        with patch('otakudesudata.api.completedUrl', self.standIn.url + 'complete-anime/'):
+            completed = get_completed(timeout=2)
+            releases = get_completed(get_all=True, timeout=2)
+        self.assertIsInstance(completed, ListingParser)
+        self.assertEqual(titles(completed.releases), ['complete-anime 1-0', 'complete-anime 1-1'])
+        self.assertEqual(titles(releases), [f'complete-anime {number}-{index}' for number in range(1, 5) for index in (0, 1)])
+
+    def test_genre(self):
+        with patch('otakudesudata.api.genreUrl', self.standIn.url + 'genres/'):
+            action = get_genre('action', timeout=2)
+        self.assertIsInstance(action, GenreParser)
+        self.assertEqual(action.page_url(3), self.standIn.url + 'genres/action/page/3/')
+        releases = get_genre(self.standIn.url + 'genres/isekai/', get_all=True, normalize=True, timeout=2)
+        self.assertEqual(len(releases), 8)
+        self.assertEqual(titles(releases), [f'genres/isekai {number}-{index}' for number in range(1, 5) for index in (0, 1)])
+        self.assertEqual(releases[1], {
+            'title': 'genres/isekai 1-1',
+            'url': self.standIn.url + 'anime/genres/isekai-1-1/',
+            'studio': 'MAPPA',
+            'totalEpisodes': '13 Eps',
+            'totalEpisodesCount': 13,
+            'rating': '8.51',
+            'ratingValue': 8.51,
+            'genres': [{'text': 'Action', 'url': self.standIn.url + 'genres/action/'}, {'text': 'Isekai', 'url': self.standIn.url + 'genres/isekai/'}],
+            'synopsis': 'about 1-1',
+            'season': 'Fall 2023',
+            'thumbnail': {'url': self.standIn.url + '1-1.jpg', 'width': None, 'height': None, 'srcset': []}
+        })
+
+    def test_get_all_fetches_every_page_once(self):
+        with patch('otakudesudata.api.ongoingUrl', self.standIn.url + 'ongoing-anime/'):
+            releases = get_ongoing(get_all=True, timeout=2)
+        self.assertEqual(len(releases), 8)
+        self.assertEqual(sorted(self.standIn.paths), ['/ongoing-anime/'] + [f'/ongoing-anime/page/{number}/' for number in (2, 3, 4)])
+
+    def test_normalize(self):
+        with patch('otakudesudata.api.ongoingUrl', self.standIn.url + 'ongoing-anime/'):
+            releases = get_ongoing(get_all=True, normalize=True, timeout=2)
+        self.assertEqual([release['latestUpload']['episodeNumber'] for release in releases], [0, 1] * 4)
+        self.assertTrue(all(release['latestUpload']['uploadDateIso'].endswith('-11-08') for release in releases))
+
+
+if __name__ == '__main__':
+    unittest.main()
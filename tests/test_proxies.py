@@ -0,0 +1,167 @@
+import unittest
+import asyncio
+import socket
+import threading
+import time
+from unittest.mock import patch
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from otakudesudata.proxies import ProxyPool
+from otakudesudata import fetch, metrics, runner
+
+
+class StandInProxy:
+    """A local HTTP proxy stand-in answering every proxied request itself, after `latency` seconds with `status`."""
+    def __init__(self, latency=0.0, status=200):
+        self.latency = latency
+        self.status = status
+        self.requests = []
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                proxy.requests.append(self.path)
+                time.sleep(proxy.latency)
+                body = proxy.url.encode()
+                self.send_response(proxy.status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def unused_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f'http://127.0.0.1:{sock.getsockname()[1]}'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProxyPool(unittest.TestCase):
+    url = 'http://otakudesu.test/anime/x/'
+
+    def setUp(self):
+        self.slow, self.fast = StandInProxy(latency=0.1), StandInProxy()
+        self.clock = Clock()
+
+    def tearDown(self):
+        self.slow.close()
+        self.fast.close()
+
+    def test_routes_to_fastest(self):
+        pool = ProxyPool([self.slow.url, self.fast.url])
+        bodies = [fetch.get(self.url, proxy=pool).text for _ in range(6)]
+        pool.close()
+        self.assertEqual(sorted(bodies[:2]), sorted([self.slow.url, self.fast.url]))
+        self.assertEqual(bodies[2:], [self.fast.url] * 4)
+        self.assertEqual(self.fast.requests[0], self.url)
+        self.assertEqual(pool.ranked(), [self.fast.url, self.slow.url])
+
+    def test_client_per_proxy(self):
+        pool = ProxyPool([self.slow.url, self.fast.url])
+        self.assertIs(pool.client(self.fast.url), pool.client(self.fast.url))
+        self.assertIsNot(pool.client(self.fast.url), pool.client(self.slow.url))
+        pool.close()
+
+    def test_client_options(self):
+        pool = ProxyPool([self.fast.url], client_max_connections=7, keepalive_expiry=1)
+        with patch('otakudesudata.proxies.httpx.Client') as client:
+            pool.client(self.fast.url)
+        limits = client.call_args.kwargs['limits']
+        self.assertEqual((limits.max_connections, limits.keepalive_expiry), (7, 1))
+
+    def test_banned_proxy_is_retried_and_quarantined(self):
+        self.fast.status = 403
+        pool = ProxyPool([self.fast.url, self.slow.url], max_failures=1, quarantine=10, timer=self.clock)
+        events = []
+        metrics.add_hook('error', events.append)
+        try:
+            responses = [fetch.get(self.url, proxy=pool) for _ in range(3)]
+        finally:
+            metrics.remove_hook('error', events.append)
+            pool.close()
+        self.assertEqual([response.status_code for response in responses], [200, 200, 200])
+        self.assertEqual(len(self.fast.requests), 1)
+        self.assertEqual(pool.stats[self.fast.url]['quarantinedUntil'], 10)
+        self.assertEqual(pool.ranked(), [self.slow.url])
+        self.assertEqual([(event['where'], event['proxy']) for event in events], [('proxies', self.fast.url)])
+
+    def test_dead_proxy_quarantine_grows(self):
+        dead = unused_url()
+        pool = ProxyPool([dead, self.fast.url], max_failures=1, quarantine=10, max_quarantine=15, timer=self.clock)
+        self.assertEqual(fetch.get(self.url, proxy=pool).text, self.fast.url)
+        self.assertEqual(pool.stats[dead]['quarantinedUntil'], 10)
+        self.clock.now = 11
+        pool.stats[self.fast.url]['latency'] = 2.0  # worse than the error penalty of the dead proxy
+        self.assertEqual(fetch.get(self.url, proxy=pool).text, self.fast.url)
+        self.assertEqual(pool.stats[dead]['quarantinedUntil'], 11 + 15)
+        pool.close()
+
+    def test_every_proxy_quarantined(self):
+        pool = ProxyPool(['http://a:1', 'http://b:1'], timer=self.clock)
+        pool.stats['http://a:1']['quarantinedUntil'] = 30
+        pool.stats['http://b:1']['quarantinedUntil'] = 20
+        self.assertEqual(pool.ranked(), [])
+        self.assertEqual(pool.acquire(), 'http://b:1')
+        self.assertEqual(pool.acquire({'http://b:1'}), 'http://a:1')
+        self.assertIsNone(pool.acquire({'http://a:1', 'http://b:1'}))
+
+    def test_in_flight_requests_spread(self):
+        pool = ProxyPool(['http://a:1', 'http://b:1'])
+        pool.stats['http://a:1']['latency'], pool.stats['http://b:1']['latency'] = 0.1, 0.15
+        self.assertEqual([pool.acquire() for _ in range(3)], ['http://a:1', 'http://b:1', 'http://a:1'])
+
+    def test_async(self):
+        pool = ProxyPool([self.slow.url, self.fast.url], http2=False)
+        async def main():
+            async with fetch.async_client(proxy=pool) as client:
+                try:
+                    responses = await asyncio.gather(*[fetch.aget(client, self.url, proxy=pool) for _ in range(4)])
+                    return [response.text for response in responses], pool.async_client(self.fast.url)
+                finally:
+                    await pool.aclose()
+        bodies, client = asyncio.run(main())
+        self.assertEqual(set(bodies), {self.slow.url, self.fast.url})
+        self.assertTrue(client.is_closed)
+        self.assertEqual(sum(stats['requests'] for stats in pool.stats.values()), 4)
+        self.assertEqual([stats['active'] for stats in pool.stats.values()], [0, 0])
+
+    def test_async_clients_closed_with_the_loop(self):
+        self.addCleanup(runner.close)
+        pool = ProxyPool([self.slow.url, self.fast.url])
+        async def open_client():
+            return pool.async_client(self.fast.url)
+        client = runner.get_loop().run(open_client())
+        runner.close()
+        self.assertTrue(client.is_closed)
+
+    def test_close_async_clients(self):
+        self.addCleanup(runner.close)
+        pool = ProxyPool([self.slow.url, self.fast.url])
+        async def open_client():
+            return pool.async_client(self.fast.url)
+        loop = runner.get_loop()
+        client = loop.run(open_client())
+        pool.close()
+        self.assertTrue(client.is_closed)
+        self.assertIsNot(loop.run(open_client()), client)
+
+
+if __name__ == '__main__':
+    unittest.main()
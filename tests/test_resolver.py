@@ -0,0 +1,143 @@
+import unittest
+import asyncio
+import socket
+import threading
+from urllib.parse import urlsplit
+from unittest.mock import patch, MagicMock
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from otakudesudata.resolver import LinkResolver
+from otakudesudata.parser import EpisodeParser
+from otakudesudata.proxies import ProxyPool
+from otakudesudata import metrics
+
+
+class StandIn:
+    """
+    A local server standing in for a shortener, a safelink and a file host:
+      /short/<name> -> 302 -> /safelink/<name> -> 301 -> /files/<name> (HEAD tells the size)
+      /nohead/<name> refuses HEAD but answers `Range: bytes=0-0` with 206
+      /loop redirects to itself, anything else is 404
+    It also answers the requests it receives as a proxy (with an absolute URL), recorded in `proxied`.
+    """
+    def __init__(self):
+        self.requests = []
+        self.proxied = []
+        standIn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def answer(self, status, headers=(), body=b''):
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                if not any(name == 'Content-Length' for name, _ in headers):
+                    self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command == 'GET': self.wfile.write(body)
+
+            def route(self):
+                path = urlsplit(self.path).path
+                if path != self.path: standIn.proxied.append((self.command, self.path))
+                standIn.requests.append((self.command, path))
+                kind, _, name = path.strip('/').partition('/')
+                if kind == 'short': return self.answer(302, [('Location', f'/safelink/{name}')])
+                if kind == 'safelink': return self.answer(301, [('Location', f'/files/{name}')])
+                if kind == 'files': return self.answer(200, [('Content-Length', '1234')])
+                if kind == 'loop': return self.answer(302, [('Location', '/loop')])
+                if kind == 'nohead' and self.command == 'HEAD': return self.answer(405)
+                if kind == 'nohead' and self.headers.get('Range') == 'bytes=0-0':
+                    return self.answer(206, [('Content-Range', 'bytes 0-0/5678')], b'x')
+                self.answer(404)
+
+            do_GET = do_HEAD = route
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def unused_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f'http://127.0.0.1:{sock.getsockname()[1]}'
+
+
+class TestLinkResolver(unittest.TestCase):
+    def setUp(self):
+        self.standIn = StandIn()
+        self.resolver = LinkResolver(max_redirects=5, timeout=2)
+
+    def tearDown(self):
+        self.standIn.close()
+
+    def links(self):
+        url = self.standIn.url
+        return {
+            'mp4480p': [{'host': 'odfiles', 'url': f'{url}/short/a'}, {'host': 'pdrain', 'url': f'{url}/nohead/b'}],
+            'mp4720p': [{'host': 'odfiles', 'url': f'{url}/short/a'}, {'host': 'mega', 'url': f'{url}/gone'}],
+            'mkv1080p': [{'host': 'dead', 'url': f'{unused_url()}/x'}, {'host': 'loop', 'url': f'{url}/loop'}],
+        }
+
+    def test_annotate(self):
+        url = self.standIn.url
+        links = asyncio.run(self.resolver.annotate(self.links()))
+        first, nohead = links['mp4480p']
+        self.assertEqual((first['finalUrl'], first['contentLength']), (f'{url}/files/a', 1234))
+        self.assertEqual((nohead['finalUrl'], nohead['contentLength']), (f'{url}/nohead/b', 5678))
+        self.assertGreater(first['latency'], 0)
+        self.assertEqual(links['mp4720p'][0]['finalUrl'], f'{url}/files/a')
+        self.assertEqual(links['mp4720p'][1]['error'], '404')
+        self.assertEqual([(link['finalUrl'], link['error']) for link in links['mkv1080p']], [(None, 'ConnectError'), (None, 'TooManyRedirects')])
+        # the link appearing twice is resolved once, and the file host is never downloaded from
+        self.assertEqual(self.standIn.requests.count(('HEAD', '/short/a')), 1)
+        self.assertNotIn(('GET', '/files/a'), self.standIn.requests)
+        self.assertIn(('GET', '/nohead/b'), self.standIn.requests)
+
+    def test_cache(self):
+        asyncio.run(self.resolver.annotate(self.links()))
+        self.standIn.requests.clear()
+        events = []
+        metrics.add_hook('cache', events.append)
+        try:
+            links = self.resolver.resolve_links(self.links())
+        finally:
+            metrics.remove_hook('cache', events.append)
+        self.assertEqual(links['mp4480p'][0]['contentLength'], 1234)
+        self.assertEqual(links['mp4480p'][0]['latency'], 0)
+        # failures are not cached
+        self.assertEqual(self.standIn.requests, [('HEAD', '/gone')] + [('HEAD', '/loop')] * 6)
+        self.assertEqual(sum(event['hit'] for event in events), 2)
+
+    def test_proxy_pool(self):
+        url = self.standIn.url
+        resolver = LinkResolver(proxy=ProxyPool([url]), timeout=2)
+        self.assertEqual(asyncio.run(resolver.resolve(f'{url}/short/a'))['contentLength'], 1234)
+        # every hop went through the proxy
+        self.assertEqual(self.standIn.proxied, [('HEAD', f'{url}/short/a'), ('HEAD', f'{url}/safelink/a'), ('HEAD', f'{url}/files/a')])
+
+    def test_dead_proxy_pool(self):
+        resolver = LinkResolver(proxy=ProxyPool([unused_url()]), timeout=2)
+        result = asyncio.run(resolver.resolve(f'{self.standIn.url}/short/a'))
+        self.assertEqual((result['finalUrl'], result['error']), (None, 'ConnectError'))
+        # nothing reached the site without the proxy
+        self.assertEqual(self.standIn.requests, [])
+
+    def test_episode_parser(self):
+        url = self.standIn.url
+        html = f'''<div class="venutama"><h1 class="posttl">Episode 1</h1><div class="download"><ul>
+            <li><strong>Mp4 480p</strong><a href="{url}/short/c">ODFiles</a><a href="{url}/nohead/d">Pdrain</a></li>
+        </ul></div></div>'''
+        with patch('httpx.get', return_value=MagicMock(text=html, status_code=200, content=html.encode())):
+            parser = EpisodeParser('https://otakudesu.cloud/episode/x/', resolve_links=self.resolver)
+        self.assertEqual([(link['host'], link['finalUrl'], link['contentLength']) for link in parser.links['mp4480p']],
+                         [('odfiles', f'{url}/files/c', 1234), ('pdrain', f'{url}/nohead/d', 5678)])
+
+
+if __name__ == '__main__':
+    unittest.main()
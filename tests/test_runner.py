@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import httpx
+from otakudesudata import runner
+from otakudesudata.parser import AnimeParser
+
+anime_page = ('<div class="episodelist"><span>Batch</span><span><a href="https://otakudesu.cloud/batch/x/">x</a></span><span>date</span></div>'
+              '<div class="episodelist"><ul><li><span><a href="https://otakudesu.cloud/episode/x-1/">Episode 1</a></span></li></ul></div>')
+episode_page = '<div class="download"><ul><li><strong>Mp4 480p</strong><a href="https://example.com/file">Host</a></li></ul></div>'
+
+
+class TestBackgroundLoop(unittest.TestCase):
+    def setUp(self):
+        self.clients = []
+
+        def async_client(**kwargs):
+            self.clients.append(httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, text=episode_page))))
+            return self.clients[-1]
+
+        patcher = patch('otakudesudata.fetch.async_client', async_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(runner.close)
+        runner.close()
+
+    @patch('httpx.get')
+    def test_no_loop_without_details(self, mock_get):
+        mock_get.return_value = MagicMock(text=anime_page)
+        with patch('otakudesudata.runner.get_loop') as get_loop:
+            AnimeParser('https://otakudesu.cloud/anime/x/')
+        get_loop.assert_not_called()
+
+    @patch('httpx.get')
+    def test_client_is_reused(self, mock_get):
+        mock_get.return_value = MagicMock(text=anime_page)
+        first = AnimeParser('https://otakudesu.cloud/anime/x/', get_episode_details=True, raise_exception=True)
+        second = AnimeParser('https://otakudesu.cloud/anime/x/', get_episode_details=True, raise_exception=True)
+        self.assertEqual(first.episodes[0]['links']['mp4480p'][0]['url'], 'https://example.com/file')
+        self.assertEqual(second.episodes[0]['links']['mp4480p'][0]['url'], 'https://example.com/file')
+        self.assertEqual(len(self.clients), 1)
+
+    def test_separate_clients_per_options(self):
+        loop = runner.get_loop()
+        self.assertIs(loop.client(), loop.client(timeout=5))
+        self.assertIsNot(loop.client(), loop.client(http2=True))
+
+    def test_close(self):
+        loop = runner.get_loop()
+        client = loop.client()
+        runner.close()
+        self.assertTrue(client.is_closed)
+        self.assertIsNot(runner.get_loop(), loop)
+
+
+if __name__ == '__main__':
+    unittest.main()
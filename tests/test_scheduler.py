@@ -0,0 +1,182 @@
+import unittest
+import asyncio
+import threading
+import time
+import tempfile
+import shutil
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import patch
+import httpx
+from otakudesudata import fetch, scheduler
+from otakudesudata.scheduler import RequestScheduler
+from otakudesudata.resolver import LinkResolver
+from otakudesudata.thumbnails import ThumbnailStore
+
+
+class StandIn:
+    """A local server answering every request after `delay` seconds, recording the paths in the order they arrive."""
+    def __init__(self, delay=0.0):
+        self.paths = []
+        self.lock = threading.Lock()
+        standIn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with standIn.lock:
+                    standIn.paths.append(self.path)
+                time.sleep(delay)
+                body = b'ok'
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def run_in_order(self, scheduler, priorities):
+        # holds the only slot while every request queues, then returns the order they started in
+        async def main():
+            started = []
+            await scheduler.aacquire('interactive')
+            async def request(name, priority):
+                async with scheduler.aslot(priority):
+                    started.append(name)
+                    await asyncio.sleep(0)
+            tasks = [asyncio.create_task(request(name, priority)) for name, priority in priorities]
+            await asyncio.sleep(0.01)
+            scheduler.release('interactive')
+            await asyncio.gather(*tasks)
+            return started
+        return asyncio.run(main())
+
+    def test_priority_first(self):
+        started = self.run_in_order(RequestScheduler(capacity=1), [('b1', 'bulk'), ('b2', 'bulk'), ('n1', 'normal'), ('i1', 'interactive')])
+        self.assertEqual(started, ['i1', 'n1', 'b1', 'b2'])
+
+    def test_fair_shares(self):
+        requests = [(f'b{index}', 'bulk') for index in range(10)] + [(f'n{index}', 'normal') for index in range(10)]
+        started = self.run_in_order(RequestScheduler(capacity=1, shares={'normal': 3, 'bulk': 1}), requests)
+        # three normal requests for every bulk one, each class in arrival order
+        self.assertEqual(started[:8], ['n0', 'n1', 'n2', 'b0', 'n3', 'n4', 'n5', 'b1'])
+        self.assertEqual([name for name in started if name[0] == 'b'], [f'b{index}' for index in range(10)])
+
+    def test_limits(self):
+        tasks = RequestScheduler(capacity=4)
+        self.assertEqual(tasks.limits['bulk'], 3)
+        for _ in range(3):
+            tasks.acquire('bulk')
+        # the last slot is kept for the other classes
+        tasks.acquire('interactive')
+        self.assertEqual(tasks.stats['bulk']['active'], 3)
+        self.assertEqual(tasks.stats['interactive']['active'], 1)
+        waiting = threading.Thread(target=tasks.acquire, args=('bulk',))
+        waiting.start()
+        time.sleep(0.05)
+        self.assertEqual(tasks.stats['bulk']['queued'], 1)
+        tasks.release('interactive')
+        time.sleep(0.05)
+        # a free slot, but bulk is at its limit
+        self.assertEqual(tasks.stats['bulk']['queued'], 1)
+        tasks.release('bulk')
+        waiting.join(1)
+        self.assertFalse(waiting.is_alive())
+        self.assertEqual(tasks.stats['bulk'], {'active': 3, 'queued': 0, 'requests': 4, 'waited': tasks.stats['bulk']['waited']})
+        self.assertGreater(tasks.stats['bulk']['waited'], 0.05)
+
+    def test_cancelled_waiter(self):
+        tasks = RequestScheduler(capacity=1)
+        async def main():
+            await tasks.aacquire('bulk')
+            waiting = asyncio.create_task(tasks.aacquire('bulk'))
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiting
+            tasks.release('bulk')
+        asyncio.run(main())
+        self.assertEqual(tasks.stats['bulk']['queued'], 0)
+        self.assertEqual(tasks._active, 0)
+
+    def test_unknown_priority(self):
+        with self.assertRaises(ValueError):
+            RequestScheduler().acquire('urgent')
+
+
+class TestScheduledFetch(unittest.TestCase):
+    def setUp(self):
+        self.standIn = StandIn(delay=0.1)
+
+    def tearDown(self):
+        self.standIn.close()
+
+    def test_interactive_ahead_of_bulk(self):
+        tasks = RequestScheduler(capacity=2)
+        async def main():
+            async with httpx.AsyncClient() as client:
+                async def get(path, priority):
+                    await fetch.aget(client, self.standIn.url + path, scheduler=tasks, priority=priority, timeout=5)
+                    return time.perf_counter()
+                start = time.perf_counter()
+                bulk = [asyncio.create_task(get(f'bulk/{index}', 'bulk')) for index in range(12)]
+                await asyncio.sleep(0.05)
+                interactive = await get('search', 'interactive')
+                return interactive - start, max(await asyncio.gather(*bulk)) - start
+        interactive, bulk = asyncio.run(main())
+        # one bulk request fills the slot bulk leaves free, the search waits for the first one to finish only
+        self.assertLess(interactive, 0.4)
+        self.assertGreater(bulk, 0.6)
+        self.assertLess(self.standIn.paths.index('/search'), 4)
+
+    def test_installed(self):
+        tasks = RequestScheduler(capacity=1).install()
+        try:
+            self.assertIs(scheduler.installed(), tasks)
+            fetch.get(self.standIn.url, timeout=5)
+            threads = [threading.Thread(target=fetch.get, args=(self.standIn.url,), kwargs={'priority': 'bulk', 'timeout': 5}) for _ in range(3)]
+            start = time.perf_counter()
+            [thread.start() for thread in threads]
+            [thread.join() for thread in threads]
+            # one request at a time
+            self.assertGreater(time.perf_counter() - start, 0.3)
+        finally:
+            tasks.uninstall()
+        self.assertIsNone(scheduler.installed())
+        self.assertEqual(tasks.stats['normal']['requests'], 1)
+        self.assertEqual(tasks.stats['bulk']['requests'], 3)
+
+    def test_search_is_interactive(self):
+        tasks = RequestScheduler()
+        with patch('otakudesudata.api.baseUrl', self.standIn.url):
+            from otakudesudata import search
+            search('x', scheduler=tasks, timeout=5)
+        self.assertEqual(tasks.stats['interactive']['requests'], 1)
+
+    def test_resolver_and_thumbnails(self):
+        tasks = RequestScheduler()
+        # HEAD is refused (501), the ranged GET gets the size: two requests
+        result = asyncio.run(LinkResolver(scheduler=tasks, timeout=5).resolve(self.standIn.url + 'file'))
+        self.assertEqual(result['contentLength'], 2)
+        self.assertEqual(tasks.stats['normal']['requests'], 2)
+        root = tempfile.mkdtemp()
+        try:
+            entries = asyncio.run(ThumbnailStore(root, scheduler=tasks, timeout=5).download([{'url': self.standIn.url + 'a.jpg', 'srcset': []}]))
+        finally:
+            shutil.rmtree(root)
+        self.assertEqual(entries[0]['status'], 'stored')
+        self.assertEqual(tasks.stats['bulk']['requests'], 1)
+        self.assertEqual(sum(stats['active'] for stats in tasks.stats.values()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
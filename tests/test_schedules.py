@@ -0,0 +1,109 @@
+import unittest
+import datetime
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import patch
+from otakudesudata import get_schedules
+from otakudesudata.parser import AsyncParser
+
+fixtures = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+class Server(ThreadingHTTPServer):
+    # the anime pages of every day are requested at once: past the default listen backlog of 5,
+    # a connection waits a second for its SYN to be sent again
+    request_queue_size = 128
+
+
+class StandIn:
+    """A local server standing in for the schedule page and the anime and episode pages it links to (the recorded fixtures)."""
+    def __init__(self):
+        self.paths = []
+        self.lock = threading.Lock()
+        standIn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with standIn.lock:
+                    standIn.paths.append(self.path)
+                name = {'jadwal-rilis': 'schedule', 'anime': 'anime', 'episode': 'episode'}.get(self.path.strip('/').split('/')[0])
+                if name is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    return self.end_headers()
+                with open(os.path.join(fixtures, f'{name}.html'), encoding='utf-8') as file:
+                    body = file.read().replace('https://otakudesu.cloud/', standIn.url).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestSchedules(unittest.TestCase):
+    def setUp(self):
+        self.standIn = StandIn()
+        self.patch = patch('otakudesudata.api.schedulesUrl', self.standIn.url + 'jadwal-rilis/')
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.standIn.close()
+
+    def test_plain(self):
+        schedules = get_schedules(timeout=2)
+        self.assertEqual(len(schedules), 8)
+        self.assertEqual(set(schedules['monday'][0]), {'title', 'url'})
+        self.assertEqual(self.standIn.paths, ['/jadwal-rilis/'])
+
+    def test_days(self):
+        self.assertEqual(list(get_schedules(days=['Senin', 'random'], timeout=2)), ['monday', 'random'])
+        self.assertEqual(list(get_schedules(days='sunday', timeout=2)), ['sunday'])
+        with patch('otakudesudata.api.datetime') as mock_datetime:
+            mock_datetime.date.today.return_value = datetime.date(2024, 1, 3)
+            self.assertEqual(list(get_schedules(days='today', timeout=2)), ['wednesday'])
+
+    def test_latest_episode(self):
+        schedules = get_schedules(days='monday', get_latest_episode=True, timeout=5)
+        for anime in schedules['monday']:
+            self.assertIn('episodes', anime)
+            self.assertEqual(anime['latestEpisode']['title'], 'Jujutsu Kaisen Episode 24 Subtitle Indonesia')
+            self.assertTrue(anime['latestEpisode']['links'])
+        # only the anime of the requested day were fetched, each once
+        anime = [path for path in self.standIn.paths if path.startswith('/anime/')]
+        self.assertEqual(len(anime), len({item['url'] for item in schedules['monday']}))
+        self.assertEqual(len(anime), len(set(anime)))
+
+    def test_anime_details_shared_by_days(self):
+        schedules = get_schedules(get_anime_details=True, timeout=5)
+        anime = [path for path in self.standIn.paths if path.startswith('/anime/')]
+        self.assertEqual(len(anime), len(set(anime)))
+        self.assertTrue(all('episodes' in item for day in schedules.values() for item in day))
+        self.assertFalse(any(path.startswith('/episode/') for path in self.standIn.paths))
+
+
+class TestLatestEpisode(unittest.TestCase):
+    def test_by_date_then_number(self):
+        episodes = [
+            {'title': 'X Episode 2', 'url': 'u2', 'releaseDate': '15 Okt,2020'},
+            {'title': 'X Episode 3', 'url': 'u3', 'releaseDate': '15 Okt,2020'},
+            {'title': 'X Episode 1', 'url': 'u1', 'releaseDate': '08 Okt,2020'},
+        ]
+        self.assertEqual(AsyncParser.latest_episode(episodes)['url'], 'u3')
+        self.assertIsNone(AsyncParser.latest_episode([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
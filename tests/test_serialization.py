@@ -0,0 +1,110 @@
+import unittest
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from otakudesudata import serialization
+from otakudesudata.crawler import SQLiteWorkQueue
+from otakudesudata.parser import Parser
+from otakudesudata.snapshot import Snapshot, write_snapshot
+
+
+result = {
+    'title': 'Jujutsu Kaisen',
+    'thumbnails': {'url': 'https://otakudesu.cloud/jk.jpg', 'srcset': [{'url': 'https://otakudesu.cloud/jk-225x300.jpg', 'width': 225}]},
+    'details': {'score': 8.5, 'episodes': 24, 'airing': False, 'studio': None},
+    'episodes': [{'title': f'Episode {number}', 'url': f'https://otakudesu.cloud/episode/jk-episode-{number}/'} for number in range(24)],
+    'description': 'Itadori Yūji — 呪術廻戦',
+}
+
+
+class TestSerialization(unittest.TestCase):
+    def test_round_trip(self):
+        for format in ('msgpack', 'keys', 'json'):
+            with self.subTest(format=format):
+                data = serialization.dumps(result, format)
+                self.assertIsInstance(data, bytes)
+                self.assertEqual(serialization.loads(data), result)
+
+    def test_compact(self):
+        sizes = {format: len(serialization.dumps(result, format)) for format in ('msgpack', 'keys', 'json')}
+        self.assertLess(sizes['msgpack'], sizes['json'])
+        self.assertLess(sizes['keys'], sizes['msgpack'])
+
+    def test_tuples_become_lists(self):
+        self.assertEqual(serialization.loads(serialization.dumps({'pages': (1, 2)}, 'keys')), {'pages': [1, 2]})
+
+    def test_string_keys_only(self):
+        with self.assertRaises(TypeError):
+            serialization.dumps({1: 'one'}, 'keys')
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            serialization.dumps(result, 'pickle')
+
+    def test_unknown_data(self):
+        with self.assertRaises(ValueError):
+            serialization.loads(json.dumps(result).encode())
+        with self.assertRaises(ValueError):
+            serialization.loads(b'ODS')
+        with self.assertRaises(TypeError):
+            serialization.loads(json.dumps(result))
+
+    def test_newer_schema(self):
+        data = serialization.dumps(result)
+        with self.assertRaises(ValueError):
+            serialization.loads(data[:3] + bytes([serialization.schema + 1]) + data[4:])
+
+    def test_migrations(self):
+        data, written = serialization.dumps({'name': 'Jujutsu Kaisen'}, 'json'), serialization.schema
+        with patch.object(serialization, 'schema', written + 1), \
+             patch.dict(serialization.migrations, {written: lambda value: {'title': value.pop('name'), **value}}):
+            self.assertEqual(serialization.loads(data), {'title': 'Jujutsu Kaisen'})
+
+    def test_without_msgpack(self):
+        with patch.object(serialization, 'msgpack', None):
+            self.assertEqual(serialization.default_format(), 'json')
+            self.assertEqual(serialization.loads(serialization.dumps(result)), result)
+            with self.assertRaises(ImportError):
+                serialization.dumps(result, 'msgpack')
+
+    def test_parser_results(self):
+        parser = Parser()
+        parser.title = 'Jujutsu Kaisen'
+        parser._client = object()
+        self.assertEqual(serialization.loads(serialization.dumps(parser)), {'title': 'Jujutsu Kaisen'})
+
+    def test_files(self):
+        file = io.BytesIO()
+        serialization.dump([result, result], file, 'keys')
+        file.seek(0)
+        self.assertEqual(serialization.load(file), [result, result])
+
+
+class TestStores(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_work_queue(self):
+        queue = SQLiteWorkQueue(os.path.join(self.directory, 'crawl.db'))
+        queue.put('https://otakudesu.cloud/anime/jk/', 'anime')
+        queue.ack(queue.lease('worker')[0], result)
+        self.assertEqual(list(queue.results()), [('https://otakudesu.cloud/anime/jk/', 'anime', result)])
+        stored, = queue._connection.execute('SELECT result FROM tasks').fetchone()
+        self.assertTrue(stored.startswith(b'ODS'))
+        queue.close()
+
+    def test_snapshot(self):
+        path = os.path.join(self.directory, 'catalog.snap')
+        write_snapshot(path, [('https://otakudesu.cloud/anime/jk/', 'anime', result)])
+        with Snapshot(path) as snapshot:
+            self.assertEqual(snapshot.get('https://otakudesu.cloud/anime/jk/'), {**result, 'url': 'https://otakudesu.cloud/anime/jk/', 'kind': 'anime'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import tempfile
+import shutil
+import subprocess
+import sys
+import os
+from unittest.mock import patch
+from otakudesudata.snapshot import Snapshot, write_snapshot, normalize_title
+from otakudesudata.crawler import SQLiteWorkQueue
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'catalog.snap')
+        self.results = [
+            (f'https://otakudesu.cloud/anime/anime-{number}/', 'anime', {'title': f'Anime {number}', 'episodes': [{'title': f'Episode {number}'}]})
+        for number in range(500)]
+        self.results.append(('https://otakudesu.cloud/episode/anime-1-episode-1/', 'episode', {'title': 'ANIME  1', 'links': {}}))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_lookup(self):
+        self.assertEqual(write_snapshot(self.path, self.results), 501)
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 501)
+            record = snapshot.get('https://otakudesu.cloud/anime/anime-42/')
+            self.assertEqual(record, {'title': 'Anime 42', 'episodes': [{'title': 'Episode 42'}], 'url': 'https://otakudesu.cloud/anime/anime-42/', 'kind': 'anime'})
+            self.assertIsNone(snapshot.get('https://otakudesu.cloud/anime/missing/'))
+            self.assertNotIn('https://otakudesu.cloud/anime/missing/', snapshot)
+            self.assertEqual(sorted(record['kind'] for record in snapshot.find('anime 1')), ['anime', 'episode'])
+            self.assertEqual(snapshot.find('Anime 500'), [])
+            self.assertEqual(len(set(snapshot.urls())), 501)
+
+    def test_inputs(self):
+        write_snapshot(self.path, [{'url': 'https://a/', 'title': 'Ä Title'}, ('https://b/', {'title': 'b'}), {'title': 'no url'}])
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 2)
+            self.assertEqual(snapshot.find('ä   title')[0]['url'], 'https://a/')
+            self.assertEqual(snapshot.get('https://b/'), {'title': 'b', 'url': 'https://b/'})
+        self.assertEqual(normalize_title('  One   PIECE '), 'one piece')
+
+    def test_from_work_queue(self):
+        queue = SQLiteWorkQueue(os.path.join(self.directory, 'crawl.db'))
+        queue.put('https://otakudesu.cloud/anime/x/', 'anime')
+        queue.ack(queue.lease('worker')[0], {'title': 'X'})
+        write_snapshot(self.path, queue.results())
+        queue.close()
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(snapshot.get('https://otakudesu.cloud/anime/x/')['title'], 'X')
+
+    def test_replaced_while_open(self):
+        write_snapshot(self.path, self.results[:2])
+        snapshot = Snapshot(self.path)
+        write_snapshot(self.path, self.results[2:4])
+        # the open snapshot keeps reading the file it mapped, a new one reads the new file
+        self.assertEqual(snapshot.get(self.results[0][0])['title'], 'Anime 0')
+        with Snapshot(self.path) as replaced:
+            self.assertIsNone(replaced.get(self.results[0][0]))
+            self.assertEqual(replaced.get(self.results[2][0])['title'], 'Anime 2')
+        snapshot.close()
+
+    def test_other_process(self):
+        write_snapshot(self.path, self.results)
+        code = f'from otakudesudata.snapshot import Snapshot; print(Snapshot({self.path!r}).get("https://otakudesu.cloud/anime/anime-7/")["title"])'
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+        self.assertEqual(output.strip(), 'Anime 7')
+
+    def test_not_a_snapshot(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'\x00' * 64)
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+
+    def test_unsupported_version(self):
+        with patch('otakudesudata.snapshot.version', 2):
+            write_snapshot(self.path, self.results[:1])
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
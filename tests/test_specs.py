@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import patch
+from bs4 import BeautifulSoup as bs
+from otakudesudata.specs import Spec, Field, find, find_all, index, episodePage
+from otakudesudata.parser import EpisodeParser, AnimeParser
+from otakudesudata import metrics, specs
+
+
+class TestSpec(unittest.TestCase):
+    def setUp(self):
+        self.soup = bs('<div class="a"><ul><li>1</li><li>2</li></ul><p>text</p></div>', 'html.parser')
+
+    def test_shared_prefix_resolved_once(self):
+        spec = Spec('Test',
+                    first=Field([find('div', 'a'), find_all('li'), index(0)], post=lambda li: li.text),
+                    count=Field([find('div', 'a'), find_all('li')], post=len),
+                    text=Field([find('div', 'a'), find('p')], post=lambda p: p.text))
+        with patch('otakudesudata.specs._apply', wraps=specs._apply) as apply:
+            self.assertEqual(spec.extract(self.soup), {'first': '1', 'count': 2, 'text': 'text'})
+        self.assertEqual([call.args[0] for call in apply.call_args_list],
+                         [('find', 'div', 'a'), ('find_all', 'li', None), ('index', 0, None), ('find', 'p', None)])
+
+    def test_subset_and_defaults(self):
+        spec = Spec('Test',
+                    missing=Field([find('div', 'b'), find('p')], default=dict),
+                    short=Field([find_all('li'), index(5)], default=''))
+        first, second = spec.extract(self.soup), spec.extract(self.soup)
+        self.assertEqual(first, {'missing': {}, 'short': ''})
+        self.assertIsNot(first['missing'], second['missing'])
+        self.assertEqual(spec.extract(self.soup, ('short',)), {'short': ''})
+
+    def test_extractor(self):
+        spec = Spec('Test', count=Field([find_all('li')], post=len))
+        get_count = spec.extractor('count')
+        self.assertEqual(get_count.__name__, 'get_count')
+        self.assertEqual(get_count(self.soup), 2)
+        with self.assertRaises(KeyError): spec.extractor('other')
+
+    def test_parse_events(self):
+        events = []
+        metrics.add_hook('parse', events.append)
+        try:
+            EpisodeParser.get_title(bs('<h4>One Piece Episode 1000</h4>', 'html.parser'))
+            episodePage.extract(bs('', 'html.parser'), ('title', 'links'))
+        finally:
+            metrics.remove_hook('parse', events.append)
+        self.assertEqual([(event['parser'], event['method']) for event in events],
+                         [('EpisodeParser', 'get_title'), ('EpisodeParser', 'get_title'), ('EpisodeParser', 'get_links')])
+
+
+class TestPageSpecs(unittest.TestCase):
+    def test_episode_details(self):
+        soup = bs('<div class="infozingle"><span>Credit: Otakudesu</span><span>Genres: <a href="/g">Action</a></span></div>'
+                  '<div class="kategoz"><span>Posted by Admin</span><span>Released on 12 Desember 2020</span></div>', 'html.parser')
+        self.assertEqual(EpisodeParser.get_details(soup), {
+            'credit': 'Otakudesu',
+            'genres': [{'text': 'Action', 'url': '/g'}],
+            'uploader': 'Admin',
+            'uploadTime': '12 Desember 2020',
+        })
+
+    def test_anime_thumbnails(self):
+        soup = bs('<div class="fotoanime"><img src="a.jpg" width="225" height="320" srcset="a.jpg 225w, a-211x300.jpg 211w"></div>', 'html.parser')
+        self.assertEqual(AnimeParser.get_thumbnails(soup), {'url': 'a.jpg', 'width': '225', 'height': '320', 'srcset': ['a.jpg', 'a-211x300.jpg']})
+        self.assertEqual(AnimeParser.get_thumbnails(bs('', 'html.parser')), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
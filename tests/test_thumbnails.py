@@ -0,0 +1,190 @@
+import unittest
+import asyncio
+import hashlib
+import tempfile
+import threading
+import shutil
+import os
+import errno
+import socket
+from unittest.mock import patch
+from urllib.parse import urlsplit
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from otakudesudata.thumbnails import ThumbnailStore, choose, collect, variants
+from otakudesudata.proxies import ProxyPool
+
+
+class StandIn:
+    """
+    A local server standing in for the image host: every path is an image, `/same-*` paths share one content. It also
+    answers the requests it receives as a proxy (with an absolute URL), recorded in `proxied`.
+    """
+    def __init__(self):
+        self.requests = []
+        self.proxied = []
+        standIn = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                if path != self.path: standIn.proxied.append(self.path)
+                standIn.requests.append((path, self.headers.get('If-None-Match')))
+                if path.startswith('/missing'):
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    return self.end_headers()
+                body = b'same image' if path.startswith('/same-') else f'image of {path}'.encode()
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    return self.end_headers()
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/jpeg')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestVariants(unittest.TestCase):
+    thumbnail = {
+        'url': 'https://otakudesu.cloud/wp-content/uploads/2024/01/jjk.jpg',
+        'width': '225',
+        'height': '320',
+        'srcset': [
+            'https://otakudesu.cloud/wp-content/uploads/2024/01/jjk.jpg',
+            'https://otakudesu.cloud/wp-content/uploads/2024/01/jjk-211x300.jpg',
+            'https://otakudesu.cloud/wp-content/uploads/2024/01/jjk-106x150.jpg',
+        ]
+    }
+
+    def test_variants(self):
+        self.assertEqual([(width, height) for _, width, height in variants(self.thumbnail)], [(225, 320), (211, 300), (106, 150)])
+        self.assertEqual(variants({'url': 'a.jpg', 'width': '225', 'height': '320', 'srcset': None}), [('a.jpg', 225, 320)])
+        self.assertEqual(variants({'url': 'a.jpg', 'srcset': ['a.jpg', 'a-106x150.jpg']}), [('a.jpg', None, None), ('a-106x150.jpg', 106, 150)])
+        self.assertEqual(variants({}), [])
+
+    def test_choose(self):
+        self.assertTrue(choose(self.thumbnail, 100).endswith('jjk-106x150.jpg'))
+        self.assertTrue(choose(self.thumbnail, 200).endswith('jjk-211x300.jpg'))
+        self.assertTrue(choose(self.thumbnail, 300).endswith('jjk.jpg'))
+        self.assertTrue(choose(self.thumbnail).endswith('jjk.jpg'))
+        self.assertIsNone(choose({'url': None, 'srcset': []}))
+
+    def test_collect(self):
+        results = {
+            'anime': [{'title': 'a', 'thumbnails': {'url': 'a.jpg', 'srcset': None}}],
+            'releases': [{'thumbnail': {'url': 'b.jpg', 'srcset': []}}, {'thumbnail': {}}],
+        }
+        self.assertEqual([thumbnail['url'] for thumbnail in collect(results)], ['a.jpg', 'b.jpg'])
+
+
+class TestThumbnailStore(unittest.TestCase):
+    def setUp(self):
+        self.standIn = StandIn()
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.standIn.close()
+        shutil.rmtree(self.root)
+
+    def thumbnails(self):
+        url = self.standIn.url
+        return [
+            {'url': f'{url}/a.jpg', 'srcset': [f'{url}/a.jpg', f'{url}/a-211x300.jpg', f'{url}/a-106x150.jpg']},
+            {'url': f'{url}/same-1.jpg', 'srcset': []},
+            {'url': f'{url}/same-2.jpg', 'srcset': []},
+            {'url': f'{url}/a.jpg', 'srcset': [f'{url}/a-211x300.jpg']},
+            {'url': f'{url}/missing.jpg', 'srcset': []},
+        ]
+
+    def test_download(self):
+        store = ThumbnailStore(self.root, width=200, timeout=2)
+        thumbnails = self.thumbnails()
+        entries = asyncio.run(store.download(thumbnails))
+        statuses = [entry['status'] for entry in entries]
+        # which of the two identical images is the duplicate depends on which download ends first
+        self.assertEqual(statuses[:1] + sorted(statuses[1:3]) + statuses[3:], ['stored', 'duplicate', 'stored', 'stored', 'error'])
+        self.assertEqual(entries[0]['url'], f'{self.standIn.url}/a-211x300.jpg')
+        # the same variant is downloaded once, identical images are stored once
+        self.assertEqual([path for path, _ in self.standIn.requests].count('/a-211x300.jpg'), 1)
+        self.assertEqual(entries[1]['path'], entries[2]['path'])
+        self.assertEqual(entries[1]['digest'], hashlib.sha256(b'same image').hexdigest())
+        self.assertTrue(entries[1]['path'].endswith('.jpg'))
+        with open(thumbnails[0]['localPath'], 'rb') as file:
+            self.assertEqual(file.read(), b'image of /a-211x300.jpg')
+        self.assertIsNone(thumbnails[4]['localPath'])
+        objects = [name for _, _, names in os.walk(os.path.join(self.root, 'objects')) for name in names]
+        self.assertEqual(len(objects), 2)
+
+    def test_conditional_refetch(self):
+        asyncio.run(ThumbnailStore(self.root, timeout=2).download(self.thumbnails()[:3]))
+        self.standIn.requests.clear()
+        # a new store over the same directory reads the index
+        store = ThumbnailStore(self.root, timeout=2)
+        self.assertEqual([entry['status'] for entry in asyncio.run(store.download(self.thumbnails()[:3]))], ['cached'] * 3)
+        self.assertEqual(self.standIn.requests, [])
+        entries = store.fetch_thumbnails({'anime': [{'thumbnails': thumbnail} for thumbnail in self.thumbnails()[:3]]}, refresh=True)
+        self.assertEqual([entry['status'] for entry in entries], ['notModified'] * 3)
+        self.assertTrue(all(etag for _, etag in self.standIn.requests))
+        self.assertEqual(store.path(f'{self.standIn.url}/same-1.jpg'), store.path(f'{self.standIn.url}/same-2.jpg'))
+
+    def test_proxy_pool(self):
+        store = ThumbnailStore(self.root, proxy=ProxyPool([self.standIn.url]), timeout=2)
+        entries = asyncio.run(store.download(self.thumbnails()[:3]))
+        # which of the two identical images is the duplicate depends on which download ends first
+        self.assertEqual(sorted(entry['status'] for entry in entries), ['duplicate', 'stored', 'stored'])
+        self.assertEqual(sorted(self.standIn.proxied), sorted(entry['url'] for entry in entries))
+
+    def test_dead_proxy_pool(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            dead = f'http://127.0.0.1:{sock.getsockname()[1]}'
+        store = ThumbnailStore(self.root, proxy=ProxyPool([dead]), timeout=2)
+        entries = asyncio.run(store.download(self.thumbnails()[:1]))
+        self.assertEqual((entries[0]['status'], entries[0]['error']), ('error', 'ConnectError'))
+        self.assertEqual(self.standIn.requests, [])
+
+    def test_disk_off_the_loop(self):
+        threads = []
+        def replace(source, target, replace=os.replace):
+            threads.append(threading.current_thread())
+            return replace(source, target)
+        async def download():
+            with patch('os.replace', replace):
+                await ThumbnailStore(self.root, timeout=2).download(self.thumbnails()[:2])
+            return threading.current_thread()
+        loop = asyncio.run(download())
+        # both objects and the index were moved in place from worker threads
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(loop, threads)
+
+    def test_disk_error(self):
+        failed = []
+        def replace(source, target, replace=os.replace):
+            # the first object placed hits a full disk
+            if 'objects' in target and not failed:
+                failed.append(target)
+                raise OSError(errno.ENOSPC, 'No space left on device')
+            return replace(source, target)
+        with patch('os.replace', replace):
+            entries = asyncio.run(ThumbnailStore(self.root, timeout=2).download(self.thumbnails()[:2]))
+        self.assertEqual(sorted(entry['status'] for entry in entries), ['error', 'stored'])
+        self.assertEqual([entry['error'] for entry in entries if entry['status'] == 'error'], ['OSError'])
+        # no temporary file is left behind
+        self.assertFalse([name for _, _, names in os.walk(self.root) for name in names if name.endswith('.tmp')])
+
+
+if __name__ == '__main__':
+    unittest.main()
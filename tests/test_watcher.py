@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+import httpx
+from otakudesudata import runner
+from otakudesudata.watcher import OngoingWatcher
+
+
+def release(title, episode):
+    return (f'<div class="detpost"><div class="epz"> Episode {episode}</div><div class="epztipe"> Senin</div>'
+            f'<div class="newnime">14 Okt</div><a href="https://otakudesu.cloud/anime/{title}/"><h2>{title}</h2></a></div>')
+
+
+class FakeSite:
+    def __init__(self):
+        self.pages = []
+        self.requests = []
+        self.episodes = ['X Episode 2', 'X Episode 1']
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if '/episode/' in request.url.path:
+            return httpx.Response(200, text='<div class="download"><ul><li><strong>Mp4 480p</strong><a href="https://example.com/file">Host</a></li></ul></div>')
+        if '/anime/' in request.url.path:
+            items = ''.join(f'<li><span><a href="https://otakudesu.cloud/episode/x-{title.split()[-1]}/">{title}</a></span></li>' for title in self.episodes)
+            return httpx.Response(200, text=f'<div class="episodelist"></div><div class="episodelist"><ul>{items}</ul></div>')
+        etag, html = self.pages[0]
+        if len(self.pages) > 1: self.pages.pop(0)
+        if request.headers.get('If-None-Match') == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, text=html, headers={'ETag': etag})
+
+
+class TestOngoingWatcher(unittest.TestCase):
+    def setUp(self):
+        self.site = FakeSite()
+        patcher = patch('otakudesudata.fetch.async_client', lambda **kwargs: httpx.AsyncClient(transport=httpx.MockTransport(self.site)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # run() uses the shared loop, whose clients must come from the patched factory
+        runner.close()
+        self.addCleanup(runner.close)
+
+    def collect(self, watcher, max_polls):
+        async def collect():
+            return [event async for event in watcher.watch(max_polls=max_polls)]
+        return asyncio.run(collect())
+
+    def test_emits_only_new_episodes(self):
+        self.site.pages = [('"1"', release('a', 1) + release('b', 3)), ('"2"', release('a', 2) + release('b', 3))]
+        events = self.collect(OngoingWatcher(interval=0), 2)
+        self.assertEqual([(event['title'], event['episode']) for event in events], [('a', 'Episode 2')])
+
+    def test_emit_initial(self):
+        self.site.pages = [('"1"', release('a', 1) + release('b', 3))]
+        events = self.collect(OngoingWatcher(interval=0, emit_initial=True), 1)
+        self.assertEqual(len(events), 2)
+
+    def test_conditional_request(self):
+        self.site.pages = [('"1"', release('a', 1))]
+        watcher = OngoingWatcher(interval=0)
+        self.assertEqual(self.collect(watcher, 3), [])
+        self.assertEqual(self.site.requests[-1].headers['If-None-Match'], '"1"')
+        self.assertEqual(watcher.polls, 3)
+
+    def test_get_episode_links(self):
+        self.site.pages = [('"1"', release('a', 1)), ('"2"', release('a', 2))]
+        events = self.collect(OngoingWatcher(interval=0, get_episode_links=True), 2)
+        self.assertEqual(events[0]['latestEpisode']['url'], 'https://otakudesu.cloud/episode/x-2/')
+        self.assertEqual(events[0]['latestEpisode']['links']['mp4480p'][0]['url'], 'https://example.com/file')
+
+    def test_latest_episode_out_of_order(self):
+        self.site.pages = [('"1"', release('a', 1)), ('"2"', release('a', 10))]
+        self.site.episodes = ['X Episode 2', 'X Episode 10', 'X Episode 1']
+        events = self.collect(OngoingWatcher(interval=0, get_episode_links=True), 2)
+        self.assertEqual(events[0]['latestEpisode']['url'], 'https://otakudesu.cloud/episode/x-10/')
+
+    def test_run_callback(self):
+        self.site.pages = [('"1"', release('a', 1))]
+        events = []
+        with patch('otakudesudata.watcher.asyncio.run') as run:
+            OngoingWatcher(interval=0, emit_initial=True).run(events.append, max_polls=1)
+        self.assertEqual(len(events), 1)
+        run.assert_not_called()
+        self.assertFalse(runner.get_loop().client().is_closed)
+
+
+if __name__ == '__main__':
+    unittest.main()